@@ -0,0 +1,28 @@
+from .run import (
+    BASE_SCENARIO,
+    DEFAULT_BASELINE,
+    SWEEPS,
+    Regression,
+    compare,
+    load_results,
+    measure,
+    run_benchmarks,
+    save_results,
+    sweep_scenarios,
+)
+from .scenario import BenchmarkPlayground, Scenario
+
+__all__ = [
+    "Scenario",
+    "BenchmarkPlayground",
+    "BASE_SCENARIO",
+    "DEFAULT_BASELINE",
+    "SWEEPS",
+    "Regression",
+    "sweep_scenarios",
+    "measure",
+    "run_benchmarks",
+    "save_results",
+    "load_results",
+    "compare",
+]
@@ -0,0 +1,86 @@
+"""
+Runs the benchmarks, e.g.:
+
+    python -m spg.benchmark --sweep agents --output results.json
+    python -m spg.benchmark --compare --threshold 0.2
+    python -m spg.benchmark --baseline baseline.json
+
+--compare uses the baseline committed in spg/benchmark/baselines/default.json,
+unless --baseline is set.
+Exits with an error if a metric is worse than the baseline.
+"""
+
+import argparse
+import sys
+
+from .run import (
+    DEFAULT_BASELINE,
+    SWEEPS,
+    compare,
+    load_results,
+    run_benchmarks,
+    save_results,
+    sweep_scenarios,
+)
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Benchmarks of spg playgrounds")
+
+    parser.add_argument(
+        "--sweep",
+        choices=list(SWEEPS),
+        action="append",
+        help="Parameters swept, all if not set. Can be repeated.",
+    )
+    parser.add_argument("--steps", type=int, default=200, help="Steps measured")
+    parser.add_argument("--resets", type=int, default=10, help="Resets measured")
+    parser.add_argument(
+        "--add_remove", type=int, default=100, help="Additions and removals measured"
+    )
+    parser.add_argument("--output", help="Json file where results are saved")
+    parser.add_argument("--baseline", help="Json file of results to compare to")
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Compare to the baseline, the default one if --baseline is not set",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative degradation reported as a regression",
+    )
+
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        sweep_scenarios(args.sweep),
+        verbose=True,
+        n_steps=args.steps,
+        n_resets=args.resets,
+        n_add_remove=args.add_remove,
+    )
+
+    if args.output:
+        save_results(results, args.output)
+
+    if not (args.compare or args.baseline):
+        return 0
+
+    baseline = args.baseline or DEFAULT_BASELINE
+    regressions = compare(results, load_results(baseline), args.threshold)
+
+    for regression in regressions:
+        print(
+            f"Regression {regression.scenario} {regression.metric}: "
+            f"{regression.baseline:.4g} -> {regression.value:.4g} "
+            f"({regression.change:+.0%})"
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
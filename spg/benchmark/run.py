@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from importlib import metadata
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from spg.components.elements.ball import Ball
+
+from .scenario import BenchmarkPlayground, Scenario
+
+BASE_SCENARIO = Scenario()
+
+# Parameter swept, and its values. Other parameters are those of BASE_SCENARIO.
+SWEEPS = {
+    "agents": ("n_agents", [1, 4, 16, 32]),
+    "balls": ("n_balls", [0, 16, 64, 128]),
+    "resolution": ("resolution", [16, 64, 256]),
+    "sensor_scale": ("sensor_scale", [0.5, 1.0, 2.0]),
+    "size": ("size", [(200, 200), (400, 400), (800, 800)]),
+}
+
+# Results committed with the package, compared to with --compare
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "default.json")
+
+# Phases of the profiler reported, see Profiler
+PROFILED_PHASES = ["pymunk_step", "view_update", "ray_compute", "readback"]
+
+
+class Regression(NamedTuple):
+    scenario: str
+    metric: str
+    baseline: float
+    value: float
+
+    # Relative degradation, positive when worse than the baseline
+    change: float
+
+
+def sweep_scenarios(sweeps: Optional[Iterable[str]] = None) -> List[Scenario]:
+    """Scenarios of the sweeps, without duplicates."""
+
+    if sweeps is None:
+        sweeps = SWEEPS
+
+    scenarios: List[Scenario] = []
+
+    for sweep in sweeps:
+        parameter, values = SWEEPS[sweep]
+
+        for value in values:
+            scenario = BASE_SCENARIO._replace(**{parameter: value})
+            if scenario not in scenarios:
+                scenarios.append(scenario)
+
+    return scenarios
+
+
+def _timed(function, repeats: int):
+    """Median duration of function, in seconds."""
+
+    durations = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+
+    return statistics.median(durations)
+
+
+def measure(
+    scenario: Scenario,
+    n_steps: int = 200,
+    n_warmup: int = 20,
+    n_resets: int = 10,
+    n_add_remove: int = 100,
+) -> Dict[str, float]:
+    """
+    Measures a scenario.
+    Metrics ending with _per_sec are rates, others are durations in seconds.
+    """
+
+    playground = BenchmarkPlayground(scenario)
+
+    metrics: Dict[str, float] = {}
+
+    # Actions are sampled once, so that sampling is not measured
+    playground.action_space.seed(scenario.seed)
+    actions = [playground.action_space.sample() for _ in range(16)]
+
+    for index in range(n_warmup):
+        playground.step(actions[index % len(actions)])
+
+    start = time.perf_counter()
+    for index in range(n_steps):
+        playground.step(actions[index % len(actions)])
+    metrics["steps_per_sec"] = n_steps / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for index in range(n_steps):
+        playground.step(actions[index % len(actions)], observe=False)
+    metrics["physics_steps_per_sec"] = n_steps / (time.perf_counter() - start)
+
+    # Breakdown of the steps, with the profiler enabled
+    playground.profiler.enable()
+    for index in range(n_steps):
+        playground.step(actions[index % len(actions)])
+    playground.profiler.disable()
+
+    stats = playground.stats
+    for phase in PROFILED_PHASES:
+        if phase in stats:
+            metrics[f"{phase}_s"] = stats[phase].mean
+
+    metrics["reset_s"] = _timed(playground.reset, n_resets)
+    metrics["soft_reset_s"] = _timed(lambda: playground.reset(soft=True), n_resets)
+
+    # The same ball is added and removed, so that its creation is not measured
+    ball = Ball()
+
+    start = time.perf_counter()
+    for _ in range(n_add_remove):
+        playground.add(ball, ((0, 0), 0))
+        playground.remove(ball)
+    metrics["add_remove_per_sec"] = n_add_remove / (time.perf_counter() - start)
+
+    return metrics
+
+
+def _metadata():
+
+    versions = {}
+    for package in ["pymunk", "arcade", "numpy", "gymnasium"]:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "versions": versions,
+    }
+
+
+def run_benchmarks(scenarios: Iterable[Scenario], verbose: bool = False, **kwargs):
+    """
+    Measures each scenario. Keyword arguments are passed to measure.
+    Returns the results, as saved in json.
+    """
+
+    results = []
+
+    for scenario in scenarios:
+
+        metrics = measure(scenario, **kwargs)
+
+        results.append(
+            {
+                "name": scenario.name,
+                "scenario": scenario._asdict(),
+                "metrics": metrics,
+            }
+        )
+
+        if verbose:
+            print(
+                f"{scenario.name}: "
+                + ", ".join(
+                    f"{metric}={value:.4g}" for metric, value in metrics.items()
+                )
+            )
+
+    return {"metadata": _metadata(), "results": results}
+
+
+def save_results(results: dict, path: str):
+    with open(path, "wt", encoding="utf-8") as f_results:
+        json.dump(results, f_results, indent=2)
+
+
+def load_results(path: str) -> dict:
+    with open(path, "rt", encoding="utf-8") as f_results:
+        return json.load(f_results)
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.1) -> List[Regression]:
+    """
+    Returns the metrics worse than the baseline by more than threshold,
+    relatively. Rates are worse when lower, durations when higher.
+    Scenarios and metrics missing from the baseline are ignored.
+    """
+
+    baseline_metrics = {
+        result["name"]: result["metrics"] for result in baseline["results"]
+    }
+
+    regressions = []
+
+    for result in results["results"]:
+
+        reference = baseline_metrics.get(result["name"], {})
+
+        for metric, value in result["metrics"].items():
+
+            if metric not in reference or not reference[metric]:
+                continue
+
+            reference_value = reference[metric]
+
+            if metric.endswith("_per_sec"):
+                change = (reference_value - value) / reference_value
+            else:
+                change = (value - reference_value) / reference_value
+
+            if change > threshold:
+                regressions.append(
+                    Regression(result["name"], metric, reference_value, value, change)
+                )
+
+    return regressions
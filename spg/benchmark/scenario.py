@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import math
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pymunk
+from gymnasium import spaces
+from gymnasium.utils import seeding
+
+from spg.components.agents.sensors.camera import RGBCamera
+from spg.components.agents.sensors.distance import Distance
+from spg.components.elements.ball import Ball
+from spg.core.entity import Agent, Entity
+from spg.core.entity.mixin import AttachedStaticMixin, BaseDynamicMixin
+from spg.core.entity.mixin.sprite import get_texture_from_geometry
+from spg.core.playground import Playground
+from spg.core.position import Coordinate
+
+SENSOR_FOV = math.pi / 2
+SENSOR_RANGE = 100
+
+
+class Scenario(NamedTuple):
+    """Parameters of a benchmarked playground."""
+
+    n_agents: int = 4
+    n_balls: int = 16
+    resolution: int = 64
+    sensor_scale: float = 1.0
+    size: Tuple[int, int] = (400, 400)
+    seed: int = 0
+
+    @property
+    def name(self):
+        return (
+            f"agents={self.n_agents}-balls={self.n_balls}-res={self.resolution}"
+            f"-scale={self.sensor_scale}-size={self.size[0]}x{self.size[1]}"
+        )
+
+
+class BenchmarkAgent(Agent, BaseDynamicMixin):
+    """Agent moving with forces, with a distance sensor and a camera."""
+
+    def __init__(self, resolution: int, **kwargs):
+
+        super().__init__(
+            mass=10,
+            filename=":spg:puzzle/element/element_blue_square.png",
+            sprite_front_is_up=True,
+            shape_approximation="decomposition",
+            **kwargs,
+        )
+
+        # Rays are not drawn, only the fields of the observations are read
+        self.distance = BenchmarkDistance(
+            fov=SENSOR_FOV,
+            resolution=resolution,
+            max_range=SENSOR_RANGE,
+            compact_output=True,
+        )
+        self.add(self.distance)
+
+        self.camera = BenchmarkCamera(
+            fov=SENSOR_FOV,
+            resolution=resolution,
+            max_range=SENSOR_RANGE,
+            compact_output=True,
+        )
+        self.add(self.camera)
+
+    def apply_action(self, action):
+
+        forward_force, lateral_force, angular_velocity = action
+
+        self.pm_body.apply_force_at_local_point(
+            pymunk.Vec2d(forward_force, lateral_force) * 100, (0, 0)
+        )
+
+        self.pm_body.angular_velocity = angular_velocity * 0.3
+
+    @property
+    def action_space(self):
+        return spaces.Box(low=-1, high=1, shape=(3,))
+
+    @property
+    def observation_space(self):
+        return spaces.Box(low=-np.inf, high=np.inf, shape=(2,))
+
+    @property
+    def observation(self):
+        return np.array(self.velocity)
+
+
+def _sensor_texture():
+    texture, _ = get_texture_from_geometry(
+        geometry="circle", radius=5, color=(255, 0, 0)
+    )
+    return texture
+
+
+class BenchmarkDistance(Entity, AttachedStaticMixin, Distance):
+    def __init__(self, fov, resolution, max_range, compact_output=False):
+
+        super().__init__(texture=_sensor_texture(), transparent=True)
+
+        Distance.__init__(
+            self,
+            fov=fov,
+            resolution=resolution,
+            max_range=max_range,
+            compact_output=compact_output,
+        )
+
+    @property
+    def attachment_point(self):
+        return 0, 0
+
+
+class BenchmarkCamera(Entity, AttachedStaticMixin, RGBCamera):
+    def __init__(self, fov, resolution, max_range, compact_output=False):
+
+        super().__init__(texture=_sensor_texture(), transparent=True)
+
+        RGBCamera.__init__(
+            self,
+            fov=fov,
+            resolution=resolution,
+            max_range=max_range,
+            compact_output=compact_output,
+        )
+
+    @property
+    def attachment_point(self):
+        return 0, 0
+
+
+class BenchmarkPlayground(Playground):
+    """
+    Playground of a scenario.
+    Agents and balls are placed in random cells of grids,
+    so that they don't overlap.
+    Placements are seeded by the scenario.
+    """
+
+    def __init__(self, scenario: Scenario, **kwargs):
+
+        self.scenario = scenario
+        self._np_random, _ = seeding.np_random(scenario.seed)
+
+        self._agents_to_place: List[BenchmarkAgent] = []
+        self._agent_coordinates: List[Coordinate] = []
+
+        super().__init__(
+            size=scenario.size, sensor_scale=scenario.sensor_scale, **kwargs
+        )
+
+    def _free_coordinates(
+        self,
+        cell_size: float,
+        n_entities: int,
+        occupied: Sequence[Coordinate] = (),
+        clearance: float = 0,
+    ) -> List[Coordinate]:
+        """
+        Coordinates of n_entities random cells of a grid.
+        Cells closer than clearance to an occupied position are not used.
+        """
+
+        width, height = self.size
+        n_cols, n_rows = int(width // cell_size), int(height // cell_size)
+
+        centers = [
+            (
+                (cell % n_cols + 0.5) * cell_size - width / 2,
+                (cell // n_cols + 0.5) * cell_size - height / 2,
+            )
+            for cell in range(n_cols * n_rows)
+        ]
+
+        centers = [
+            center
+            for center in centers
+            if all(math.dist(center, position) >= clearance for position, _ in occupied)
+        ]
+
+        if len(centers) < n_entities:
+            raise ValueError(
+                f"{n_entities} entities don't fit in playground {self.size}"
+            )
+
+        cells = self.np_random.permutation(len(centers))[:n_entities]
+
+        return [
+            (centers[cell], self.np_random.uniform(0, 2 * math.pi)) for cell in cells
+        ]
+
+    def place_elements(self):
+
+        self._agents_to_place = [
+            BenchmarkAgent(resolution=self.scenario.resolution, name=f"agent_{index}")
+            for index in range(self.scenario.n_agents)
+        ]
+        balls = [Ball() for _ in range(self.scenario.n_balls)]
+
+        agent_radius = max((agent.radius for agent in self._agents_to_place), default=0)
+        ball_radius = max((ball.radius for ball in balls), default=0)
+
+        # Agents are placed on a grid of their size, and balls on a finer grid,
+        # in the cells which don't overlap with agents
+        self._agent_coordinates = []
+        if self._agents_to_place:
+            self._agent_coordinates = self._free_coordinates(
+                2 * agent_radius + 2, len(self._agents_to_place)
+            )
+
+        if not balls:
+            return
+
+        ball_coordinates = self._free_coordinates(
+            2 * ball_radius + 2,
+            len(balls),
+            occupied=self._agent_coordinates,
+            clearance=agent_radius + ball_radius + 2,
+        )
+
+        for ball, coordinates in zip(balls, ball_coordinates):
+            self.add(ball, coordinates)
+
+    def place_agents(self):
+
+        for agent, coordinates in zip(self._agents_to_place, self._agent_coordinates):
+            self.add(agent, coordinates)
@@ -7,25 +7,30 @@ from spg.core.sensor.ray.ray import RaySensor
 
 
 class RGBCamera(RaySensor):
+
+    hitpoint_fields = ("r", "g", "b")
+
     @property
     def observation_space(self):
         return spaces.Box(low=0, high=255, shape=(self.resolution, 3))
 
     def _convert_hitpoints_to_observation(self):
-        self._observation = self._hitpoints[:, 10:13]
+        return self._field("r", "g", "b")
 
     def _get_ray_colors(self):
         return self._observation.astype(np.uint8)
 
 
 class GreyCamera(RaySensor):
+
+    hitpoint_fields = ("grey",)
+
     @property
     def observation_space(self):
         return spaces.Box(low=0, high=255, shape=(self.resolution,))
 
     def _convert_hitpoints_to_observation(self):
-        rbg = self._hitpoints[:, 10:13]
-        self._observation = np.dot(rbg, [0.299, 0.587, 0.114])
+        return self._field("grey")
 
     def _get_ray_colors(self):
         grey = np.dot(self._observation, [0.299, 0.587, 0.114]).astype(np.uint8)
@@ -7,12 +7,16 @@ from spg.core.sensor.ray.ray import RaySensor
 
 
 class Distance(RaySensor):
+
+    uses_color = False
+    hitpoint_fields = ("dist",)
+
     @property
     def observation_space(self):
         return spaces.Box(low=0, high=self.max_range, shape=(self.resolution,))
 
     def _convert_hitpoints_to_observation(self):
-        self._observation = self._hitpoints[:, 9]
+        return self._field("dist")
 
     def _get_ray_colors(self):
         dist = (1 - self._observation / self.max_range) * 255
@@ -19,7 +19,7 @@ class Semantic(RaySensor, ABC):
         uids = np.unique(uids)
 
         entities = [self.playground.uids_to_entities[uid] for uid in uids]
-        self._observation = self._extract_semantic(entities)
+        return self._extract_semantic(entities)
 
     @abstractmethod
     def _extract_semantic(self, entities):
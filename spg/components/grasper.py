@@ -17,7 +17,10 @@ class GraspableMixin:
     pm_body: pymunk.Body
     pm_shapes: List[pymunk.Shape]
 
-    grasped_by = []
+    @property
+    def grasped_by(self) -> List[GrasperMixin]:
+        # One list per entity, not shared through the class
+        return self.__dict__.setdefault("_grasped_by", [])
 
 
 class GrasperMixin(ActionMixin, ABC):
@@ -26,9 +29,13 @@ class GrasperMixin(ActionMixin, ABC):
     pm_body: pymunk.Body
     playground: Playground
 
-    grasped: Dict[GraspableMixin, List[pymunk.PinJoint]] = {}
     max_grasped: int = None
 
+    @property
+    def grasped(self) -> Dict[GraspableMixin, List[pymunk.PinJoint]]:
+        # One dict per entity, not shared through the class
+        return self.__dict__.setdefault("_grasped", {})
+
     @property
     def action_space(self):
         return Discrete(2)
@@ -20,6 +20,10 @@ if TYPE_CHECKING:
 
 Teams = Union[str, List[str]]
 
+# Entities attached to the same entity share the upper bits of their uid,
+# their group. The lower MEMBER_BITS bits tell them apart.
+MEMBER_BITS = 8
+
 
 class Entity(SpriteMixin, BodyMixin, ShapeMixin, ABC):
     """
@@ -55,6 +59,11 @@ class Entity(SpriteMixin, BodyMixin, ShapeMixin, ABC):
         self.attachment_points: Dict[Entity, Coordinate] = {}
         self.anchor: Optional[Entity] = None
 
+    @property
+    def group(self) -> int:
+        """Group of the entity, shared with the entities attached to the same root."""
+        return self.uid >> MEMBER_BITS
+
     @property
     def all_attached(self):
         """
@@ -145,25 +154,23 @@ class Agent(Entity, BaseMixin, ActionMixin, SensorMixin):
                 attached.apply_action(action[attached.name])
 
     @property
-    def agent_observation_space(self):
+    def observed_entities(self) -> List[Entity]:
+        """The agent, then its attached entities with observations."""
 
-        obs_space = {self.name: self.observation_space}
+        return [self] + [
+            attached
+            for attached in self.all_attached
+            if hasattr(attached, "observation_space")
+        ]
 
-        # Add attached entities' observation spaces
-        for attached in self.all_attached:
-            if hasattr(attached, "observation_space"):
-                obs_space[attached.name] = attached.observation_space
+    @property
+    def agent_observation_space(self):
 
-        return spaces.Dict(obs_space)
+        return spaces.Dict(
+            {entity.name: entity.observation_space for entity in self.observed_entities}
+        )
 
     @property
     def agent_observation(self):
 
-        obs = {self.name: self.observation}
-
-        # Add attached entities' observations
-        for attached in self.all_attached:
-            if hasattr(attached, "observation"):
-                obs[attached.name] = attached.observation
-
-        return obs
+        return {entity.name: entity.observation for entity in self.observed_entities}
@@ -54,6 +54,11 @@ class BodyMixin(ABC):
     def angular_velocity(self):
         return self.pm_body.angular_velocity
 
+    @property
+    def sleeping(self):
+        """Sleeping bodies are at rest until woken up."""
+        return self.pm_body.is_sleeping
+
     @property
     def moved(self):
 
@@ -62,6 +67,9 @@ class BodyMixin(ABC):
 
         if self.pm_body.body_type == pymunk.Body.DYNAMIC:
 
+            if self.sleeping:
+                return False
+
             vel = self.pm_body.velocity.length
             if vel > 0.001:
                 return True
@@ -109,6 +117,10 @@ class BaseMixin(BodyMixin):
         if self.pm_body.space:
             self.pm_body.space.reindex_shapes_for_body(self.pm_body)
 
+            # Views cache the static entities
+            if self.pm_body.body_type == pymunk.Body.STATIC:
+                self.playground.invalidate_static_layers()
+
     def fix_attached(self):
         for attachment in self.attached:
             attachment.fix()
@@ -190,6 +202,14 @@ class AttachedStaticMixin(AttachmentMixin):
     def _get_pm_body(self):
         return None
 
+    @property
+    def sleeping(self):
+        return self.anchor.sleeping
+
+    @property
+    def moved(self):
+        return self._moved or self.anchor.moved
+
     def _move_relative(self):
         pass
 
@@ -117,7 +117,7 @@ class ShapeMixin:
         return dummy_shapes
 
     def get_all_shapes(self):
-        all_shapes = self.pm_shapes
+        all_shapes = list(self.pm_shapes)
         for entity in self.attached:
             all_shapes += entity.get_all_shapes()
         return all_shapes
@@ -50,6 +50,8 @@ class SpriteMixin:
 
         self.transparent = transparent
 
+        self._uid_texture: Optional[Texture] = None
+
     @property
     def texture(self):
         return self.sprite.texture
@@ -99,7 +101,7 @@ class SpriteMixin:
 
         texture = self.sprite.texture
         if color_uid:
-            texture = self.color_with_id(texture)
+            texture = self.uid_texture
 
         assert isinstance(texture, Texture)
 
@@ -118,6 +120,15 @@ class SpriteMixin:
 
         return sprite
 
+    @property
+    def uid_texture(self) -> Texture:
+        """Texture colored with the uid, built once per uid."""
+
+        if self._uid_texture is None or self._uid_texture.name != str(self.uid):
+            self._uid_texture = self.color_with_id(self.sprite.texture)
+
+        return self._uid_texture
+
     def color_with_id(self, texture) -> Texture:
 
         img_uid = Image.new("RGBA", texture.size)
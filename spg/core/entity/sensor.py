@@ -4,6 +4,11 @@ from abc import abstractmethod
 
 
 class SensorMixin:
+
+    # Sensors which are not requested are not computed,
+    # and their observation is not updated
+    requested = True
+
     @property
     @abstractmethod
     def observation_space(self):
@@ -1,8 +1,14 @@
 # from .layouts import SingleRoom, LineRooms, GridRooms
 # from .collision_handlers import get_colliding_entities
 from .playground import EmptyPlayground, Playground
+from .vector import SubprocVectorPlayground, VectorPlayground
 
 # from .room import ConnectedRooms, Room
 
 # __all__ = ["get_colliding_entities", "Playground", "Room", "ConnectedRooms"]
-__all__ = ["Playground", "EmptyPlayground"]
+__all__ = [
+    "Playground",
+    "EmptyPlayground",
+    "VectorPlayground",
+    "SubprocVectorPlayground",
+]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+import numpy as np
+from gymnasium import spaces
+
+if TYPE_CHECKING:
+    from spg.core.entity import Agent, Entity
+
+
+def _flat_converter(space: spaces.Space) -> Tuple[int, Callable]:
+    """
+    Returns the number of values used by an action space in a flat array,
+    and the function converting these values into an action of the space.
+    """
+
+    if isinstance(space, spaces.Box):
+        size = int(np.prod(space.shape))
+        shape = space.shape
+
+        if len(shape) == 1:
+            return size, lambda values: values
+
+        return size, lambda values: values.reshape(shape)
+
+    if isinstance(space, spaces.Discrete):
+        start = int(space.start)
+        return 1, lambda values: int(round(values[0])) + start
+
+    if isinstance(space, (spaces.MultiBinary, spaces.MultiDiscrete)):
+        size = int(np.prod(space.shape))
+        shape = space.shape
+        return size, lambda values: np.rint(values).astype(np.int64).reshape(shape)
+
+    raise ValueError(f"Action space {space} can't be used in a flat action array")
+
+
+class ActionLayout:
+    """
+    Position of the actions of all actuators in a flat action array.
+
+    Row i of the array holds the actions of the i-th agent of the playground.
+    In each row, the actions of the agent and of its attached entities
+    follow the order of agent_apply_action.
+    Rows of agents with fewer actions are padded.
+    """
+
+    def __init__(self, agents: List[Agent]):
+
+        self.agent_names = [agent.name for agent in agents]
+
+        # Per agent, the actuators with the bounds of their actions in the row
+        self._actuators: List[List[Tuple[Callable, int, int, Callable]]] = []
+
+        # Per agent, the slice of each actuator, by name
+        self.slices: List[Dict[str, slice]] = []
+
+        for agent in agents:
+
+            entities: List[Entity] = [agent] + [
+                attached
+                for attached in agent.all_attached
+                if hasattr(attached, "apply_action")
+            ]
+
+            actuators = []
+            slices = {}
+            index = 0
+
+            for entity in entities:
+                size, converter = _flat_converter(entity.action_space)
+                actuators.append((entity.apply_action, index, index + size, converter))
+                slices[entity.name] = slice(index, index + size)
+                index += size
+
+            self._actuators.append(actuators)
+            self.slices.append(slices)
+
+        self.action_dim = max(
+            (actuators[-1][2] for actuators in self._actuators if actuators),
+            default=0,
+        )
+
+    @property
+    def shape(self):
+        return len(self.agent_names), self.action_dim
+
+    def zeros(self):
+        return np.zeros(self.shape, dtype=np.float32)
+
+    def apply(self, actions: np.ndarray):
+
+        if actions.shape != self.shape:
+            raise ValueError(
+                f"Flat actions should have shape {self.shape}, not {actions.shape}"
+            )
+
+        for row, actuators in zip(actions, self._actuators):
+            for apply_action, start, stop, converter in actuators:
+                apply_action(converter(row[start:stop]))
+
+
+class ObservationLayout:
+    """
+    Position of the observations of all sensors in a flat observation buffer.
+
+    Row i of the buffer holds the observations of the i-th agent of the
+    playground, and of its attached sensors, flattened,
+    in the order of agent_observation.
+    Only sensors with Box observation spaces are part of the layout.
+    Rows of agents with fewer observations are padded.
+
+    The buffer is allocated once, and overwritten by each call to collect.
+    Sensors which can be bound to their slice, e.g. ray sensors,
+    write their observations in it directly. Others are copied by collect.
+    """
+
+    def __init__(self, agents: List[Agent]):
+
+        self.agent_names = [agent.name for agent in agents]
+
+        # Per agent, the slice of each sensor, by name
+        self.slices: List[Dict[str, slice]] = []
+
+        sensors_per_agent = []
+
+        for agent in agents:
+
+            sensors = []
+            slices = {}
+            index = 0
+
+            for entity in agent.observed_entities:
+                space = entity.observation_space
+
+                if not isinstance(space, spaces.Box):
+                    continue
+
+                size = int(np.prod(space.shape))
+                sensors.append((entity, index, index + size, space.shape))
+                slices[entity.name] = slice(index, index + size)
+                index += size
+
+            sensors_per_agent.append(sensors)
+            self.slices.append(slices)
+
+        self.observation_dim = max(
+            (sensors[-1][2] for sensors in sensors_per_agent if sensors), default=0
+        )
+
+        self.buffer = np.zeros(self.shape, dtype=np.float32)
+
+        # Views of the buffer where the other sensors are copied
+        self._targets = []
+
+        for row, sensors in enumerate(sensors_per_agent):
+            for entity, start, stop, shape in sensors:
+                target = self.buffer[row, start:stop].reshape(shape)
+
+                if hasattr(entity, "bind_observation"):
+                    entity.bind_observation(target)
+                else:
+                    self._targets.append((entity, target))
+
+    @property
+    def shape(self):
+        return len(self.agent_names), self.observation_dim
+
+    def collect(self):
+
+        for entity, target in self._targets:
+            np.copyto(target, entity.observation, casting="unsafe")
+
+        return self.buffer
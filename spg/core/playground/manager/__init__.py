@@ -1,4 +1,17 @@
-from .space import SpaceManager
+from .space import (
+    AdaptiveTimeStep,
+    DecoupledTimeStep,
+    FixedTimeStep,
+    SpaceManager,
+    TimeStepPolicy,
+)
 from .view import ViewManager
 
-__all__ = ["ViewManager", "SpaceManager"]
+__all__ = [
+    "ViewManager",
+    "SpaceManager",
+    "TimeStepPolicy",
+    "FixedTimeStep",
+    "DecoupledTimeStep",
+    "AdaptiveTimeStep",
+]
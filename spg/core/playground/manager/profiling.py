@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+from collections import deque
+from contextlib import nullcontext
+from time import perf_counter_ns
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+_NULL_PHASE = nullcontext()
+
+
+class PhaseStats(NamedTuple):
+    """Durations of a phase, in seconds, over the last calls."""
+
+    count: int
+    mean: float
+    min: float
+    max: float
+    total: float
+
+
+class _Phase:
+
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = perf_counter_ns()
+
+    def __exit__(self, *_):
+        self._profiler.record(self._name, self._start, perf_counter_ns())
+
+
+class Profiler:
+    """
+    Times the phases of the steps of a playground.
+
+    Phases are timed when the profiler is enabled,
+    and keep statistics over the last window calls.
+    Traces of a number of steps can be recorded,
+    and saved in the Chrome trace event format
+    (chrome://tracing or https://ui.perfetto.dev).
+
+    GPU work is asynchronous,
+    its duration is mostly accounted for in the readback phase.
+    """
+
+    def __init__(self, window: int = 1000):
+
+        self.enabled = False
+        self.window = window
+
+        self._durations: Dict[str, Deque[int]] = {}
+
+        self._trace_events: List[dict] = []
+        self._trace_steps = 0
+        self._origin = perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self._trace_steps = 0
+
+    def phase(self, name: str):
+        """Context manager timing a phase. Does nothing if disabled."""
+
+        if not self.enabled:
+            return _NULL_PHASE
+
+        return _Phase(self, name)
+
+    def record(self, name: str, start: int, end: int):
+
+        durations = self._durations.get(name)
+
+        if durations is None:
+            durations = self._durations[name] = deque(maxlen=self.window)
+
+        durations.append(end - start)
+
+        if self._trace_steps:
+
+            self._trace_events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._origin) / 1e3,
+                    "dur": (end - start) / 1e3,
+                    "pid": 0,
+                    "tid": 0,
+                }
+            )
+
+            if name == "step":
+                self._trace_steps -= 1
+
+    @property
+    def stats(self) -> Dict[str, PhaseStats]:
+
+        stats = {}
+
+        for name, durations in self._durations.items():
+
+            if not durations:
+                continue
+
+            total = sum(durations) / 1e9
+
+            stats[name] = PhaseStats(
+                count=len(durations),
+                mean=total / len(durations),
+                min=min(durations) / 1e9,
+                max=max(durations) / 1e9,
+                total=total,
+            )
+
+        return stats
+
+    def reset_stats(self):
+        self._durations = {}
+
+    def trace(self, n_steps: int):
+        """Records the phases of the next n_steps steps. Enables the profiler."""
+
+        if n_steps < 1:
+            raise ValueError("n_steps must be at least 1")
+
+        self.enable()
+        self._trace_events = []
+        self._trace_steps = n_steps
+
+    @property
+    def tracing(self):
+        return self._trace_steps > 0
+
+    def dump_trace(self, path: Optional[str] = None):
+        """
+        Returns the trace recorded, in the Chrome trace event format.
+        Saves it as json if a path is given.
+        """
+
+        trace = {"traceEvents": self._trace_events, "displayTimeUnit": "ms"}
+
+        if path is not None:
+            with open(path, "wt", encoding="utf-8") as f_trace:
+                json.dump(trace, f_trace)
+
+        return trace
+
+
+class ProfilingManager:
+    def __init__(self, profile: bool = False, profile_window: int = 1000, **_):
+        """
+        Args:
+            profile: Enables the profiler from the start.
+                It can be enabled later with profiler.enable().
+            profile_window: Number of calls of each phase kept for the stats.
+        """
+
+        self.profiler = Profiler(profile_window)
+
+        if profile:
+            self.profiler.enable()
+
+    @property
+    def stats(self) -> Dict[str, PhaseStats]:
+        """Durations of the phases of the steps, if profiled."""
+        return self.profiler.stats
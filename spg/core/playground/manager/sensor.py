@@ -2,21 +2,44 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, List
 
-from spg.core.view import View
-
 if TYPE_CHECKING:
     from spg.core.entity.sensor import SensorMixin
 
+    from .profiling import Profiler
+
 from spg.core.sensor.ray.ray import RaySensor
 from spg.core.sensor.ray.ray_compute import RayCompute
 
 
 class SensorManager:
-    def __init__(self, use_shader=True, sensor_scale=1, **kwargs) -> None:
+
+    profiler: Profiler
+
+    def __init__(
+        self,
+        use_shader=True,
+        sensor_scale=1,
+        geometric_rays=False,
+        async_readback=False,
+        distance_field=False,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            use_shader: Computes ray sensors with compute shaders, if available.
+            sensor_scale: Scale of the views sampled by ray sensors.
+            geometric_rays: Intersects rays with the shapes of the entities,
+                instead of sampling the views. Views are then not rendered.
+            async_readback: Reads the results of compute shaders one step later,
+                so that the GPU works during the physics of the next step.
+                Observations of ray sensors then lag by one step.
+            distance_field: Compute shaders skip the empty space around
+                static entities, with a distance field of the static layer.
+        """
 
         self.sensors: List[SensorMixin] = []
 
-        self.id_view = View(
+        self.id_view = self.view_cls(
             self,
             size_on_playground=self.size,
             center=(0, 0),
@@ -24,7 +47,7 @@ class SensorManager:
             draw_transparent=False,
             uid_mode=True,
         )
-        self.color_view = View(
+        self.color_view = self.view_cls(
             self,
             size_on_playground=self.size,
             center=(0, 0),
@@ -32,23 +55,73 @@ class SensorManager:
             draw_transparent=False,
         )
 
-        self.ray_compute = RayCompute(self, use_shader)
+        self.ray_compute = RayCompute(
+            self,
+            use_shader=use_shader,
+            geometric=geometric_rays,
+            async_readback=async_readback,
+            distance_field=distance_field,
+        )
 
     def update_sensors(self):
 
         if not self.sensors:
             return
 
+        # Another playground may have made its own window current
+        if self._window is not None:
+            self._window.switch_to()
+
+        # Views are only rendered if a sensor due needs them
+        self.ray_compute.update_active_sensors()
+
+        if self.ray_compute.due_indices and self.ray_compute.uses_views:
+            with self.profiler.phase("view_update"):
+                self._update_views()
+
+        # A previous dispatch may still have to be read
+        if not self.ray_compute.has_work:
+            return
+
+        with self.profiler.phase("ray_compute"):
+            self.ray_compute.update_sensors()
+
+    def _update_views(self):
+
         if not self.id_view.updated:
             self.id_view.update()
 
-        if not self.color_view.updated:
+        if self.ray_compute.n_color_due and not self.color_view.updated:
             self.color_view.update()
 
-        self.ray_compute.update_sensors()
+        # Views are only rendered again if something changed
+        self.ray_compute.skip_unchanged(self.id_view.version, self.color_view.version)
+
+    def _age_sensors(self):
+        """Called before each unit of time."""
+
+        for sensor in self.ray_compute.sensors:
+            sensor.updated = False
+            sensor.age += 1
+
+    def _expire_sensors(self):
+        """Sensors are updated at the next observation, even if not due."""
+
+        for sensor in self.ray_compute.sensors:
+            sensor.age = sensor.update_period
+
+    def reset_sensors(self):
+        self.sensors = []
+        self.ray_compute.reset()
 
     def add_sensor(self, sensor: SensorMixin):
         self.sensors.append(sensor)
 
         if isinstance(sensor, RaySensor):
             self.ray_compute.add(sensor)
+
+    def remove_sensor(self, sensor: SensorMixin):
+        self.sensors.remove(sensor)
+
+        if isinstance(sensor, RaySensor):
+            self.ray_compute.remove(sensor)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict
+import math
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 import pymunk
 
@@ -13,13 +15,190 @@ SPACE_DAMPING = 0.9
 PYMUNK_STEPS = 10
 
 
+class TimeStepPolicy(ABC):
+    """
+    Decides how a unit of time (a step of the playground)
+    is split into pymunk steps.
+
+    Args:
+        iterations: Number of iterations of the pymunk solver.
+            Pymunk default if None.
+    """
+
+    # Pymunk clears the forces after each pymunk step,
+    # so that actions only push during the first one.
+    persistent_forces = False
+
+    def __init__(self, iterations: Optional[int] = None):
+        self.iterations = iterations
+
+    @abstractmethod
+    def substeps(self, space: pymunk.Space) -> Tuple[int, float]:
+        """Returns the number of pymunk steps and their duration."""
+
+
+class FixedTimeStep(TimeStepPolicy):
+    """Always n_steps pymunk steps of 1/n_steps."""
+
+    def __init__(self, n_steps: int = PYMUNK_STEPS, **kwargs):
+        super().__init__(**kwargs)
+        assert n_steps > 0
+        self.n_steps = n_steps
+
+    def substeps(self, space):
+        return self.n_steps, 1.0 / self.n_steps
+
+
+class DecoupledTimeStep(TimeStepPolicy):
+    """
+    Pymunk steps of at most physics_dt, for a step of the playground
+    lasting control_dt.
+
+    Args:
+        persistent_forces: Forces are applied during all the pymunk steps,
+            so that actions don't depend on physics_dt.
+    """
+
+    def __init__(
+        self,
+        control_dt: float = 1.0,
+        physics_dt: float = 0.1,
+        persistent_forces: bool = False,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        assert control_dt > 0 and physics_dt > 0
+        self.persistent_forces = persistent_forces
+        self.n_steps = math.ceil(control_dt / physics_dt - 1e-9)
+        self.dt = control_dt / self.n_steps
+
+    def substeps(self, space):
+        return self.n_steps, self.dt
+
+
+class AdaptiveTimeStep(TimeStepPolicy):
+    """
+    Chooses the number of pymunk steps so that no body moves more than
+    max_displacement times the size of the smallest shape during a pymunk step.
+
+    Speeds are estimated at the beginning of the step,
+    from the velocities and the forces applied to the bodies
+    as if they lasted the whole step.
+    Scenes where nothing moves are stepped once.
+
+    Args:
+        persistent_forces: Forces are applied during all the pymunk steps,
+            so that actions don't depend on the number of pymunk steps.
+    """
+
+    def __init__(
+        self,
+        control_dt: float = 1.0,
+        max_displacement: float = 0.5,
+        min_steps: int = 1,
+        max_steps: int = PYMUNK_STEPS,
+        persistent_forces: bool = False,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        assert 0 < min_steps <= max_steps
+        self.persistent_forces = persistent_forces
+        self.control_dt = control_dt
+        self.max_displacement = max_displacement
+        self.min_steps = min_steps
+        self.max_steps = max_steps
+
+        self._min_size = math.inf
+        self._shapes_key: Tuple[int, int] = (0, -1)
+
+    def _smallest_size(self, space: pymunk.Space):
+
+        # Shapes don't change size, only recomputed when shapes are added or removed.
+        # The policy might be shared by several playgrounds.
+        shapes_key = id(space), len(space.shapes)
+
+        if shapes_key != self._shapes_key:
+            self._shapes_key = shapes_key
+            self._min_size = min(
+                (
+                    min(shape.bb.right - shape.bb.left, shape.bb.top - shape.bb.bottom)
+                    for shape in space.shapes
+                    if not shape.sensor
+                ),
+                default=math.inf,
+            )
+            self._min_size = max(self._min_size, 1.0)
+
+        return self._min_size
+
+    def substeps(self, space):
+
+        max_distance = 0.0
+
+        for body in space.bodies:
+
+            if body.body_type != pymunk.Body.DYNAMIC or body.is_sleeping:
+                continue
+
+            velocity = body.velocity + body.force / body.mass * self.control_dt
+
+            angular_velocity = (
+                body.angular_velocity + body.torque / body.moment * self.control_dt
+            )
+
+            extent = max(
+                (
+                    max(shape.bb.right - shape.bb.left, shape.bb.top - shape.bb.bottom)
+                    for shape in body.shapes
+                ),
+                default=0,
+            )
+
+            speed = velocity.length + abs(angular_velocity) * extent / 2
+            max_distance = max(max_distance, speed * self.control_dt)
+
+        max_step_distance = self.max_displacement * self._smallest_size(space)
+
+        n_steps = math.ceil(max_distance / max_step_distance)
+        n_steps = min(max(n_steps, self.min_steps), self.max_steps)
+
+        return n_steps, self.control_dt / n_steps
+
+
 class SpaceManager:
 
     space: pymunk.Space
 
-    def __init__(self, pymunk_steps=PYMUNK_STEPS, **kwargs):
+    def __init__(
+        self,
+        pymunk_steps=PYMUNK_STEPS,
+        time_step: Optional[TimeStepPolicy] = None,
+        threads: int = 1,
+        sleep_time_threshold: Optional[float] = None,
+        idle_speed_threshold: Optional[float] = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            threads: Threads used by the pymunk solver.
+                Pymunk supports at most 2, not on Windows.
+            sleep_time_threshold: Time after which idle bodies fall asleep.
+                Bodies never sleep if None.
+            idle_speed_threshold: Speed under which bodies are idle.
+                Pymunk estimates it if None.
+        """
         assert pymunk_steps > 0
         self.pymunk_steps = pymunk_steps
+
+        if time_step is None:
+            time_step = FixedTimeStep(pymunk_steps)
+        self.time_step = time_step
+
+        assert threads > 0
+        self.threads = threads
+        self.sleep_time_threshold = sleep_time_threshold
+        self.idle_speed_threshold = idle_speed_threshold
+
         self.custom_collision_types: Dict[str, int] = {}
 
     def initialize_space(self):
@@ -28,13 +207,44 @@ class SpaceManager:
         Returns: Pymunk Space
 
         """
-        self.space = pymunk.Space()
+        self.space = pymunk.Space(threaded=self.threads > 1)
         self.space.gravity = pymunk.Vec2d(0.0, 0.0)
         self.space.damping = SPACE_DAMPING
 
+        if self.threads > 1:
+            self.space.threads = self.threads
+
+        if self.sleep_time_threshold is not None:
+            self.space.sleep_time_threshold = self.sleep_time_threshold
+
+        if self.idle_speed_threshold is not None:
+            self.space.idle_speed_threshold = self.idle_speed_threshold
+
+        if self.time_step.iterations is not None:
+            self.space.iterations = self.time_step.iterations
+
     def pymunk_step(self):
-        for _ in range(self.pymunk_steps):
-            self.space.step(1.0 / self.pymunk_steps)
+
+        n_steps, dt = self.time_step.substeps(self.space)
+
+        # Pymunk clears the forces after each step.
+        # Persistent forces are applied again before each pymunk step.
+        forces = []
+        if self.time_step.persistent_forces:
+            forces = [
+                (body, body.force, body.torque)
+                for body in self.space.bodies
+                if body.body_type == pymunk.Body.DYNAMIC
+                and (body.force != (0, 0) or body.torque != 0)
+            ]
+
+        for _ in range(n_steps):
+
+            for body, force, torque in forces:
+                body.force = force
+                body.torque = torque
+
+            self.space.step(dt)
 
     def check_overlapping(self, entity: Entity, coordinates: object) -> object:
 
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Tuple
+
+import numpy as np
+import pymunk
+
+from spg.core.position import Coordinate
+
+if TYPE_CHECKING:
+    from ...entity import Agent, Element, Entity
+
+
+class PlaygroundState(NamedTuple):
+    """
+    State of a playground, as returned by snapshot.
+    Entities are stored by reference, the state can only be restored
+    in the playground it was taken from.
+    """
+
+    elements: List[Element]
+    agents: List[Agent]
+
+    # Coordinates of elements and agents, to add them back if removed
+    coordinates: Dict[Entity, Coordinate]
+
+    # Position, angle, velocity and angular velocity of each body
+    bodies: List[Entity]
+    body_states: np.ndarray
+
+    motor_rates: Dict[Entity, float]
+
+    # Grasper, grasped entity and joints
+    grasps: List[Tuple[Entity, Entity, List[pymunk.Constraint]]]
+
+    # Reward and cumulative reward of each agent
+    rewards: np.ndarray
+
+    terminated: bool
+
+
+class StateManager:
+
+    elements: List[Element]
+    agents: List[Agent]
+    uids_to_entities: Dict[int, Entity]
+    space: pymunk.Space
+    _terminated: bool
+
+    def _rebuild_space(self):
+
+        # Pymunk caches contacts between steps, ordered by the order
+        # shapes were added in, and bodies keep the velocity correcting
+        # overlaps until the next step. None of them can be saved,
+        # so that they are cleared, in a new space.
+        bodies = self.space.bodies
+        shapes = self.space.shapes
+        constraints = self.space.constraints
+        self.space.remove(*constraints, *shapes, *bodies)
+
+        # Moving bodies during 0 seconds only clears their correction
+        for body in bodies:
+            if body.body_type == pymunk.Body.DYNAMIC:
+                pymunk.Body.update_position(body, 0)
+
+        self.initialize_space()
+        self.add_interactions()
+
+        self.space.add(*bodies, *shapes, *constraints)
+
+    def snapshot(self) -> PlaygroundState:
+        """
+        Returns the state of the playground:
+        entities present, state of their bodies and motors,
+        grasped entities, and rewards of the agents.
+
+        The pymunk space is rebuilt, as by restore, to clear the contacts
+        and corrections it keeps between steps. Steps following a restore
+        are then identical to the steps that followed the snapshot.
+        Sleeping bodies are woken up.
+        """
+
+        self._rebuild_space()
+
+        entities = list(self.uids_to_entities.values())
+
+        bodies = [entity for entity in entities if entity.pm_body is not None]
+
+        body_states = np.array(
+            [
+                (
+                    *entity.pm_body.position,
+                    entity.pm_body.angle,
+                    *entity.pm_body.velocity,
+                    entity.pm_body.angular_velocity,
+                )
+                for entity in bodies
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 6)
+
+        motor_rates = {
+            entity: entity.motor.rate
+            for entity in entities
+            if getattr(entity, "motor", None) is not None
+        }
+
+        grasps = [
+            (entity, grasped, list(joints))
+            for entity in entities
+            if hasattr(entity, "grasped")
+            for grasped, joints in entity.grasped.items()
+        ]
+
+        rewards = np.array(
+            [(agent.reward, agent.cumulative_reward) for agent in self.agents],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+
+        return PlaygroundState(
+            elements=self.elements.copy(),
+            agents=self.agents.copy(),
+            coordinates={
+                entity: entity.coordinates for entity in self.elements + self.agents
+            },
+            bodies=bodies,
+            body_states=body_states,
+            motor_rates=motor_rates,
+            grasps=grasps,
+            rewards=rewards,
+            terminated=self._terminated,
+        )
+
+    def restore(self, state: PlaygroundState):
+        """
+        Restores a state returned by snapshot, in place.
+        Entities, sprites and textures are reused.
+        Entities added since the snapshot are removed,
+        and entities removed since then are added back.
+
+        Returns the observation and info, as reset.
+        """
+
+        for entity in self.uids_to_entities.values():
+            if hasattr(entity, "grasped"):
+                entity.release_all()
+
+        for entity in self.elements + self.agents:
+            if entity not in state.coordinates:
+                self.remove(entity)
+
+        for entity in state.elements + state.agents:
+            if entity not in self.elements and entity not in self.agents:
+                self.add(entity, state.coordinates[entity])
+
+        # Keep the order of the snapshot
+        self.elements = state.elements.copy()
+        self.agents = state.agents.copy()
+
+        for entity, (x, y, angle, vx, vy, ang_vel) in zip(
+            state.bodies, state.body_states
+        ):
+            body = entity.pm_body
+            # Pymunk keeps the center of gravity in place when rotating
+            body.angle = angle
+            body.position = x, y
+            body.velocity = vx, vy
+            body.angular_velocity = ang_vel
+
+            if body.space and body.body_type != pymunk.Body.DYNAMIC:
+                body.space.reindex_shapes_for_body(body)
+
+            entity._moved = True  # pylint: disable=protected-access
+
+        for entity, rate in state.motor_rates.items():
+            entity.motor.rate = rate
+
+        for grasper, grasped, joints in state.grasps:
+            grasper.grasped[grasped] = list(joints)
+            grasped.grasped_by.append(grasper)
+            self.space.add(*joints)
+
+        for agent, (reward, cumulative_reward) in zip(self.agents, state.rewards):
+            agent.reward = reward
+            agent.cumulative_reward = cumulative_reward
+
+        self._terminated = state.terminated
+
+        self._rebuild_space()
+
+        for view in self.views:
+            view.updated = False
+            view.static_updated = False
+
+        self._expire_sensors()
+
+        return self._compute_observation(), {}
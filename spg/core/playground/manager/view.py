@@ -1,8 +1,8 @@
-from typing import List, Optional, Tuple, Union
+from typing import List, Optional, Tuple, Type, Union
 
 from arcade import Window
 
-from spg.core.view import View
+from spg.core.view import SoftwareView, View
 
 
 class ViewManager:
@@ -11,8 +11,17 @@ class ViewManager:
         background: Optional[
             Union[Tuple[int, int, int], List[int], Tuple[int, int, int, int]]
         ] = None,
-        **_
+        window: Optional[Window] = None,
+        view_backend: str = "gl",
+        **_,
     ):
+        """
+        Args:
+            view_backend: "gl" renders the views of the sensors with OpenGL.
+                "software" rasterizes them on the CPU,
+                in which case no window is created,
+                and ray sensors are computed with numpy.
+        """
 
         if not background:
             background = (0, 0, 0, 255)
@@ -24,16 +33,32 @@ class ViewManager:
 
         self.views: List[View] = []
 
-        self._window = Window(1, 1, visible=False, antialiasing=False)  # type: ignore
+        if view_backend not in ("gl", "software"):
+            raise ValueError(f"Unknown view backend {view_backend}")
+
+        self.view_backend = view_backend
+
+        # Playgrounds can share a window (and its GL context), e.g. when batched
+        if window is None and view_backend == "gl":
+            window = Window(1, 1, visible=False, antialiasing=False)  # type: ignore
+
+        self._window = window
 
     @property
     def ctx(self):
+        if self._window is None:
+            return None
         return self._window.ctx
 
     @property
     def window(self):
         return self._window
 
+    @property
+    def view_cls(self) -> Type[View]:
+        """Class of the views of the sensors."""
+        return SoftwareView if self.view_backend == "software" else View
+
     def add_view(self, view):
 
         if view in self.views:
@@ -50,6 +75,12 @@ class ViewManager:
     def remove_view(self, view):
         self.views.remove(view)
 
+    def invalidate_static_layers(self):
+        """Static entities moved, views render them again at their next update."""
+
+        for view in self.views:
+            view.static_updated = False
+
     # @property
     # def ray_compute(self):
 
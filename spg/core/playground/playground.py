@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import gymnasium
+import numpy as np
 import pymunk
 import pymunk.matplotlib_util
 from gymnasium import spaces
@@ -11,19 +12,27 @@ from gymnasium.core import ActType
 from matplotlib import pyplot as plt
 
 from spg.core.entity.communication import CommunicationMixin
-from spg.core.playground.utils import zero_action_space
+from spg.core.playground.utils import copy_action, zero_action_space
 from spg.core.position import Coordinate, CoordinateSampler
 
 from ..entity import Agent, Element, Entity
+from ..entity.entity import MEMBER_BITS
 from ..entity.sensor import SensorMixin
+from .layout import ActionLayout, ObservationLayout
 from .manager import SpaceManager, ViewManager
 from .manager.collision import CollisionManager
 from .manager.communication import CommunicationManager
+from .manager.profiling import ProfilingManager
 from .manager.sensor import SensorManager
+from .manager.state import StateManager
 
 if TYPE_CHECKING:
     from spg.components.elements.barrier import BarrierMixin
 
+# Groups of uids, and random groups tried for a new group before searching in order
+N_GROUPS = 2 ** (24 - MEMBER_BITS)
+GROUP_DRAWS = 100
+
 
 class Playground(
     gymnasium.Env,
@@ -32,6 +41,8 @@ class Playground(
     CollisionManager,
     CommunicationManager,
     SensorManager,
+    StateManager,
+    ProfilingManager,
     ABC,
 ):
     def __init__(self, size: Tuple[int, int], **kwargs) -> None:
@@ -42,6 +53,10 @@ class Playground(
         self.elements: List[Element] = []
         self.agents: List[Agent] = []
 
+        # Entities placed by the last full reset, used by soft resets
+        self._initial_entities: Optional[List[Entity]] = None
+
+        ProfilingManager.__init__(self, **kwargs)
         ViewManager.__init__(self, **kwargs)
         SpaceManager.__init__(self, **kwargs)
         CollisionManager.__init__(self, **kwargs)
@@ -62,27 +77,54 @@ class Playground(
     # Entities
     ###############
 
+    # Spaces are cached, and invalidated when entities are added or removed
+
     @property
     def action_space(self):
-        return spaces.Dict(
-            {agent.name: agent.agent_action_space for agent in self.agents}
-        )
+        if self._action_space is None:
+            self._action_space = spaces.Dict(
+                {agent.name: agent.agent_action_space for agent in self.agents}
+            )
+        return self._action_space
 
     @property
     def null_action(self):
-        return zero_action_space(self)
+        if self._null_action is None:
+            self._null_action = zero_action_space(self)
+        return copy_action(self._null_action)
 
     @property
     def observation_space(self):
-        return spaces.Dict(
-            {agent.name: agent.agent_observation_space for agent in self.agents}
-        )
+        if self._observation_space is None:
+            self._observation_space = spaces.Dict(
+                {agent.name: agent.agent_observation_space for agent in self.agents}
+            )
+        return self._observation_space
+
+    @property
+    def action_layout(self):
+        if self._action_layout is None:
+            self._action_layout = ActionLayout(self.agents)
+        return self._action_layout
+
+    @property
+    def observation_layout(self):
+        if self._observation_layout is None:
+            self._observation_layout = ObservationLayout(self.agents)
+        return self._observation_layout
+
+    def _invalidate_spaces(self):
+        self._action_space: Optional[spaces.Dict] = None
+        self._observation_space: Optional[spaces.Dict] = None
+        self._null_action = None
+        self._action_layout: Optional[ActionLayout] = None
+        self._observation_layout: Optional[ObservationLayout] = None
 
     ###############
     # STEP
     ###############
 
-    def step(self, action: ActType):
+    def step(self, action: ActType, repeat: int = 1, observe: bool = True):
         """Update the Playground
 
         Updates the Playground.
@@ -90,29 +132,120 @@ class Playground(
 
         Args:
             action: The action to be performed by the agents. Dict of spaces.Space
+            repeat: Number of units of time during which the action is repeated.
+                Sensors are only updated after the last one,
+                rewards are summed.
+            observe: If False, sensors are not computed and
+                the observation returned is None.
+                Sensors can also be skipped individually,
+                by setting their requested attribute to False.
+
+        """
 
+        with self.profiler.phase("step"):
+
+            reward = self._repeat(self._update, action, repeat)
+
+            observation = self._compute_observation() if observe else None
+
+        return observation, reward, self._terminated, False, {}
+
+    def step_flat(self, actions: np.ndarray, repeat: int = 1, observe: bool = True):
+        """Update the Playground from a flat array of actions.
+
+        Same as step, without building or reading dicts.
+
+        Args:
+            actions: Array of shape action_layout.shape,
+                one row per agent, in the order of playground.agents.
+            repeat: Same as step.
+            observe: Same as step.
+
+        Returns observations as the buffer of the observation_layout,
+        which is overwritten at each step, and rewards as an array,
+        in the same order.
         """
 
-        self._pre_step()
+        with self.profiler.phase("step"):
+
+            reward = self._repeat(self._update_flat, actions, repeat)
+
+            observation = None
+
+            if observe:
+                self.update_sensors()
+                observation = self.observation_layout.collect()
 
-        for agent_name, agent_action in action.items():
-            agent = self.name_to_agents[agent_name]
-            agent.agent_apply_action(agent_action)
+            # Agents without reward, e.g. added during the step, get 0
+            rewards = np.array(
+                [reward.get(agent, 0) for agent in self.agents], dtype=np.float32
+            )
 
-        self.pymunk_step()
+        return observation, rewards, self._terminated, False, {}
 
-        self._post_step()
+    def _repeat(self, update, action, repeat: int):
+        """Updates the playground repeat times, or until it terminates.
+        Returns the rewards of the agents, summed.
+        """
+
+        if repeat < 1:
+            raise ValueError("repeat must be at least 1")
 
-        observation = self._compute_observation()
+        update(action)
         reward = self._compute_reward()
 
-        return observation, reward, self._terminated, False, {}
+        for _ in range(repeat - 1):
+
+            if self._terminated:
+                break
+
+            update(action)
+
+            for agent in self.agents:
+                reward[agent] = reward.get(agent, 0) + agent.reward
+
+        return reward
+
+    def _update(self, action: ActType):
+        """Applies the actions and moves the physics by one unit of time.
+        Sensors are not updated.
+        """
+
+        with self.profiler.phase("pre_step"):
+            self._pre_step()
+
+        with self.profiler.phase("apply_action"):
+            for agent_name, agent_action in action.items():
+                agent = self.name_to_agents[agent_name]
+                agent.agent_apply_action(agent_action)
+
+        with self.profiler.phase("pymunk_step"):
+            self.pymunk_step()
+
+        with self.profiler.phase("post_step"):
+            self._post_step()
+
+    def _update_flat(self, actions: np.ndarray):
+
+        with self.profiler.phase("pre_step"):
+            self._pre_step()
+
+        with self.profiler.phase("apply_action"):
+            self.action_layout.apply(actions)
+
+        with self.profiler.phase("pymunk_step"):
+            self.pymunk_step()
+
+        with self.profiler.phase("post_step"):
+            self._post_step()
 
     def _pre_step(self):
 
         for view in self.views:
             view.updated = False
 
+        self._age_sensors()
+
         for element in self.elements:
             element.pre_step()
 
@@ -133,6 +266,10 @@ class Playground(
 
         self.update_sensors()
 
+        return self._collect_observation()
+
+    def _collect_observation(self):
+
         obs = {}
         for agent in self.agents:
             obs[agent.name] = agent.agent_observation
@@ -142,11 +279,29 @@ class Playground(
     def _compute_reward(self):
         return {agent: agent.reward for agent in self.agents}
 
-    def reset(self):
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[dict] = None,
+        soft: bool = False,
+    ):
         """
         Reset the Playground to its initial state.
+
+        With soft=True, the entities placed by the last full reset are kept,
+        with the pymunk space, sprites and GL resources.
+        They are moved back with the coordinates they were added with
+        (coordinate samplers are sampled again),
+        and rewards, grasps and messages are cleared.
+        Other state of the entities is not reset.
         """
 
+        super().reset(seed=seed)
+
+        if soft and self._initial_entities is not None:
+            return self._soft_reset()
+
         # Initialization of the pymunk space, modelling all the physics
         self.initialize_space()
         self.add_interactions()
@@ -154,6 +309,8 @@ class Playground(
         for view in self.views:
             view.reset()
 
+        self.reset_sensors()
+
         # Mappings
         self.shapes_to_entities: Dict[pymunk.Shape, Entity] = {}
         self.name_to_agents: Dict[str, Agent] = {}
@@ -163,10 +320,70 @@ class Playground(
         self.agents: List[Agent] = []
         self.barriers: List[BarrierMixin] = []
 
+        # Coordinates given when adding elements and agents
+        self._placements: Dict[
+            Entity, Tuple[Union[Coordinate, CoordinateSampler], bool]
+        ] = {}
+
+        self._invalidate_spaces()
+
         # Lists containing elements in the playground
         self.place_elements()
         self.place_agents()
 
+        self._initial_entities = self.elements + self.agents
+
+        self._terminated = False
+
+        obs = self._compute_observation()
+
+        return obs, {}
+
+    def _soft_reset(self):
+
+        assert self._initial_entities is not None
+
+        for entity in self.uids_to_entities.values():
+            if hasattr(entity, "grasped"):
+                entity.release_all()
+
+        for entity in self.elements + self.agents:
+            if entity not in self._initial_entities:
+                self.remove(entity)
+
+        kept = [
+            entity
+            for entity in self._initial_entities
+            if entity in self.elements or entity in self.agents
+        ]
+
+        # Entities are placed in the initial order, as by a full reset.
+        # Those not placed yet don't overlap with the others.
+        for entity in kept:
+            self.space.remove(*entity.get_all_shapes())
+
+        for entity in self._initial_entities:
+            if entity in kept:
+                self.space.add(*entity.get_all_shapes())
+                entity.move_to(*self._placements[entity])
+            else:
+                self.add(entity, *self._placements[entity])
+
+        # Keep the order of the initial placement
+        self.elements = [e for e in self._initial_entities if isinstance(e, Element)]
+        self.agents = [e for e in self._initial_entities if isinstance(e, Agent)]
+
+        for agent in self.agents:
+            agent.reward = 0
+            agent.cumulative_reward = 0
+
+        self.clear_messages()
+
+        for view in self.views:
+            view.updated = False
+
+        self._expire_sensors()
+
         self._terminated = False
 
         obs = self._compute_observation()
@@ -174,13 +391,35 @@ class Playground(
         return obs, {}
 
     # ADD REMOVE ENTITIES
-    def get_uid(self):
+    def get_uid(self, entity: Optional[Entity] = None):
+        """
+        Uid not used by other entities.
+        Entities attached to another one get a uid of its group, if any is left,
+        and others the first uid of a new group.
+        Raises ValueError if all the groups are used.
+        """
+
+        anchor = entity.anchor if entity is not None else None
 
-        while True:
-            uid = self.np_random.integers(0, 2**24)
+        if anchor is not None and anchor.uid in self.uids_to_entities:
+            for member in range(1, 2**MEMBER_BITS):
+                uid = (anchor.group << MEMBER_BITS) | member
+                if uid not in self.uids_to_entities:
+                    return uid
+
+        for _ in range(GROUP_DRAWS):
+            uid = int(self.np_random.integers(1, N_GROUPS)) << MEMBER_BITS
             if uid not in self.uids_to_entities:
                 return uid
 
+        used_groups = {uid >> MEMBER_BITS for uid in self.uids_to_entities}
+
+        for group in range(1, N_GROUPS):
+            if group not in used_groups:
+                return group << MEMBER_BITS
+
+        raise ValueError("No uid left, all the groups of entities are used")
+
     def add(
         self,
         entity: Entity,
@@ -189,7 +428,21 @@ class Playground(
     ):
 
         entity.playground = self
-        entity.uid = self.get_uid()
+
+        # Entities added back, e.g. when restoring a state,
+        # keep their uid and the textures built from it,
+        # unless it is used or their anchor changed group
+        uid = getattr(entity, "uid", None)
+        anchor = entity.anchor
+
+        if (
+            uid is None
+            or uid in self.uids_to_entities
+            or (anchor is not None and entity.group != anchor.group)
+        ):
+            entity.uid = self.get_uid(entity)
+
+        self._invalidate_spaces()
 
         if not entity.name:
             entity.name = f"{entity.__class__.__name__}_{entity.uid}"
@@ -227,6 +480,7 @@ class Playground(
         # Once all attachements have been added, we can move the entity and fix the attachements
         if isinstance(entity, (Agent, Element)):
             assert coordinate is not None
+            self._placements[entity] = coordinate, allow_overlapping
             entity.move_to(coordinate, allow_overlapping)
             entity.fix_attached()
 
@@ -239,6 +493,12 @@ class Playground(
 
     def remove(self, entity):
 
+        self._invalidate_spaces()
+
+        # Entities of the initial placement can be added back by a soft reset
+        if self._initial_entities is None or entity not in self._initial_entities:
+            self._placements.pop(entity, None)
+
         if isinstance(entity, Agent):
             self.agents.remove(entity)
             self.name_to_agents.pop(entity.name)
@@ -265,6 +525,9 @@ class Playground(
             if hasattr(attached_entity, "limit") and attached_entity.limit is not None:
                 self.space.remove(attached_entity.limit)
 
+        if isinstance(entity, SensorMixin):
+            self.remove_sensor(entity)
+
         if isinstance(entity, (Agent, Element)):
             for view in self.views:
                 view.remove(entity)
@@ -8,6 +8,8 @@ if TYPE_CHECKING:
 
 import collections
 
+import numpy as np
+
 
 def merge_dicts(
     dict_1: collections.OrderedDict, dict_2: Union[dict, collections.OrderedDict]
@@ -38,6 +40,19 @@ def replace_values(d):
     return d
 
 
+def copy_action(action):
+    """
+    Copy a (nested) action, without sampling or rebuilding the action space.
+    """
+    if isinstance(action, dict):
+        return type(action)((k, copy_action(v)) for k, v in action.items())
+
+    if isinstance(action, np.ndarray):
+        return action.copy()
+
+    return action
+
+
 def zero_action_space(playground: Playground):
     action = playground.action_space.sample()
 
@@ -47,6 +62,6 @@ def zero_action_space(playground: Playground):
 
 
 def fill_action_space(playground: Playground, action: dict):
-    zero_action = zero_action_space(playground)
+    zero_action = playground.null_action
 
     return merge_dicts(zero_action, action)
@@ -0,0 +1,4 @@
+from .subproc import SubprocVectorPlayground
+from .sync import VectorPlayground
+
+__all__ = ["VectorPlayground", "SubprocVectorPlayground"]
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import pickle
+import traceback
+from copy import deepcopy
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence, Union
+
+import numpy as np
+from gymnasium.vector import VectorEnv
+from gymnasium.vector.utils import create_shared_memory, read_from_shared_memory
+
+if TYPE_CHECKING:
+    from spg.core.playground import Playground
+
+# Messages exchanged with the workers.
+# Steps only exchange these bytes, observations, actions and rewards
+# go through shared memory.
+_STEP = b"s"
+_RESET = b"r"
+_CLOSE = b"c"
+
+_OK = b"\x00"
+_INFOS = b"\x01"
+_ERROR = b"\x02"
+
+
+def _slice(views, start: int, stop: int):
+    if isinstance(views, dict):
+        return type(views)(
+            (key, _slice(value, start, stop)) for key, value in views.items()
+        )
+
+    if isinstance(views, tuple):
+        return tuple(_slice(value, start, stop) for value in views)
+
+    return views[start:stop]
+
+
+def _write(views, values):
+    if isinstance(views, dict):
+        for key, value in views.items():
+            _write(value, values[key])
+
+    elif isinstance(views, tuple):
+        for view, value in zip(views, values):
+            _write(view, value)
+
+    else:
+        np.copyto(views, values, casting="unsafe")
+
+
+def _get_spaces(playground_fn, kwargs):
+    playground = playground_fn(**kwargs)
+    return playground.observation_space, playground.action_space
+
+
+def _worker(
+    playground_fn,
+    kwargs,
+    start: int,
+    stop: int,
+    conn,
+    observation_space,
+    action_space,
+    shared_observations,
+    shared_actions,
+    shared_rewards,
+    shared_terminations,
+    num_envs: int,
+):
+    # pylint: disable=import-outside-toplevel
+    from spg.core.playground.vector.sync import VectorPlayground
+
+    try:
+        vector = VectorPlayground(playground_fn, stop - start, copy=False, **kwargs)
+
+        observations = _slice(
+            read_from_shared_memory(observation_space, shared_observations, num_envs),
+            start,
+            stop,
+        )
+        actions = _slice(
+            read_from_shared_memory(action_space, shared_actions, num_envs),
+            start,
+            stop,
+        )
+        rewards = np.frombuffer(shared_rewards, dtype=np.float64)[start:stop]
+        terminations = np.frombuffer(shared_terminations, dtype=np.bool_)[start:stop]
+
+    except Exception:  # pylint: disable=broad-except
+        conn.send_bytes(_ERROR + pickle.dumps(traceback.format_exc()))
+        conn.close()
+        return
+
+    conn.send_bytes(_OK)
+
+    while True:
+
+        command = conn.recv_bytes()
+
+        try:
+
+            if command == _STEP:
+                obs, rew, term, _, infos = vector.step(actions)
+                rewards[:] = rew
+                terminations[:] = term
+
+            elif command[:1] == _RESET:
+                seeds, options = pickle.loads(command[1:])
+                obs, infos = vector.reset(seed=seeds, options=options)
+
+            else:
+                break
+
+            _write(observations, obs)
+
+        except Exception:  # pylint: disable=broad-except
+            conn.send_bytes(_ERROR + pickle.dumps(traceback.format_exc()))
+            continue
+
+        if infos:
+            conn.send_bytes(_INFOS + pickle.dumps(infos))
+        else:
+            conn.send_bytes(_OK)
+
+    vector.close()
+    conn.close()
+
+
+class SubprocVectorPlayground(VectorEnv):
+    """
+    Steps N copies of a playground in worker processes.
+
+    Each worker runs a VectorPlayground over a contiguous range of the
+    playgrounds, in a headless window.
+    Observations, actions, rewards and terminations are exchanged through
+    shared memory preallocated from the spaces of the playground, so that
+    nothing is pickled when stepping, except infos of terminated playgrounds.
+
+    Only Box, Discrete, MultiBinary and MultiDiscrete spaces
+    (possibly nested in Dict and Tuple) can be shared.
+
+    playground_fn must be picklable, e.g. a Playground class
+    defined at module level.
+    """
+
+    def __init__(
+        self,
+        playground_fn: Callable[..., Playground],
+        num_envs: int,
+        num_workers: Optional[int] = None,
+        copy: bool = True,
+        context: str = "spawn",
+        **kwargs,
+    ):
+
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_envs))
+
+        ctx = mp.get_context(context)
+
+        # Workers don't need a display
+        headless = os.environ.get("PYGLET_HEADLESS")
+        os.environ["PYGLET_HEADLESS"] = "True"
+
+        try:
+            self._start(playground_fn, num_envs, num_workers, ctx, kwargs)
+
+        finally:
+            if headless is None:
+                del os.environ["PYGLET_HEADLESS"]
+            else:
+                os.environ["PYGLET_HEADLESS"] = headless
+
+        self.copy = copy
+
+        self._receive()
+
+    def _start(self, playground_fn, num_envs, num_workers, ctx, kwargs):
+
+        # Spaces are read from a playground built in another process,
+        # this one doesn't need a GL context
+        with ctx.Pool(1) as pool:
+            observation_space, action_space = pool.apply(
+                _get_spaces, (playground_fn, kwargs)
+            )
+
+        super().__init__(num_envs, observation_space, action_space)
+
+        self._shared_observations = create_shared_memory(
+            self.single_observation_space, n=num_envs, ctx=ctx
+        )
+        self._shared_actions = create_shared_memory(
+            self.single_action_space, n=num_envs, ctx=ctx
+        )
+        self._shared_rewards = ctx.RawArray("d", num_envs)
+        self._shared_terminations = ctx.RawArray("b", num_envs)
+
+        self._observations = read_from_shared_memory(
+            self.single_observation_space, self._shared_observations, num_envs
+        )
+        self._actions = read_from_shared_memory(
+            self.single_action_space, self._shared_actions, num_envs
+        )
+        self._rewards = np.frombuffer(self._shared_rewards, dtype=np.float64)
+        self._terminations = np.frombuffer(self._shared_terminations, dtype=np.bool_)
+
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self._ranges = list(zip(bounds[:-1], bounds[1:]))
+
+        self._conns = []
+        self._processes = []
+
+        for start, stop in self._ranges:
+            parent_conn, child_conn = ctx.Pipe()
+
+            process = ctx.Process(
+                target=_worker,
+                args=(
+                    playground_fn,
+                    kwargs,
+                    start,
+                    stop,
+                    child_conn,
+                    self.single_observation_space,
+                    self.single_action_space,
+                    self._shared_observations,
+                    self._shared_actions,
+                    self._shared_rewards,
+                    self._shared_terminations,
+                    num_envs,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+    def reset(
+        self,
+        *,
+        seed: Optional[Union[int, Sequence[Optional[int]]]] = None,
+        options: Optional[dict] = None,
+    ):
+
+        if seed is None:
+            seeds: Sequence[Optional[int]] = [None] * self.num_envs
+        elif isinstance(seed, int):
+            seeds = [seed + index for index in range(self.num_envs)]
+        else:
+            seeds = seed
+
+        for conn, (start, stop) in zip(self._conns, self._ranges):
+            conn.send_bytes(_RESET + pickle.dumps((list(seeds[start:stop]), options)))
+
+        infos = self._receive()
+
+        return self._get_observations(), infos
+
+    def step(self, actions):
+
+        _write(self._actions, actions)
+
+        for conn in self._conns:
+            conn.send_bytes(_STEP)
+
+        infos = self._receive()
+
+        return (
+            self._get_observations(),
+            np.copy(self._rewards),
+            np.copy(self._terminations),
+            np.zeros(self.num_envs, dtype=np.bool_),
+            infos,
+        )
+
+    def close_extras(self, **kwargs):
+
+        for conn in self._conns:
+            try:
+                conn.send_bytes(_CLOSE)
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+            conn.close()
+
+        for process in self._processes:
+            process.join()
+
+    def _receive(self):
+
+        infos: dict = {}
+        errors: List[str] = []
+
+        for conn, (start, stop) in zip(self._conns, self._ranges):
+
+            message = conn.recv_bytes()
+
+            if message[:1] == _ERROR:
+                errors.append(pickle.loads(message[1:]))
+
+            elif message[:1] == _INFOS:
+                worker_infos = pickle.loads(message[1:])
+                for index in range(stop - start):
+                    info = {
+                        key: value[index]
+                        for key, value in worker_infos.items()
+                        if not key.startswith("_") and worker_infos[f"_{key}"][index]
+                    }
+                    if info:
+                        infos = self._add_info(infos, info, start + index)
+
+        if errors:
+            raise RuntimeError("Error in worker:\n" + "\n".join(errors))
+
+        return infos
+
+    def _get_observations(self):
+        return deepcopy(self._observations) if self.copy else self._observations
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import math
+from copy import deepcopy
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import arcade
+import numpy as np
+from arcade import Window
+from gymnasium.vector import VectorEnv
+from gymnasium.vector.utils import concatenate, create_empty_array, iterate
+from pyglet import gl
+
+from spg.core.playground.manager.profiling import ProfilingManager
+from spg.core.sensor.ray.ray_compute import RayCompute
+
+if TYPE_CHECKING:
+    from spg.core.entity import Entity
+    from spg.core.playground import Playground
+    from spg.core.view import View
+
+
+def _blit(src, dst, offset: Tuple[int, int]):
+    """Copies a framebuffer into the region of another one starting at offset."""
+
+    offset_x, offset_y = offset
+
+    # Blits are clipped by the scissor box of the framebuffer activated
+    with dst.activate():
+
+        gl.glBindFramebuffer(gl.GL_READ_FRAMEBUFFER, src.glo)
+        gl.glBlitFramebuffer(
+            0,
+            0,
+            src.width,
+            src.height,
+            offset_x,
+            offset_y,
+            offset_x + src.width,
+            offset_y + src.height,
+            gl.GL_COLOR_BUFFER_BIT,
+            gl.GL_NEAREST,
+        )
+
+        dst.use(force=True)
+
+
+class ViewAtlas:
+    """
+    Views of several playgrounds, tiled in a single texture.
+    Each view is copied in its own region of the texture,
+    so that all of them can be sampled by a single compute dispatch.
+
+    Views are rendered as usual, and only copied when their version changed.
+    Their static layers are tiled in the same way in a static texture,
+    and the static version of the atlas changes when one of them changed.
+    """
+
+    def __init__(self, ctx, views: List[View]):
+
+        self._ctx = ctx
+        self.views = views
+
+        first = views[0]
+        for view in views:
+            if (view.size, view.scale, view.center) != (
+                first.size,
+                first.scale,
+                first.center,
+            ):
+                raise ValueError("Views of an atlas must have same size, scale, center")
+
+        self.center = first.center
+        self.scale = first.scale
+        self.width, self.height = first.size
+
+        max_size = ctx.info.MAX_TEXTURE_SIZE
+        n_cols = max(1, min(len(views), max_size // self.width))
+        n_rows = math.ceil(len(views) / n_cols)
+
+        if n_rows * self.height > max_size:
+            raise ValueError("Too many views to fit in a single texture")
+
+        self.offsets = [
+            ((index % n_cols) * self.width, (index // n_cols) * self.height)
+            for index in range(len(views))
+        ]
+
+        self._fbo, self._static_fbo = [
+            ctx.framebuffer(
+                color_attachments=[
+                    ctx.texture(
+                        (n_cols * self.width, n_rows * self.height),
+                        components=4,
+                        wrap_x=ctx.CLAMP_TO_BORDER,  # type: ignore
+                        wrap_y=ctx.CLAMP_TO_BORDER,  # type: ignore
+                        filter=(ctx.NEAREST, ctx.NEAREST),
+                    ),
+                ]
+            )
+            for _ in range(2)
+        ]
+
+        # Versions of the views, and of their static layers, copied in the atlas
+        self._versions = [-1] * len(views)
+        self._static_versions = [-1] * len(views)
+
+        self.static_version = 0
+
+    @property
+    def texture(self):
+        return self._fbo.color_attachments[0]
+
+    @property
+    def static_texture(self):
+        return self._static_fbo.color_attachments[0]
+
+    @property
+    def size(self):
+        """Size of the textures, holding all the views."""
+        return self._fbo.size
+
+    @property
+    def overlay_sprites(self) -> Dict[Entity, arcade.Sprite]:
+        """
+        Sprites drawn above the static layers of all the views,
+        in the coordinates of their view.
+        """
+
+        sprites: Dict[Entity, arcade.Sprite] = {}
+
+        for view in self.views:
+            sprites.update(view.overlay_sprites)
+
+        return sprites
+
+    def update(self):
+
+        self._ctx.projection_2d = 0, self.width, 0, self.height
+
+        for index, (view, offset) in enumerate(zip(self.views, self.offsets)):
+
+            if not view.updated:
+                view.update()
+
+            if view.version != self._versions[index]:
+                _blit(view._fbo, self._fbo, offset)
+                self._versions[index] = view.version
+
+            if view.static_version != self._static_versions[index]:
+                _blit(view._static_fbo, self._static_fbo, offset)
+                self._static_versions[index] = view.static_version
+                self.static_version += 1
+
+
+class VectorRayCompute(RayCompute):
+    """
+    Computes the ray sensors of all the playgrounds of a VectorPlayground
+    in a single dispatch, by sampling the views atlases.
+    """
+
+    playground: VectorPlayground
+
+    @property
+    def id_view(self):
+        return self.playground.id_atlas
+
+    @property
+    def color_view(self):
+        return self.playground.color_atlas
+
+    def refresh(self):
+        """Collect the sensors of all playgrounds, e.g. after a reset."""
+
+        sensors = []
+        view_offsets = []
+
+        for playground, offset in zip(
+            self.playground.playgrounds, self.id_view.offsets
+        ):
+            sensors.extend(playground.ray_compute.sensors)
+            view_offsets.extend([offset] * len(playground.ray_compute.sensors))
+
+        if sensors == self.sensors:
+            return
+
+        self.sensors = sensors
+        self.view_offsets = view_offsets
+        self._requested = None
+
+
+class VectorPlayground(VectorEnv, ProfilingManager):
+    """
+    Steps N copies of a playground in the same process.
+
+    All playgrounds share the same window and GL context.
+    Their id and color views are rendered in two atlases,
+    and the ray sensors of all playgrounds are computed in one dispatch.
+
+    Playgrounds are reset automatically when they terminate,
+    in which case infos hold their final observation.
+
+    Batched observations are indexed by agent and entity names,
+    which must therefore be the same in all playgrounds and across resets.
+
+    Rewards are the sum of the rewards of all the agents of a playground.
+
+    Keyword arguments are passed to playground_fn.
+    With profile=True, the playgrounds and the batched sensors are profiled.
+    """
+
+    def __init__(
+        self,
+        playground_fn: Callable[..., Playground],
+        num_envs: int,
+        copy: bool = True,
+        **kwargs,
+    ):
+
+        ProfilingManager.__init__(self, **kwargs)
+
+        self._window = Window(1, 1, visible=False, antialiasing=False)  # type: ignore
+
+        self.playgrounds: List[Playground] = [
+            playground_fn(window=self._window, **kwargs) for _ in range(num_envs)
+        ]
+
+        super().__init__(
+            num_envs,
+            self.playgrounds[0].observation_space,
+            self.playgrounds[0].action_space,
+        )
+
+        self.copy = copy
+        self._observations = create_empty_array(
+            self.single_observation_space, n=self.num_envs, fn=np.zeros
+        )
+
+        # Batched sensors require compute shaders
+        self.ray_compute: Optional[VectorRayCompute] = None
+
+        if self.playgrounds[0].ray_compute.use_shader:
+            self.id_atlas = ViewAtlas(
+                self.ctx, [playground.id_view for playground in self.playgrounds]
+            )
+            self.color_atlas = ViewAtlas(
+                self.ctx, [playground.color_view for playground in self.playgrounds]
+            )
+            self.ray_compute = VectorRayCompute(
+                self, distance_field=self.playgrounds[0].ray_compute.distance_field
+            )
+            self.ray_compute.refresh()
+
+    @property
+    def window(self):
+        return self._window
+
+    @property
+    def ctx(self):
+        return self._window.ctx
+
+    def reset(
+        self,
+        *,
+        seed: Optional[Union[int, Sequence[Optional[int]]]] = None,
+        options: Optional[dict] = None,
+    ):
+
+        if seed is None:
+            seeds: Sequence[Optional[int]] = [None] * self.num_envs
+        elif isinstance(seed, int):
+            seeds = [seed + index for index in range(self.num_envs)]
+        else:
+            seeds = seed
+
+        observations = []
+        infos: dict = {}
+
+        for index, (playground, playground_seed) in enumerate(
+            zip(self.playgrounds, seeds)
+        ):
+            observation, info = playground.reset(seed=playground_seed, options=options)
+            observations.append(observation)
+            infos = self._add_info(infos, info, index)
+
+        if self.ray_compute:
+            self.ray_compute.refresh()
+
+        return self._batch_observations(observations), infos
+
+    def step(self, actions):
+
+        with self.profiler.phase("step"):
+            return self._step(actions)
+
+    def _step(self, actions):
+
+        for playground, action in zip(
+            self.playgrounds, iterate(self.action_space, actions)
+        ):
+            playground._update(action)
+
+        self._update_sensors()
+
+        observations = [
+            playground._collect_observation() for playground in self.playgrounds
+        ]
+
+        rewards = np.array(
+            [
+                sum(playground._compute_reward().values())
+                for playground in self.playgrounds
+            ],
+            dtype=np.float64,
+        )
+
+        terminations = np.array(
+            [playground._terminated for playground in self.playgrounds], dtype=np.bool_
+        )
+        truncations = np.zeros(self.num_envs, dtype=np.bool_)
+
+        infos: dict = {}
+
+        for index in np.flatnonzero(terminations):
+
+            final_observation = observations[index]
+            observations[index], info = self.playgrounds[index].reset()
+
+            info["final_observation"] = final_observation
+            info["final_info"] = {}
+            infos = self._add_info(infos, info, index)
+
+        if terminations.any() and self.ray_compute:
+            self.ray_compute.refresh()
+
+        return (
+            self._batch_observations(observations),
+            rewards,
+            terminations,
+            truncations,
+            infos,
+        )
+
+    def _update_sensors(self):
+
+        if not self.ray_compute:
+            for playground in self.playgrounds:
+                playground.update_sensors()
+            return
+
+        # Another playground may have made its own window current
+        self._window.switch_to()
+
+        self.ray_compute.update_active_sensors()
+
+        if not self.ray_compute.due_indices:
+            return
+
+        with self.profiler.phase("view_update"):
+
+            self.id_atlas.update()
+
+            if self.ray_compute.n_color_due:
+                self.color_atlas.update()
+
+        with self.profiler.phase("ray_compute"):
+            self.ray_compute.update_sensors()
+
+    def _batch_observations(self, observations):
+
+        self._observations = concatenate(
+            self.single_observation_space, observations, self._observations
+        )
+
+        return deepcopy(self._observations) if self.copy else self._observations
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+from arcade.gl import Buffer, ComputeShader, Context, Framebuffer
+from pyglet import gl
+
+
+def read_buffer_into(buffer: Buffer, array: np.ndarray):
+    """Reads the start of a GL buffer into a contiguous array, in place."""
+
+    # Writes of compute shaders to the buffer must be visible to the read
+    gl.glMemoryBarrier(gl.GL_BUFFER_UPDATE_BARRIER_BIT)
+
+    gl.glBindBuffer(gl.GL_ARRAY_BUFFER, buffer.glo)
+    gl.glGetBufferSubData(gl.GL_ARRAY_BUFFER, 0, array.nbytes, array.ctypes.data)
+
+
+def read_framebuffer_into(framebuffer: Framebuffer, array: np.ndarray):
+    """Reads the RGB pixels of a framebuffer into an array (height, width, 3),"""
+
+    height, width, _ = array.shape
+
+    with framebuffer:
+        gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
+        gl.glReadPixels(
+            0,
+            0,
+            width,
+            height,
+            gl.GL_RGB,
+            gl.GL_UNSIGNED_BYTE,
+            array.ctypes.data,
+        )
+
+
+def storage_barrier():
+    """Makes writes of compute shaders to storage buffers visible to later ones."""
+
+    gl.glMemoryBarrier(gl.GL_SHADER_STORAGE_BARRIER_BIT)
+
+
+def compute_program(ctx: Context, source: str) -> ComputeShader:
+    """
+    Compute shader compiled from a source, cached for the lifetime of the context.
+    Playgrounds sharing a context share the programs with the same source.
+    """
+
+    programs = ctx.__dict__.setdefault("_spg_programs", {})
+
+    if source not in programs:
+        programs[source] = ctx.compute_shader(source=source)
+
+    return programs[source]
@@ -0,0 +1,90 @@
+            # version 440
+
+            layout(local_size_x=16, local_size_y=16) in;
+
+            // Occupied texels are those with a non-zero id
+            layout(binding = 0) uniform sampler2D id_texture;
+
+            // 0: distances along the columns, 1: distances
+            uniform int stage;
+
+            // Distance to the nearest occupied texel of the same column
+            layout(std430, binding=10) buffer column_distances
+            {
+                float distances[];
+            } Columns;
+
+            layout(std430, binding=8) buffer distance_field
+            {
+                float distances[];
+            } DistanceField;
+
+            const float MAX_DISTANCE = VIEW_W + VIEW_H;
+
+            bool occupied(int x, int y)
+            {
+                vec4 id_color = texelFetch(id_texture, ivec2(x, y), 0);
+                return any(greaterThan(round(id_color.xyz*255), vec3(0)));
+            }
+
+            void main() {
+
+                ivec2 texel = ivec2(gl_GlobalInvocationID.xy);
+
+                if (stage == 0)
+                {
+                    // One invocation per column, sweeping it up then down
+                    int x = texel.x;
+
+                    if (x >= VIEW_W || texel.y > 0)
+                    {
+                        return;
+                    }
+
+                    float distance = MAX_DISTANCE;
+
+                    for(int y=0; y<VIEW_H; y++)
+                    {
+                        distance = occupied(x, y) ? 0 : min(distance + 1, MAX_DISTANCE);
+                        Columns.distances[y*VIEW_W + x] = distance;
+                    }
+
+                    distance = MAX_DISTANCE;
+
+                    for(int y=VIEW_H-1; y>=0; y--)
+                    {
+                        int index = y*VIEW_W + x;
+                        distance = min(Columns.distances[index], distance + 1);
+                        Columns.distances[index] = distance;
+                    }
+
+                    return;
+                }
+
+                if (texel.x >= VIEW_W || texel.y >= VIEW_H)
+                {
+                    return;
+                }
+
+                // Nearest occupied texel of the columns closer than the best one
+                int row = texel.y*VIEW_W;
+                float best = Columns.distances[row + texel.x];
+
+                for(int dx=1; dx<VIEW_W && dx<best; dx++)
+                {
+                    if (texel.x - dx >= 0)
+                    {
+                        float dy = Columns.distances[row + texel.x - dx];
+                        best = min(best, length(vec2(dx, dy)));
+                    }
+
+                    if (texel.x + dx < VIEW_W)
+                    {
+                        float dy = Columns.distances[row + texel.x + dx];
+                        best = min(best, length(vec2(dx, dy)));
+                    }
+                }
+
+                DistanceField.distances[row + texel.x] = min(best, MAX_DISTANCE);
+
+            }
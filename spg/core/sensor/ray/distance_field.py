@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import math
+from os import path
+from typing import TYPE_CHECKING, Tuple
+
+from spg.core.readback import compute_program, storage_barrier
+
+if TYPE_CHECKING:
+    from arcade.gl import Context, Texture
+
+# Size of the work groups, in texels
+GROUP_SIZE = 16
+
+
+class DistanceField:
+    """
+    Distance, in texels, from each texel of an id texture
+    to the nearest texel with a non-zero id.
+
+    Computed exactly on the GPU, in two passes: distances along the columns,
+    then the nearest of the columns for each texel.
+    Distances are never overestimated, so that rays can't jump over entities.
+    Stored in a storage buffer, row by row.
+    """
+
+    def __init__(self, ctx: Context, size: Tuple[int, int]):
+
+        self.ctx = ctx
+        self.width, self.height = size
+
+        n_texels = self.width * self.height
+
+        self.buffer = ctx.buffer(reserve=4 * n_texels)
+        self._column_buffer = ctx.buffer(reserve=4 * n_texels)
+
+        shader_dir = path.abspath(path.join(__file__, "../"))
+
+        with open(
+            shader_dir + "/distance_field.glsl", "rt", encoding="utf-8"
+        ) as f_distance:
+            source = f_distance.read()
+
+        source = source.replace("VIEW_W", str(self.width))
+        source = source.replace("VIEW_H", str(self.height))
+        self._shader = compute_program(ctx, source)
+
+        # Version of the texture computed, see View.static_version
+        self.version = -1
+
+    def update(self, texture: Texture):
+
+        texture.use(0)
+
+        self._column_buffer.bind_to_storage_buffer(binding=10)
+        self.buffer.bind_to_storage_buffer(binding=8)
+
+        # One invocation per column
+        group_x = math.ceil(self.width / GROUP_SIZE)
+        self._run(stage=0, group_x=group_x, group_y=1)
+
+        group_y = math.ceil(self.height / GROUP_SIZE)
+        self._run(stage=1, group_x=group_x, group_y=group_y)
+
+    def _run(self, stage: int, group_x: int, group_y: int):
+
+        self._shader["stage"] = stage
+        self._shader.run(group_x=group_x, group_y=group_y)
+
+        storage_barrier()
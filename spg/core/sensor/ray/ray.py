@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from abc import abstractmethod
 from collections import namedtuple
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
 
 import arcade
 import numpy as np
@@ -19,6 +19,38 @@ Detection = namedtuple("Detection", "entity, distance, angle")
 # View Pos 2, Abs Env Position 2, Rel Position 2, Sensor center on view 2, ID 1, Distance 1, Color 3
 SIZE_OUTPUT_BUFFER = 13
 
+# Fields of the hitpoints, named as in the HitPoint struct of the shaders
+HITPOINT_FIELDS = (
+    "view_pos_x",
+    "view_pos_y",
+    "env_pos_x",
+    "env_pos_y",
+    "rel_pos_x",
+    "rel_pos_y",
+    "sensor_x_on_view",
+    "sensor_y_on_view",
+    "id",
+    "dist",
+    "r",
+    "g",
+    "b",
+)
+
+GREY_WEIGHTS = np.array([0.299, 0.587, 0.114])
+
+# Fields computed from the hitpoints: GLSL expression of the HitPoint hpt
+# and of the range of the sensor, and its numpy equivalent
+DERIVED_FIELDS: Dict[str, Tuple[str, Callable[[np.ndarray, RaySensor], np.ndarray]]] = {
+    "grey": (
+        "0.299*hpt.r + 0.587*hpt.g + 0.114*hpt.b",
+        lambda hitpoints, _: np.dot(hitpoints[:, 10:13], GREY_WEIGHTS),
+    ),
+    "normalized_dist": (
+        "hpt.dist/range",
+        lambda hitpoints, sensor: hitpoints[:, 9] / sensor.max_range,
+    ),
+}
+
 
 class RaySensor(SensorMixin):
     """
@@ -27,8 +59,17 @@ class RaySensor(SensorMixin):
     """
 
     angle: float
+    anchor: Optional[Entity]
     playground: Playground
 
+    # Sensors which don't use the color of the hitpoints
+    # don't require the color view to be rendered
+    uses_color = True
+
+    # Fields of the hitpoints used by the sensor, see HITPOINT_FIELDS
+    # and DERIVED_FIELDS. Only these are computed and read from the GPU.
+    hitpoint_fields: Tuple[str, ...] = HITPOINT_FIELDS
+
     def __init__(
         self,
         fov: float,
@@ -36,11 +77,31 @@ class RaySensor(SensorMixin):
         max_range: float,
         invisible_entities: Optional[Union[List[Entity], Entity]] = None,
         spatial_resolution: float = 1,
+        update_period: int = 1,
+        compact_output: bool = False,
+        invisible_group: bool = True,
         **kwargs,
     ):
 
         super().__init__(**kwargs)
 
+        for field in self.hitpoint_fields:
+            if field not in HITPOINT_FIELDS and field not in DERIVED_FIELDS:
+                raise ValueError(f"Unknown hitpoint field {field}")
+
+        # With compact_output, hitpoints only have the fields used by the sensor.
+        # All fields are kept by default, to draw the rays.
+        if compact_output:
+            self.output_fields = tuple(self.hitpoint_fields)
+        else:
+            self.output_fields = HITPOINT_FIELDS + tuple(
+                field for field in self.hitpoint_fields if field in DERIVED_FIELDS
+            )
+
+        self._field_columns = {
+            field: column for column, field in enumerate(self.output_fields)
+        }
+
         # Sensor characteristics
         self.spatial_resolution = spatial_resolution
         self.fov = fov
@@ -57,6 +118,18 @@ class RaySensor(SensorMixin):
         if self.max_range < 0:
             raise ValueError("range must be more than 1")
 
+        # Sensors are computed every update_period units of time,
+        # and keep their last observation in between.
+        # Age is the number of units of time since the last observation.
+        if update_period < 1:
+            raise ValueError("update_period must be at least 1")
+        self.update_period = update_period
+        self.age = update_period
+
+        # Entities of the group of the sensor, i.e. the parts of its agent,
+        # are invisible as a whole, without being listed
+        self.invisible_group = invisible_group
+
         # Invisible elements
         invisible_entities = (
             []
@@ -71,8 +144,9 @@ class RaySensor(SensorMixin):
 
         self._invisible_entities: List[Entity] = []
 
-        self._hitpoints = np.zeros((self.resolution, SIZE_OUTPUT_BUFFER))
+        self._hitpoints = np.zeros((self.resolution, len(self.output_fields)))
         self._observation = self.observation_space.sample() * 0
+        self._observation_bound = False
         self.updated = False
 
         self.invisible_changed = False
@@ -95,6 +169,22 @@ class RaySensor(SensorMixin):
     def invisible_ids(self):
         return [ent.uid for ent in self._invisible_entities]
 
+    @property
+    def invisible_group_id(self) -> Optional[int]:
+        """Group of the entities invisible to the sensor, if invisible_group."""
+
+        if not self.invisible_group or self.anchor is None:
+            return None
+
+        return self.anchor.group
+
+    @property
+    def listed_invisible_ids(self):
+        """Ids of the invisible entities outside of the group of the sensor."""
+
+        group = self.invisible_group_id
+        return [ent.uid for ent in self._invisible_entities if ent.group != group]
+
     @property
     def invisible_entities(self):
         return self._invisible_entities
@@ -104,6 +194,10 @@ class RaySensor(SensorMixin):
         ...
 
     def draw(self):
+
+        if self.output_fields[:SIZE_OUTPUT_BUFFER] != HITPOINT_FIELDS:
+            raise ValueError("Drawing rays requires compact_output=False")
+
         view_xy = self._hitpoints[:, :2]
         center_xy = self._hitpoints[:, 6:8]
         color = self._get_ray_colors()
@@ -133,15 +227,44 @@ class RaySensor(SensorMixin):
         y = self.max_range * np.sin(angles)
         return np.vstack((x, y))
 
+    @property
+    def due(self):
+        return self.age >= self.update_period
+
     def pre_step(self):
         self.updated = False
         self._observation *= 0
 
+    def pack_hitpoints(self, hitpoints: np.ndarray):
+        """Output fields of hitpoints with all the fields of HITPOINT_FIELDS."""
+
+        columns = []
+
+        for field in self.output_fields:
+            if field in DERIVED_FIELDS:
+                _, derive = DERIVED_FIELDS[field]
+                columns.append(derive(hitpoints, self))
+            else:
+                columns.append(hitpoints[:, HITPOINT_FIELDS.index(field)])
+
+        return np.stack(columns, axis=1)
+
+    def _field(self, *fields: str):
+        """Column of the hitpoints with a field, or columns with several fields."""
+
+        columns = [self._field_columns[field] for field in fields]
+
+        if len(columns) == 1:
+            return self._hitpoints[:, columns[0]]
+
+        return self._hitpoints[:, columns]
+
     def update_observations(self, hitpoints: np.ndarray):
         """
         Update the observations of the sensor.
         Hitpoints are the points where the rays hit something.
-        They are of size 13 composed of the following information:
+        They have the output fields of the sensor, in this order.
+        With all fields, they are of size 13 composed of the following information:
         - View Pos 2
         - Abs Env Position 2
         - Rel Position 2
@@ -149,11 +272,36 @@ class RaySensor(SensorMixin):
         - ID 1
         - Distance 1
         - Color 3
+        Hitpoints are copied into the buffer of the sensor, allocated once.
+        """
+
+        np.copyto(self._hitpoints, hitpoints)
+
+        observation = self._convert_hitpoints_to_observation()
+
+        if self._observation_bound:
+            np.copyto(self._observation, observation, casting="unsafe")
+        else:
+            self._observation = observation
+
+        self.updated = True
+        self.age = 0
+
+    def bind_observation(self, target: np.ndarray):
+        """
+        Observations are written in target from now on,
+        e.g. a slice of the buffer of an ObservationLayout.
         """
 
-        self._hitpoints = hitpoints
-        self._observation = self._convert_hitpoints_to_observation()
+        np.copyto(target, self._observation, casting="unsafe")
+        self._observation = target
+        self._observation_bound = True
+
+    def keep_observations(self):
+        """Observations are still valid, e.g. if nothing moved since computed."""
+
         self.updated = True
+        self.age = 0
 
     @abstractmethod
     def _convert_hitpoints_to_observation(self):
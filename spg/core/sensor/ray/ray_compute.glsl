@@ -0,0 +1,438 @@
+            # version 440
+
+            // Rays of all the sensors computed are tiled in work groups of fixed size
+            layout(local_size_x=WORK_GROUP_SIZE) in;
+
+            // Rays jump over empty space by at least MIN_JUMP texels,
+            // and stop JUMP_MARGIN texels before the nearest static entity.
+            // Distances are between texel centers, the margin covers
+            // the position of the rays inside the texels.
+            const float MIN_JUMP = 2;
+            const float JUMP_MARGIN = 3;
+
+            struct HitPoint
+            {
+                // Position of hitpoint on view
+                float view_pos_x;
+                float view_pos_y;
+
+                // Position of hitpoint in env
+                float env_pos_x;
+                float env_pos_y;
+
+                // Position of hitpoint relative to sensor
+                float rel_pos_x;
+                float rel_pos_y;
+
+                // Position of sensor on view
+                float sensor_x_on_view;
+                float sensor_y_on_view;
+
+                float id;
+                float dist;
+
+                float r;
+                float g;
+                float b;
+            };
+
+            struct SensorParam
+            {
+                float range;
+                float fov;
+                float n_rays;
+                float n_points;
+
+                // Group of the entities invisible to the sensor, -1 if none
+                float group;
+            };
+
+            struct Coordinate
+            {
+                float pos_x;
+                float pos_y;
+                float angle;
+
+                // Origin of the sensor's view in the texture
+                float view_offset_x;
+                float view_offset_y;
+            };
+
+            // Textures are bound to fixed units
+            layout(binding = 0) uniform sampler2D id_texture;
+            layout(binding = 1) uniform sampler2D color_texture;
+
+            layout(std430, binding = 2) buffer sparams
+            {
+                SensorParam sensor_params[];
+            } Params;
+
+            layout(std430, binding = 3) buffer coordinates
+            {
+                Coordinate coords[];
+            } In;
+
+            // Fields used by each sensor, for each of its rays
+            layout(std430, binding = 4) buffer outputs
+            {
+                float values[];
+            } Out;
+
+            // Offset of the outputs of each sensor, and index of their layout
+            layout(std430, binding=12) buffer output_params
+            {
+                ivec2 offsets_layouts[];
+            } OutputParams;
+
+            // Invisible ids of each sensor outside of its group, padded with 0 to max_invisible ids
+            layout(std430, binding=5) buffer invisible_ids
+            {
+                int inv_ids[];
+            }InvIDs;
+
+            uniform int max_invisible;
+
+            // Sensors using colors come first
+            uniform int n_color_sensors;
+
+            // Distance to the static layer, used if USE_DISTANCE_FIELD.
+            // Rows of FIELD_W texels, of the texture sampled with the view offsets.
+            layout(std430, binding=8) buffer distance_field
+            {
+                float distances[];
+            } DistanceField;
+
+            // Circles bounding the sprites drawn above the static layer: x, y, radius, id
+            layout(std430, binding=9) buffer overlay
+            {
+                int n_circles;
+                vec4 circles[];
+            } Overlay;
+
+            // Sensors computed, and the index of their first ray among all rays computed
+            layout(std430, binding=7) buffer sensor_indices
+            {
+                uvec2 indices[];
+            } Indices;
+
+            uniform int n_computed;
+            uniform int n_computed_rays;
+
+            layout(std430, binding=6) buffer view_params
+            {
+                float center_view_x;
+                float center_view_y;
+                float w;
+                float h;
+                float zoom;
+
+            }ViewParams;
+
+            bool is_invisible(int i_sensor, int group, int id)
+            {
+                // Entities of a group share the upper bits of their ids
+                if ((id >> MEMBER_BITS) == group)
+                {
+                    return true;
+                }
+
+                for(int ind_inv=0; ind_inv<max_invisible; ind_inv++)
+                {
+                    int inv_id = InvIDs.inv_ids[i_sensor*max_invisible + ind_inv];
+
+                    if (inv_id == 0)
+                    {
+                        return false;
+                    }
+
+                    if (inv_id == id)
+                    {
+                        return true;
+                    }
+                }
+
+                return false;
+            }
+
+            // Ray parameter where the ray enters the first visible overlay circle, 2 if none
+            float overlay_entry(int i_sensor, int group, vec2 center, vec2 dir)
+            {
+                float t_entry = 2;
+
+                for(int i=0; i<Overlay.n_circles; i++)
+                {
+                    vec4 circle = Overlay.circles[i];
+
+                    if (is_invisible(i_sensor, group, int(circle.w)))
+                    {
+                        continue;
+                    }
+
+                    vec2 to_center = center - circle.xy;
+                    float a = dot(dir, dir);
+                    float b = dot(to_center, dir);
+                    float c = dot(to_center, to_center) - circle.z*circle.z;
+                    float discriminant = b*b - a*c;
+
+                    if (discriminant < 0 || a == 0)
+                    {
+                        continue;
+                    }
+
+                    float root = sqrt(discriminant);
+
+                    // Circle behind the ray
+                    if (-b + root < 0)
+                    {
+                        continue;
+                    }
+
+                    t_entry = min(t_entry, max((-b - root)/a, 0));
+                }
+
+                return t_entry;
+            }
+
+            vec2 next_boundaries(ivec2 texel, vec2 center, vec2 dir, ivec2 step_dir)
+            {
+                return vec2(
+                    dir.x != 0 ? (texel.x + max(step_dir.x, 0) - center.x) / dir.x : 1e30,
+                    dir.y != 0 ? (texel.y + max(step_dir.y, 0) - center.y) / dir.y : 1e30);
+            }
+
+            void main() {
+
+                // The last work group is not full
+                int i_computed_ray = int(gl_GlobalInvocationID.x);
+
+                if (i_computed_ray >= n_computed_rays)
+                {
+                    return;
+                }
+
+                // Sensor of the ray: the last one starting before it
+                int low = 0;
+                int high = n_computed - 1;
+
+                while (low < high)
+                {
+                    int middle = (low + high + 1) / 2;
+
+                    if (int(Indices.indices[middle].y) <= i_computed_ray)
+                    {
+                        low = middle;
+                    }
+                    else
+                    {
+                        high = middle - 1;
+                    }
+                }
+
+                int i_sensor = int(Indices.indices[low].x);
+                int i_ray = i_computed_ray - int(Indices.indices[low].y);
+
+                // SENSOR PARAMETERS
+                SensorParam s_param = Params.sensor_params[i_sensor];
+                float range = s_param.range;
+                float fov = s_param.fov;
+                float n_rays = s_param.n_rays;
+                int group = int(s_param.group);
+
+                // VIEW PARAMETERS
+                float center_view_x = ViewParams.center_view_x;
+                float center_view_y = ViewParams.center_view_y;
+                float zoom = ViewParams.zoom;
+                float view_w = ViewParams.w;
+                float view_h = ViewParams.h;
+
+                // SENSOR POSITION
+                Coordinate in_coord = In.coords[i_sensor];
+                float sensor_pos_x = in_coord.pos_x;
+                float sensor_pos_y = in_coord.pos_y;
+
+                float sensor_x_on_view = (sensor_pos_x - center_view_x)*zoom + view_w/2;
+                float sensor_y_on_view = (sensor_pos_y - center_view_y)*zoom + view_h/2;
+
+                float angle = in_coord.angle;
+
+                ivec2 view_offset = ivec2(in_coord.view_offset_x, in_coord.view_offset_y);
+
+                // CENTER AND END OF RAY
+                vec2 center = vec2(sensor_x_on_view, sensor_y_on_view);
+                vec2 end_pos = vec2(
+                        sensor_x_on_view + range*cos(angle -fov/2 + i_ray*fov/(n_rays-1))*zoom,
+                        sensor_y_on_view + range*sin(angle -fov/2 + i_ray*fov/(n_rays-1))*zoom);
+
+                vec2 dir = end_pos - center;
+
+                // CLIP THE RAY TO THE VIEW
+                // Nothing can be detected outside of the view
+                float t_start = 0;
+                float t_end = 1;
+
+                for(int axis=0; axis<2; axis++)
+                {
+                    float size = axis == 0 ? view_w : view_h;
+
+                    if (dir[axis] == 0)
+                    {
+                        if (center[axis] < 0 || center[axis] >= size)
+                        {
+                            t_end = -1;
+                        }
+                        continue;
+                    }
+
+                    float t_0 = (0 - center[axis]) / dir[axis];
+                    float t_1 = (size - center[axis]) / dir[axis];
+
+                    t_start = max(t_start, min(t_0, t_1));
+                    t_end = min(t_end, max(t_0, t_1));
+                }
+
+                // OUTPUTS
+                ivec2 sample_point = ivec2(end_pos);
+                int id_out = 0;
+                bool sampled = false;
+
+                // Ray cast, visiting each texel crossed by the ray once
+                if (t_start <= t_end)
+                {
+                    vec2 start = center + t_start*dir;
+
+                    ivec2 view_size = ivec2(view_w, view_h);
+                    ivec2 texel = clamp(ivec2(floor(start)), ivec2(0), view_size - 1);
+                    ivec2 texel_end = clamp(ivec2(floor(center + t_end*dir)), ivec2(0), view_size - 1);
+
+                    ivec2 step_dir = ivec2(sign(dir));
+
+                    // Increase of t to cross a texel, and t at the next texel boundaries
+                    vec2 t_delta = vec2(
+                        dir.x != 0 ? abs(1/dir.x) : 1e30,
+                        dir.y != 0 ? abs(1/dir.y) : 1e30);
+
+                    vec2 t_max = next_boundaries(texel, center, dir, step_dir);
+
+                    // Invisible entity found last, often hit by successive texels
+                    int last_invisible = 0;
+
+                    // Rays jump over the empty space around static entities
+                    // until they might enter an entity drawn above them
+                    float t = t_start;
+                    float t_overlay = USE_DISTANCE_FIELD == 1 ? overlay_entry(i_sensor, group, center, dir) : 0;
+                    float ray_length = length(dir);
+
+                    int n_texels = abs(texel_end.x - texel.x) + abs(texel_end.y - texel.y) + 1;
+
+                    for(int i=0; i<n_texels; i++)
+                    {
+                        if (t > t_end || any(lessThan(texel, ivec2(0))) || any(greaterThanEqual(texel, view_size)))
+                        {
+                            break;
+                        }
+
+                        if (t < t_overlay)
+                        {
+                            ivec2 field_texel = texel + view_offset;
+                            float distance = DistanceField.distances[field_texel.y*FIELD_W + field_texel.x];
+
+                            if (distance >= MIN_JUMP + JUMP_MARGIN)
+                            {
+                                t = min(t + (distance - JUMP_MARGIN)/ray_length, t_overlay);
+
+                                if (t > t_end)
+                                {
+                                    sample_point = texel_end;
+                                    sampled = true;
+                                    break;
+                                }
+
+                                texel = clamp(ivec2(floor(center + t*dir)), ivec2(0), view_size - 1);
+                                t_max = next_boundaries(texel, center, dir, step_dir);
+                                continue;
+                            }
+                        }
+
+                        sample_point = texel;
+                        sampled = true;
+
+                        vec4 id_color = texelFetch(id_texture, texel + view_offset, 0);
+
+                        // Round each channel, large ids are not exact in float
+                        ivec3 id_bytes = ivec3(round(id_color.xyz*255));
+                        int id = 256*256*id_bytes.z + 256*id_bytes.y + id_bytes.x;
+
+                        if (id != 0 && id != last_invisible)
+                        {
+                            if (!is_invisible(i_sensor, group, id))
+                            {
+                                id_out = id;
+                                break;
+                            }
+
+                            last_invisible = id;
+                        }
+
+                        if (t_max.x < t_max.y)
+                        {
+                            t = t_max.x;
+                            t_max.x += t_delta.x;
+                            texel.x += step_dir.x;
+                        }
+                        else
+                        {
+                            t = t_max.y;
+                            t_max.y += t_delta.y;
+                            texel.y += step_dir.y;
+                        }
+                    }
+                }
+
+                float dist = range;
+                if (id_out != 0)
+                {
+                    float dx = sample_point.x - sensor_x_on_view;
+                    float dy = sample_point.y - sensor_y_on_view;
+                    dist = sqrt( (dx*dx) + (dy*dy) )/zoom;
+                }
+
+                // Colors are fetched in the same pass, for sensors using them
+                vec4 color_out = vec4(0,0,0,0);
+                if (i_sensor < n_color_sensors && sampled)
+                {
+                    color_out = texelFetch(color_texture, sample_point + view_offset, 0);
+                }
+
+                // CONVERT IN THE FRAME OF THE ENVIRONMENT
+
+                HitPoint hpt;
+
+                hpt.view_pos_x = sample_point.x;
+                hpt.view_pos_y = sample_point.y;
+
+                hpt.env_pos_x = (sample_point.x - view_w/2)/zoom + center_view_x ;
+                hpt.env_pos_y = (sample_point.y - view_h/2)/zoom + center_view_y ;
+
+                hpt.rel_pos_x = 0;
+                hpt.rel_pos_y = 0;
+
+                hpt.sensor_x_on_view = sensor_x_on_view ;
+                hpt.sensor_y_on_view = sensor_y_on_view ;
+
+                hpt.id = float(id_out);
+                hpt.dist = dist;
+
+                hpt.r = round(color_out.x*255);
+                hpt.g = round(color_out.y*255);
+                hpt.b = round(color_out.z*255);
+
+                // Only the fields used by the sensor are written
+                ivec2 offset_layout = OutputParams.offsets_layouts[i_sensor];
+                int offset = offset_layout.x;
+
+                switch (offset_layout.y)
+                {
+WRITE_OUTPUTS
+                }
+
+            }
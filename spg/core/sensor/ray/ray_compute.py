@@ -1,20 +1,35 @@
 from __future__ import annotations
 
+import math
 from abc import ABC, abstractmethod
 from array import array
 from os import path
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
 
 import numpy as np
+import pymunk
 
-from spg.core.sensor.ray.ray import SIZE_OUTPUT_BUFFER
+from spg.core.entity.entity import MEMBER_BITS
+from spg.core.readback import compute_program, read_buffer_into
+from spg.core.sensor.ray.distance_field import DistanceField
+from spg.core.sensor.ray.ray import DERIVED_FIELDS, SIZE_OUTPUT_BUFFER
 
 if TYPE_CHECKING:
+    from arcade.gl import Buffer, Context
+
+    from spg.core.entity import Entity
     from spg.core.playground import Playground
     from spg.core.sensor import RaySensor
 
 
 class RayComputeStrategy(ABC):
+
+    # Strategies sampling the views require them to be rendered
+    uses_views = True
+
+    # Strategies reading hitpoints asynchronously can have some pending
+    pending = False
+
     @abstractmethod
     def __init__(self, ray_compute: RayCompute):
 
@@ -38,11 +53,19 @@ class RayComputeStrategy(ABC):
 
     @property
     def sensors(self):
-        return self._ray_compute.sensors
+        return self._ray_compute.active_sensors
 
     @property
-    def max_n_rays(self):
-        return self._ray_compute.max_n_rays
+    def view_offsets(self):
+        return self._ray_compute.active_offsets
+
+    @property
+    def due_indices(self):
+        return self._ray_compute.due_indices
+
+    @property
+    def n_color_due(self):
+        return self._ray_compute.n_color_due
 
     @property
     def max_invisible(self):
@@ -53,11 +76,88 @@ class RayComputeStrategy(ABC):
         pass
 
 
+# Texels added to the radius of the sprites drawn above the static layer
+OVERLAY_MARGIN = 2
+
+# Rays computed by each work group of the ray shader
+WORK_GROUP_SIZE = 64
+
+
+def _reserve(ctx: Context, buffer: Optional[Buffer], size: int) -> Buffer:
+    """Buffer of at least size bytes, doubling the capacity of buffer if too small."""
+
+    size = max(size, 4)
+
+    if buffer is None:
+        return ctx.buffer(reserve=size)
+
+    if buffer.size < size:
+        buffer.orphan(max(size, 2 * buffer.size))
+
+    return buffer
+
+
+class _Dispatch(NamedTuple):
+    """Sensors computed by a dispatch, and the output buffer it writes."""
+
+    buffer_index: int
+    sensors: List[Tuple[int, RaySensor]]
+
+
 class ShaderCompute(RayComputeStrategy):
-    def __init__(self, ray_compute: RayCompute):
+    """
+    Computes the sensors with a compute shader sampling the views.
+
+    Each ray visits the texels it crosses once, from the sensor to the end
+    of its range clipped to the view, and stops at the first visible entity.
+    Ids and colors are fetched in the same pass.
+    Only the output fields of each sensor are written and read back.
+
+    Buffers are kept between steps and updated in place,
+    and hitpoints are read into a preallocated array.
+    Buffers double their capacity when the sensors outgrow them.
+
+    Rays of all the sensors due are computed in work groups of fixed size,
+    so that resolutions are not limited by the size of the work groups,
+    and sensors of different resolutions don't leave invocations idle.
+
+    The shader only depends on the output fields of the sensors.
+    Adding sensors of the same kinds doesn't recompile it,
+    and programs are shared by the playgrounds using the same context.
+    Buffers are updated at the next dispatch after the sensors change.
+
+    With distance_field, a distance field of the static layer of the id view
+    is computed when the static layer changes.
+    Rays jump over the empty space around static entities,
+    until they might enter the circle bounding an entity drawn above them.
+    With a view atlas, the field covers all the views of the atlas,
+    and rays stop at the circles of all of them, which is only conservative.
+
+    With async_readback, two output buffers are used alternately.
+    The hitpoints of a step are read at the next step,
+    so that the GPU computes them while the physics of the next step runs.
+    Observations are then those of the previous step,
+    except at the first step, and after the sensors changed.
+    """
+
+    def __init__(
+        self,
+        ray_compute: RayCompute,
+        async_readback: bool = False,
+        distance_field: bool = False,
+    ):
 
         super().__init__(ray_compute)
 
+        self.async_readback = async_readback
+
+        self._distance_field: Optional[DistanceField] = None
+        self._overlay_buffer = None
+
+        if distance_field:
+            self._distance_field = DistanceField(self.ctx, self.id_view.size)
+            self._overlay_buffer = self.ctx.buffer(reserve=16)
+
         self._view_params_buffer = self.ctx.buffer(
             data=array(
                 "f",
@@ -73,41 +173,52 @@ class ShaderCompute(RayComputeStrategy):
 
         self._view_params_buffer.bind_to_storage_buffer(binding=6)
 
-        self._position_buffer = None
-        self._param_buffer = None
-        self._output_rays_buffer = None
-        self._inv_buffer = None
+        self._position_buffer: Optional[Buffer] = None
+        self._param_buffer: Optional[Buffer] = None
+        self._output_rays_buffers: List[Buffer] = []
+        self._output_params_buffer: Optional[Buffer] = None
+        self._inv_buffer: Optional[Buffer] = None
+        self._index_buffer: Optional[Buffer] = None
+
+        # Offset of the outputs of each sensor, in floats
+        self._output_offsets: List[int] = []
+
+        # Buffers are updated at the next dispatch when the sensors changed
+        self._stale = True
+
+        # Outputs read from each output buffer
+        self._outputs: List[np.ndarray] = []
+
+        # Dispatch of the previous step, not read yet
+        self._pending: Optional[_Dispatch] = None
+        self._next_buffer = 0
 
         shader_dir = path.abspath(path.join(__file__, "../"))
 
-        with open(shader_dir + "/id_compute.glsl", "rt", encoding="utf-8") as f_id:
-            self._source_compute_ids = f_id.read()
+        with open(shader_dir + "/ray_compute.glsl", "rt", encoding="utf-8") as f_rays:
+            self._source_compute = f_rays.read()
 
-        with open(shader_dir + "/color_compute.glsl", "rt", encoding="utf-8") as f_col:
-            self._source_compute_colors = f_col.read()
+        self._shader = None
 
-        self._id_shader = None
-        self._color_shader = None
+    @property
+    def pending(self):
+        return self._pending is not None
 
-    def _generate_buffers(self):
+    def invalidate(self):
+        """Sensors changed. Buffers and shader are updated at the next dispatch."""
 
-        position_buffer = self.ctx.buffer(
-            data=array("f", self._generate_position_buffer())
-        )
-        param_buffer = self.ctx.buffer(
-            data=array("f", self._generate_parameter_buffer())
-        )
-        output_rays_buffer = self.ctx.buffer(
-            data=array("f", self._generate_output_buffer())
-        )
-        inv_buffer = self.ctx.buffer(data=array("I", self._generate_invisible_buffer()))
+        self._stale = True
+
+        # Pending hitpoints are those of the previous sensors
+        self._pending = None
+        self._next_buffer = 0
+
+    def _write(self, buffer: Optional[Buffer], data: array):
 
-        param_buffer.bind_to_storage_buffer(binding=2)
-        position_buffer.bind_to_storage_buffer(binding=3)
-        output_rays_buffer.bind_to_storage_buffer(binding=4)
-        inv_buffer.bind_to_storage_buffer(binding=5)
+        buffer = _reserve(self.ctx, buffer, len(data) * data.itemsize)
+        buffer.write(data)
 
-        return position_buffer, param_buffer, output_rays_buffer, inv_buffer
+        return buffer
 
     def _generate_parameter_buffer(self):
 
@@ -116,93 +227,254 @@ class ShaderCompute(RayComputeStrategy):
             yield sensor.fov
             yield sensor.resolution
             yield sensor.n_points
+            group = sensor.invisible_group_id
+            yield -1 if group is None else group
 
     def _generate_position_buffer(self):
 
-        for sensor in self.sensors:
+        for sensor, (offset_x, offset_y) in zip(self.sensors, self.view_offsets):
             yield sensor.position[0]
             yield sensor.position[1]
             yield sensor.angle
+            yield offset_x
+            yield offset_y
+
+    @property
+    def _output_size(self):
+        return sum(
+            sensor.resolution * len(sensor.output_fields) for sensor in self.sensors
+        )
 
-    def _generate_output_buffer(self):
+    def _generate_output_offsets(self):
+
+        offset = 0
+
+        for sensor in self.sensors:
+            yield offset
+            offset += sensor.resolution * len(sensor.output_fields)
 
-        for _ in range(len(self.sensors)):
-            for _ in range(self.max_n_rays):
+    def _generate_output_params(self, layouts):
 
-                for _ in range(SIZE_OUTPUT_BUFFER):
-                    yield 0.0
+        for sensor, offset in zip(self.sensors, self._output_offsets):
+            yield offset
+            yield layouts.index(sensor.output_fields)
+
+    @property
+    def _layouts(self):
+        """Distinct output fields of the sensors, in a canonical order."""
+        return sorted(set(sensor.output_fields for sensor in self.sensors))
 
     def _generate_invisible_buffer(self):
 
         for sensor in self.sensors:
 
-            count = 1
-            yield sensor.anchor.uid
+            invisible_ids = sensor.listed_invisible_ids
+
+            yield from invisible_ids
+            yield from [0] * (self.max_invisible - len(invisible_ids))
+
+    def _generate_shader(self, layouts):
+
+        use_distance_field = int(self._distance_field is not None)
+
+        # Sensors with the same output fields share the code writing them
+        new_source = self._source_compute
+        new_source = new_source.replace(
+            "WRITE_OUTPUTS", self._generate_output_code(layouts)
+        )
+        new_source = new_source.replace("USE_DISTANCE_FIELD", str(use_distance_field))
+        new_source = new_source.replace(
+            "FIELD_W",
+            str(self._distance_field.width if self._distance_field else 0),
+        )
+        new_source = new_source.replace("WORK_GROUP_SIZE", str(WORK_GROUP_SIZE))
+        new_source = new_source.replace("MEMBER_BITS", str(MEMBER_BITS))
+
+        return compute_program(self.ctx, new_source)
+
+    @staticmethod
+    def _generate_output_code(layouts):
+
+        lines = []
+
+        for index, fields in enumerate(layouts):
+
+            lines.append(f"case {index}:")
+            lines.append(f"    offset += i_ray*{len(fields)};")
 
-            for inv in sensor.invisible_ids:
-                yield inv
-                count += 1
+            for column, field in enumerate(fields):
 
-            while count < self.max_invisible:
-                yield 0
-                count += 1
+                if field in DERIVED_FIELDS:
+                    expression, _ = DERIVED_FIELDS[field]
+                else:
+                    expression = f"hpt.{field}"
 
-    def _generate_shaders(self):
-        new_source = self._source_compute_ids
-        new_source = new_source.replace("N_SENSORS", str(len(self.sensors)))
-        new_source = new_source.replace("MAX_N_RAYS", str(self.max_n_rays))
-        new_source = new_source.replace("MAX_N_INVISIBLE", str(self.max_invisible))
-        id_shader = self.ctx.compute_shader(source=new_source)
+                lines.append(f"    Out.values[offset + {column}] = {expression};")
 
-        new_source = self._source_compute_colors
-        new_source = new_source.replace("MAX_N_RAYS", str(self.max_n_rays))
-        color_shader = self.ctx.compute_shader(source=new_source)
+            lines.append("    break;")
 
-        return id_shader, color_shader
+        return "\n".join(lines)
 
     def update_buffers_and_shaders(self):
-        (
-            self._position_buffer,
-            self._param_buffer,
-            self._output_rays_buffer,
-            self._inv_buffer,
-        ) = self._generate_buffers()
 
-        self._id_shader, self._color_shader = self._generate_shaders()
+        self._output_offsets = list(self._generate_output_offsets())
+        layouts = self._layouts
+
+        self._param_buffer = self._write(
+            self._param_buffer, array("f", self._generate_parameter_buffer())
+        )
+        self._output_params_buffer = self._write(
+            self._output_params_buffer,
+            array("i", self._generate_output_params(layouts)),
+        )
+        self._inv_buffer = self._write(
+            self._inv_buffer, array("I", self._generate_invisible_buffer())
+        )
+
+        n_output_buffers = 2 if self.async_readback else 1
+        self._output_rays_buffers = [
+            _reserve(self.ctx, buffer, 4 * self._output_size)
+            for buffer in self._output_rays_buffers
+            + [None] * (n_output_buffers - len(self._output_rays_buffers))
+        ]
+
+        self._outputs = [
+            np.zeros(self._output_size, "f4") for _ in self._output_rays_buffers
+        ]
+
+        self._shader = self._generate_shader(layouts)
+        self._stale = False
 
     def compute(self):
 
-        requires_buffer_update = False
+        current = self._dispatch() if self.due_indices else None
 
-        # check if invisible list changed in any of sensors
-        for sensor in self.sensors:
-            if sensor.invisible_changed:
-                requires_buffer_update = True
-                break
+        if not self.async_readback:
+            self._read(current)
+            return
+
+        previous, self._pending = self._pending, current
+
+        # Without hitpoints from the previous step, waits for the current ones
+        self._read(previous if previous is not None else current)
 
-        if requires_buffer_update:
+    def _dispatch(self):
+
+        if self._stale:
             self.update_buffers_and_shaders()
 
+        # Invisible lists only change the invisible ids and groups
+        elif any(sensor.invisible_changed for sensor in self.sensors):
+            self._param_buffer = self._write(
+                self._param_buffer, array("f", self._generate_parameter_buffer())
+            )
+            self._inv_buffer = self._write(
+                self._inv_buffer, array("I", self._generate_invisible_buffer())
+            )
+
         for sensor in self.sensors:
             sensor.invisible_changed = False
 
-        self._position_buffer = self.ctx.buffer(
-            data=array("f", self._generate_position_buffer())
+        buffer_index = self._next_buffer
+        self._next_buffer = (buffer_index + 1) % len(self._output_rays_buffers)
+
+        self._position_buffer = self._write(
+            self._position_buffer, array("f", self._generate_position_buffer())
         )
+
+        # Rays of the sensors due are tiled in work groups
+        indices = array("I")
+        n_computed_rays = 0
+
+        for index in self.due_indices:
+            indices.extend((index, n_computed_rays))
+            n_computed_rays += self.sensors[index].resolution
+
+        self._index_buffer = self._write(self._index_buffer, indices)
+
+        # Bindings are shared by the playgrounds using the same context
+        self._view_params_buffer.bind_to_storage_buffer(binding=6)
+        self._param_buffer.bind_to_storage_buffer(binding=2)
         self._position_buffer.bind_to_storage_buffer(binding=3)
+        self._output_rays_buffers[buffer_index].bind_to_storage_buffer(binding=4)
+        self._inv_buffer.bind_to_storage_buffer(binding=5)
+        self._index_buffer.bind_to_storage_buffer(binding=7)
+        self._output_params_buffer.bind_to_storage_buffer(binding=12)
+
+        # So are the programs
+        uniforms = {
+            "max_invisible": self.max_invisible,
+            "n_color_sensors": sum(sensor.uses_color for sensor in self.sensors),
+            "n_computed": len(self.due_indices),
+            "n_computed_rays": n_computed_rays,
+        }
+
+        for name, value in uniforms.items():
+            # Uniforms unused by a program, e.g. without colors, are optimized out
+            try:
+                self._shader[name] = value
+            except KeyError:
+                pass
+
+        if self._distance_field is not None:
+            self._update_distance_field()
+
+        # Ids and colors are fetched in a single pass.
+        # Sensors using colors come first.
+        self.id_view.texture.use(0)
+        if self.n_color_due:
+            self.color_view.texture.use(1)
+
+        self._shader.run(group_x=math.ceil(n_computed_rays / WORK_GROUP_SIZE))
+
+        if self.async_readback:
+            # Starts the computation while the next step runs
+            self.ctx.flush()
+
+        return _Dispatch(
+            buffer_index, [(index, self.sensors[index]) for index in self.due_indices]
+        )
+
+    def _update_distance_field(self):
+
+        distance_field = self._distance_field
+
+        if distance_field.version != self.id_view.static_version:
+            distance_field.update(self.id_view.static_texture)
+            distance_field.version = self.id_view.static_version
 
-        self.id_view.texture.use()
-        self._id_shader.run(group_x=len(self.sensors))
+        circles = array("f")
+        for entity, sprite in self.id_view.overlay_sprites.items():
+            radius = math.hypot(sprite.width, sprite.height) / 2 + OVERLAY_MARGIN
+            circles.extend((sprite.center_x, sprite.center_y, radius, entity.uid))
 
-        self.color_view.texture.use()
-        self._color_shader.run(group_x=len(self.sensors))
+        data = array("i", [len(circles) // 4, 0, 0, 0]).tobytes() + circles.tobytes()
 
-        hitpoints = np.frombuffer(
-            self._output_rays_buffer.read(), dtype=np.float32
-        ).reshape((len(self.sensors), self.max_n_rays, SIZE_OUTPUT_BUFFER))
+        if self._overlay_buffer.size < len(data):
+            self._overlay_buffer.orphan(len(data))
 
-        for index, sensor in enumerate(self.sensors):
-            sensor.update_observations(hitpoints[index, : sensor.resolution, :])
+        self._overlay_buffer.write(data)
+
+        distance_field.buffer.bind_to_storage_buffer(binding=8)
+        self._overlay_buffer.bind_to_storage_buffer(binding=9)
+
+    def _read(self, dispatch: Optional[_Dispatch]):
+
+        if dispatch is None:
+            return
+
+        outputs = self._outputs[dispatch.buffer_index]
+
+        # Waits for the shaders to complete
+        with self.playground.profiler.phase("readback"):
+            read_buffer_into(self._output_rays_buffers[dispatch.buffer_index], outputs)
+
+        # Outputs are overwritten by the next reads, sensors copy their hitpoints
+        for index, sensor in dispatch.sensors:
+            offset = self._output_offsets[index]
+            n_fields = len(sensor.output_fields)
+            hitpoints = outputs[offset : offset + sensor.resolution * n_fields]
+            sensor.update_observations(hitpoints.reshape(-1, n_fields))
 
 
 class NumpyCompute(RayComputeStrategy):
@@ -211,10 +483,12 @@ class NumpyCompute(RayComputeStrategy):
 
     def compute(self):
 
-        img_color = self.color_view.get_np_img()
-        img_id = self.id_view.get_np_img()
+        img_color = self.color_view.np_img if self.n_color_due else None
+        img_id = self.id_view.np_img
 
-        for sensor in self.sensors:
+        for index in self.due_indices:
+
+            sensor = self.sensors[index]
 
             end_positions = sensor.end_positions
 
@@ -243,7 +517,7 @@ class NumpyCompute(RayComputeStrategy):
 
             points = points.swapaxes(1, 2).reshape(-1, 2)
 
-            rr, cc = points[:, 1].astype(np.int), points[:, 0].astype(np.int)
+            rr, cc = points[:, 1].astype(int), points[:, 0].astype(int)
 
             # Get Ids
             pts = img_id[rr, cc]
@@ -251,7 +525,11 @@ class NumpyCompute(RayComputeStrategy):
             ids = 256 * 256 * pts[:, 2] + 256 * pts[:, 1] + pts[:, 0]
 
             #  remove invisible
-            for inv in sensor.invisible_ids:
+            group = sensor.invisible_group_id
+            if group is not None:
+                ids *= (ids >> MEMBER_BITS) != group
+
+            for inv in sensor.listed_invisible_ids:
                 ids *= ids != inv
 
             ids = ids.reshape(-1, sensor.resolution).transpose()
@@ -269,10 +547,14 @@ class NumpyCompute(RayComputeStrategy):
                 index_first_non_zero, np.arange(len(index_first_non_zero)), :
             ]
 
-            color = img_color[
-                view_position[:, 1].astype(np.int), view_position[:, 0].astype(np.int)
-            ]
-            color[id_first_non_zero == 0] = (0, 0, 0)
+            if sensor.uses_color:
+                color = img_color[
+                    view_position[:, 1].astype(int),
+                    view_position[:, 0].astype(int),
+                ]
+                color[id_first_non_zero == 0] = (0, 0, 0)
+            else:
+                color = np.zeros((sensor.resolution, 3))
 
             # Relative pos and distance
             rel_pos = center_on_view.transpose() - view_position
@@ -311,28 +593,395 @@ class NumpyCompute(RayComputeStrategy):
                 )
             )
 
-            sensor.update_observations(hitpoints)
+            sensor.update_observations(sensor.pack_hitpoints(hitpoints))
+
+
+# Texels sampled along each ray to find the color of a hitpoint
+N_COLOR_SAMPLES = 4
+
+
+class _Cast(NamedTuple):
+    """Rays of a sensor, and what they hit."""
+
+    origin: np.ndarray
+    directions: np.ndarray
+    entities: List[Entity]
+
+    # Index in entities of the entity hit by each ray, -1 if none
+    hit_entities: np.ndarray
+    distances: np.ndarray
+    points: np.ndarray
+
+
+class GeometricCompute(RayComputeStrategy):
+    """
+    Intersects the rays with the shapes of the entities, without rendering.
+
+    Shapes in range of each sensor are queried in the spatial index of the space.
+    Distances are exact. Colors are those of the textures at the hitpoints,
+    not blended with the background.
+    The rounding radius of polygons is neglected,
+    and rays starting inside a polygon don't hit it.
+    Sensors with the same rays, e.g. on the same anchor, share their intersections.
+    """
+
+    uses_views = False
+
+    def __init__(self, ray_compute: RayCompute):
+
+        super().__init__(ray_compute)
+
+        # Tinted colors and alpha of the texels, by texture and tint
+        self._texels: Dict[Tuple[str, Optional[Tuple[int, ...]]], np.ndarray] = {}
+
+        # Vertices of the polygons, in the frame of their body
+        self._vertices: Dict[pymunk.Poly, np.ndarray] = {}
+
+        # Circles (x, y, radius) and segments (x_0, y_0, x_1, y_1) of the shapes,
+        # and the rays cast. Computed once per compute.
+        self._primitives: Dict[pymunk.Shape, Tuple[np.ndarray, np.ndarray]] = {}
+        self._casts: Dict[tuple, _Cast] = {}
+
+    def compute(self):
+
+        self._primitives = {}
+        self._casts = {}
+
+        for index in self.due_indices:
+            sensor = self.sensors[index]
+            hitpoints = self._compute_sensor(sensor)
+            sensor.update_observations(sensor.pack_hitpoints(hitpoints))
+
+    def _shape_primitives(self, shape: pymunk.Shape):
+
+        body = shape.body
+        no_circles = np.zeros((0, 3))
+
+        if isinstance(shape, pymunk.Circle):
+            center = body.local_to_world(shape.offset)
+            return np.array([(center.x, center.y, shape.radius)]), np.zeros((0, 4))
+
+        if isinstance(shape, pymunk.Segment):
+            start, end = body.local_to_world(shape.a), body.local_to_world(shape.b)
+
+            if not shape.radius:
+                return no_circles, np.array([(start.x, start.y, end.x, end.y)])
+
+            # Capsule
+            normal = (end - start).perpendicular_normal() * shape.radius
+            circles = np.array(
+                [(start.x, start.y, shape.radius), (end.x, end.y, shape.radius)]
+            )
+            segments = np.array(
+                [
+                    (*(start + normal), *(end + normal)),
+                    (*(start - normal), *(end - normal)),
+                ]
+            )
+            return circles, segments
+
+        vertices = self._vertices.get(shape)
+        if vertices is None:
+            vertices = self._vertices[shape] = np.array(shape.get_vertices())
+
+        cos, sin = body.rotation_vector
+        rotation = np.array(((cos, sin), (-sin, cos)))
+        vertices = vertices @ rotation + tuple(body.position)
+
+        return no_circles, np.hstack((vertices, np.roll(vertices, -1, axis=0)))
+
+    def _candidates(
+        self,
+        origin: np.ndarray,
+        max_range: float,
+        invisible: set,
+        group: Optional[int],
+    ):
+        """Entities in range, and the primitives of their shapes."""
+
+        bb = pymunk.BB(
+            origin[0] - max_range,
+            origin[1] - max_range,
+            origin[0] + max_range,
+            origin[1] + max_range,
+        )
+
+        entities: List[Entity] = []
+        entity_indices: Dict[Entity, int] = {}
+
+        circles, segments = [], []
+        circle_entities, segment_entities = [], []
+
+        for shape in self.playground.space.bb_query(bb, pymunk.ShapeFilter()):
+
+            entity = self.playground.shapes_to_entities.get(shape)
+
+            # Transparent entities are not drawn in the views either
+            if entity is None or entity.transparent or entity.uid in invisible:
+                continue
+
+            if entity.group == group:
+                continue
+
+            primitives = self._primitives.get(shape)
+            if primitives is None:
+                primitives = self._primitives[shape] = self._shape_primitives(shape)
+
+            index = entity_indices.get(entity)
+            if index is None:
+                index = entity_indices[entity] = len(entities)
+                entities.append(entity)
+
+            shape_circles, shape_segments = primitives
+
+            circles.append(shape_circles)
+            segments.append(shape_segments)
+            circle_entities.append(np.full(len(shape_circles), index))
+            segment_entities.append(np.full(len(shape_segments), index))
+
+        if not entities:
+            return entities, np.zeros((0, 3)), np.zeros((0, 4)), np.zeros(0, int)
+
+        return (
+            entities,
+            np.concatenate(circles),
+            np.concatenate(segments),
+            np.concatenate(circle_entities + segment_entities).astype(np.int64),
+        )
+
+    @staticmethod
+    def _intersect(origin, directions, circles, segments):
+        """Distances along the rays to each primitive, inf if not hit."""
+
+        distances = np.full((len(directions), len(circles) + len(segments)), np.inf)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+
+            if len(circles):
+                to_origin = origin - circles[:, :2]
+
+                half_b = directions @ to_origin.T
+                c = np.sum(to_origin**2, axis=1) - circles[:, 2] ** 2
+                discriminant = half_b**2 - c
+
+                t = -half_b - np.sqrt(discriminant)
+
+                # Rays starting inside a circle hit it immediately
+                inside = c <= 0
+                t = np.where(inside, 0, t)
+                hit = inside | ((discriminant >= 0) & (t >= 0))
+
+                distances[:, : len(circles)] = np.where(hit, t, np.inf)
+
+            if len(segments):
+                to_start = segments[:, :2] - origin
+                edges = segments[:, 2:] - segments[:, :2]
+
+                denominator = np.outer(directions[:, 0], edges[:, 1]) - np.outer(
+                    directions[:, 1], edges[:, 0]
+                )
+                t = (
+                    to_start[:, 0] * edges[:, 1] - to_start[:, 1] * edges[:, 0]
+                ) / denominator
+                u = (
+                    np.outer(directions[:, 1], to_start[:, 0])
+                    - np.outer(directions[:, 0], to_start[:, 1])
+                ) / denominator
+
+                hit = (denominator != 0) & (t >= 0) & (u >= 0) & (u <= 1)
+
+                distances[:, len(circles) :] = np.where(hit, t, np.inf)
+
+        return distances
+
+    def _cast(self, sensor: RaySensor):
+
+        origin = np.asarray(sensor.position, dtype=np.float64)
+        angle = sensor.angle
+
+        invisible = set(sensor.listed_invisible_ids)
+        invisible.add(sensor.anchor.uid)
+
+        key = (
+            *origin,
+            angle,
+            sensor.fov,
+            sensor.resolution,
+            sensor.max_range,
+            frozenset(invisible),
+            sensor.invisible_group_id,
+        )
+
+        cast = self._casts.get(key)
+        if cast is not None:
+            return cast
+
+        angles = angle + np.linspace(-sensor.fov / 2, sensor.fov / 2, sensor.resolution)
+        directions = np.stack((np.cos(angles), np.sin(angles)), axis=1)
+
+        entities, circles, segments, primitive_entities = self._candidates(
+            origin, sensor.max_range, invisible, sensor.invisible_group_id
+        )
+
+        distances = self._intersect(origin, directions, circles, segments)
+
+        if distances.shape[1]:
+            nearest = np.argmin(distances, axis=1)
+            distance = distances[np.arange(len(directions)), nearest]
+        else:
+            nearest = np.zeros(len(directions), dtype=np.int64)
+            distance = np.full(len(directions), np.inf)
+
+        hit = distance <= sensor.max_range
+
+        hit_entities = np.where(hit, np.append(primitive_entities, -1)[nearest], -1)
+        distance[~hit] = sensor.max_range
+
+        # Rays not hitting anything end at their range
+        points = origin + directions * distance[:, np.newaxis]
+
+        cast = self._casts[key] = _Cast(
+            origin, directions, entities, hit_entities, distance, points
+        )
+        return cast
+
+    def _colors(self, cast: _Cast):
+
+        colors = np.zeros((len(cast.points), 3))
+
+        for index in np.unique(cast.hit_entities[cast.hit_entities >= 0]):
+
+            entity = cast.entities[index]
+            texels = self._entity_texels(entity)
+            texture_height, texture_width, _ = texels.shape
+
+            rays = cast.hit_entities == index
+
+            # Texels along the rays, inside the entity.
+            # The first opaque one is the color seen.
+            depths = (np.arange(N_COLOR_SAMPLES) + 0.5) * entity.scale
+            samples = (
+                cast.points[rays, np.newaxis, :]
+                + cast.directions[rays, np.newaxis, :] * depths[:, np.newaxis]
+                - entity.position
+            )
+
+            cos, sin = math.cos(entity.angle), math.sin(entity.angle)
+            local_x = cos * samples[..., 0] + sin * samples[..., 1]
+            local_y = -sin * samples[..., 0] + cos * samples[..., 1]
+
+            # First row of the texture is the top of the sprite
+            columns = np.floor(local_x / entity.scale + texture_width / 2)
+            rows = np.floor(texture_height / 2 - local_y / entity.scale)
+
+            columns = np.clip(columns, 0, texture_width - 1).astype(np.int64)
+            rows = np.clip(rows, 0, texture_height - 1).astype(np.int64)
+
+            sampled = texels[rows, columns]
+            first_opaque = np.argmax(sampled[..., 3] > 0, axis=1)
+
+            colors[rays] = sampled[np.arange(len(sampled)), first_opaque, :3]
+
+        return colors
+
+    def _entity_texels(self, entity: Entity):
+
+        texture = entity.sprite.texture
+        tint = tuple(entity.color_tint) if entity.color_tint else None
+
+        texels = self._texels.get((texture.name, tint))
+
+        if texels is None:
+            texels = np.asarray(texture.image.convert("RGBA"), dtype=np.float64)
+            if tint is not None:
+                texels[..., :3] = np.floor(texels[..., :3] * np.asarray(tint[:3]) / 255)
+            self._texels[(texture.name, tint)] = texels
+
+        return texels
+
+    def _compute_sensor(self, sensor: RaySensor):
+
+        cast = self._cast(sensor)
+
+        view = self.id_view
+        view_half_size = np.asarray((view.width / 2, view.height / 2))
+
+        uids = np.asarray([entity.uid for entity in cast.entities] + [0])
+
+        hitpoints = np.zeros((sensor.resolution, SIZE_OUTPUT_BUFFER))
+        hitpoints[:, 0:2] = (cast.points - view.center) * view.scale + view_half_size
+        hitpoints[:, 2:4] = cast.points
+        hitpoints[:, 6:8] = (cast.origin - view.center) * view.scale + view_half_size
+        hitpoints[:, 8] = uids[cast.hit_entities]
+        hitpoints[:, 9] = cast.distances
+
+        if sensor.uses_color:
+            hitpoints[:, 10:13] = self._colors(cast)
+
+        return hitpoints.astype(np.float32)
 
 
 class RayCompute:
-    def __init__(self, playground: Playground, scale=1, use_shader=True):
+    def __init__(
+        self,
+        playground: Playground,
+        scale=1,
+        use_shader=True,
+        geometric=False,
+        async_readback=False,
+        distance_field=False,
+    ):
 
         self.playground = playground
-        self.ctx = playground.window.ctx
+        self.ctx = playground.ctx
+        self.distance_field = distance_field
 
         # Check if OPengl version allows shaders to be used
-        if not self.ctx.gl_version >= (4, 3):
+        if self.ctx is None or not self.ctx.gl_version >= (4, 3):
             use_shader = False
 
         self.sensors: List[RaySensor] = []
 
-        if use_shader:
-            self._compute_strategy = ShaderCompute(self)
+        # Origin, in the sampled textures, of the view seen by each sensor
+        self.view_offsets: List[Tuple[int, int]] = []
+
+        # Requested sensors, those using colors first, and their view offsets.
+        # Only these are computed.
+        self.active_sensors: List[RaySensor] = []
+        self.active_offsets: List[Tuple[int, int]] = []
+        self._requested: Optional[Tuple[bool, ...]] = None
+
+        # Index of the active sensors due for an update, and how many use colors
+        self.due_indices: List[int] = []
+        self.n_color_due = 0
+
+        # Version of the views and pose of the sensors, when last computed
+        self._computed: Dict[
+            RaySensor, Tuple[int, Optional[int], float, float, float]
+        ] = {}
+
+        if geometric:
+            use_shader = False
+
+        self._compute_strategy: RayComputeStrategy
+        if geometric:
+            self._compute_strategy = GeometricCompute(self)
+        elif use_shader:
+            self._compute_strategy = ShaderCompute(self, async_readback, distance_field)
         else:
             self._compute_strategy = NumpyCompute(self)
 
         self.use_shader = use_shader
 
+    @property
+    def uses_views(self):
+        return self._compute_strategy.uses_views
+
+    @property
+    def has_work(self):
+        """Sensors are due, or a dispatch is waiting to be read."""
+        return bool(self.due_indices) or self._compute_strategy.pending
+
     @property
     def id_view(self):
         return self.playground.id_view
@@ -343,21 +992,110 @@ class RayCompute:
 
     @property
     def max_n_rays(self):
-        return max(sensor.resolution for sensor in self.sensors)
+        return max(sensor.resolution for sensor in self.active_sensors)
 
     @property
     def max_invisible(self):
-        return 1 + max(len(sensor.invisible_ids) for sensor in self.sensors)
+        max_listed = max(
+            (len(sensor.listed_invisible_ids) for sensor in self.active_sensors),
+            default=0,
+        )
+
+        # Invisible ids of each sensor are padded, buffers are never empty
+        return max(1, max_listed)
 
     def add(self, sensor):
         self.sensors.append(sensor)
+        self.view_offsets.append((0, 0))
+        self._requested = None
+
+    def remove(self, sensor):
+        index = self.sensors.index(sensor)
+        self.sensors.pop(index)
+        self.view_offsets.pop(index)
+        self._computed.pop(sensor, None)
+        self._requested = None
+
+    def reset(self):
+        self.sensors = []
+        self.view_offsets = []
+        self._computed = {}
+        self._requested = None
+
+    def update_active_sensors(self):
+        """
+        Selects the requested sensors, and those of them due for an update.
+        Buffers and shaders are updated when the requested sensors change.
+        """
+
+        self._select_requested()
+
+        self.due_indices = [
+            index for index, sensor in enumerate(self.active_sensors) if sensor.due
+        ]
+        self.n_color_due = sum(
+            self.active_sensors[index].uses_color for index in self.due_indices
+        )
+
+    def skip_unchanged(self, view_version: int, color_version: int):
+        """
+        Sensors due which didn't move since they were last computed,
+        with the same version of the views, keep their observations.
+        Only sensors using colors depend on the version of the color view.
+        """
+
+        due_indices = []
+
+        for index in self.due_indices:
+
+            sensor = self.active_sensors[index]
+
+            x, y = sensor.position
+            computed = (
+                view_version,
+                color_version if sensor.uses_color else None,
+                x,
+                y,
+                sensor.angle,
+            )
+
+            if not sensor.invisible_changed and self._computed.get(sensor) == computed:
+                sensor.keep_observations()
+            else:
+                self._computed[sensor] = computed
+                due_indices.append(index)
+
+        self.due_indices = due_indices
+        self.n_color_due = sum(
+            self.active_sensors[index].uses_color for index in self.due_indices
+        )
+
+    def _select_requested(self):
+
+        requested = tuple(sensor.requested for sensor in self.sensors)
+
+        if requested == self._requested:
+            return
+
+        self._requested = requested
+
+        active = [
+            (sensor, offset)
+            for sensor, offset in zip(self.sensors, self.view_offsets)
+            if sensor.requested
+        ]
+        active.sort(key=lambda sensor_offset: not sensor_offset[0].uses_color)
+
+        self.active_sensors = [sensor for sensor, _ in active]
+        self.active_offsets = [offset for _, offset in active]
 
-        if isinstance(self._compute_strategy, ShaderCompute):
-            self._compute_strategy.update_buffers_and_shaders()
+        if self.active_sensors and isinstance(self._compute_strategy, ShaderCompute):
+            self._compute_strategy.invalidate()
 
     def update_sensors(self):
 
-        if not self.sensors:
+        # Sensors due are selected by update_active_sensors
+        if not self.has_work:
             return
 
         self._compute_strategy.compute()
@@ -5,14 +5,38 @@ from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
 
 import arcade
 import numpy as np
+import pymunk
 
 if TYPE_CHECKING:
     from spg.core.playground import Playground
 
 from spg.core.entity import Agent, Element, Entity
+from spg.core.readback import read_framebuffer_into
+
+
+def _is_static(entity: Entity) -> bool:
+    """Static entities, and entities attached statically to them."""
+
+    if entity.pm_body is None:
+        return _is_static(entity.anchor)
+
+    return entity.pm_body.body_type == pymunk.Body.STATIC
 
 
 class View:
+    """
+    Image of the playground, centered on center.
+
+    Static entities are rendered once in a cached layer,
+    which is rendered again when static entities are added, removed or moved.
+    At each update, dynamic entities are drawn on top of it,
+    then traversable entities.
+    Static entities are therefore always below dynamic ones.
+
+    Views are only rendered again if entities were added, removed or moved.
+    Their version is incremented each time they are rendered,
+    and their static version each time the static layer is rendered.
+    """
 
     updated = False
 
@@ -28,7 +52,6 @@ class View:
 
         self.playground = playground
 
-        self._ctx = playground.ctx
         self.center = center
 
         self.scale = scale
@@ -41,12 +64,37 @@ class View:
         )
         self.width, self.height = self.size
 
-        # Change projection to match the contents
-        self._ctx.projection_2d = 0, self.width, 0, self.height
-
         self.draw_transparent = draw_transparent
         self.uid_mode = uid_mode
 
+        self._init_render_target()
+
+        self.entity_to_sprites: Dict[Entity, arcade.Sprite] = {}
+
+        # Static sprites are only placed when the static layer is rendered
+        self._static_sprites: Dict[Entity, arcade.Sprite] = {}
+        self._dynamic_sprites: Dict[Entity, arcade.Sprite] = {}
+        self.static_updated = False
+
+        self._changed = True
+        self.version = 0
+        self.static_version = 0
+
+        for element in playground.elements:
+            self.add(element)
+
+        for agent in playground.agents:
+            self.add(agent)
+
+        self.playground.views.append(self)
+
+    def _init_render_target(self):
+
+        self._ctx = self.playground.ctx
+
+        # Change projection to match the contents
+        self._ctx.projection_2d = 0, self.width, 0, self.height
+
         self._fbo = self._ctx.framebuffer(
             color_attachments=[
                 self._ctx.texture(
@@ -59,25 +107,48 @@ class View:
             ]
         )
 
+        self._static_fbo = self._ctx.framebuffer(
+            color_attachments=[
+                self._ctx.texture(
+                    self.size,
+                    components=4,
+                    filter=(self._ctx.NEAREST, self._ctx.NEAREST),
+                ),
+            ]
+        )
+
+        # Pixels read from the framebuffer, and the version read
+        self._np_img = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._read_version = -1
+
         self.scene = arcade.Scene()
         self.scene.add_sprite_list("traversable")
         self.scene.add_sprite_list("entity")
 
-        self.entity_to_sprites: Dict[Entity, arcade.Sprite] = {}
-
-        for element in playground.elements:
-            self.add(element)
-
-        for agent in playground.agents:
-            self.add(agent)
-
-        self.playground.views.append(self)
+        # Sprites of the entity layer, drawn in the static layer or at each update
+        self._static_list = arcade.SpriteList()
+        self._dynamic_list = arcade.SpriteList()
 
     @property
     def texture(self):
         """The OpenGL texture containing the map pixel data"""
         return self._fbo.color_attachments[0]
 
+    @property
+    def static_texture(self):
+        """The OpenGL texture of the static layer"""
+        return self._static_fbo.color_attachments[0]
+
+    @property
+    def overlay_sprites(self) -> Dict[Entity, arcade.Sprite]:
+        """Sprites drawn above the static layer."""
+
+        return {
+            entity: sprite
+            for entity, sprite in self.entity_to_sprites.items()
+            if entity not in self._static_sprites or entity.traversable
+        }
+
     def add(self, entity: Union[Element, Agent]):
 
         if entity.transparent and not self.draw_transparent:
@@ -88,7 +159,15 @@ class View:
 
             self.entity_to_sprites[entity] = sprite
 
+            if _is_static(entity):
+                self._static_sprites[entity] = sprite
+                self.static_updated = False
+            else:
+                self._dynamic_sprites[entity] = sprite
+
+            self._place_sprite(entity, sprite)
             self._add_sprite_to_scene(sprite, entity)
+            self._changed = True
 
         if isinstance(entity, (Agent, Element)):
             for attached in entity.all_attached:
@@ -98,14 +177,29 @@ class View:
 
         if entity.traversable:
             self.scene.add_sprite("traversable", sprite)
+            return
+
+        self.scene.add_sprite("entity", sprite)
+
+        if entity in self._static_sprites:
+            self._static_list.append(sprite)
         else:
-            self.scene.add_sprite("entity", sprite)
+            self._dynamic_list.append(sprite)
 
     def remove(self, entity):
 
-        sprite = self.entity_to_sprites.pop(entity)
+        # Transparent entities might not have been drawn
+        sprite = self.entity_to_sprites.pop(entity, None)
 
-        self._remove_sprite_from_scene(sprite, entity)
+        if sprite is not None:
+            self._remove_sprite_from_scene(sprite, entity)
+
+            if self._static_sprites.pop(entity, None) is not None:
+                self.static_updated = False
+            else:
+                self._dynamic_sprites.pop(entity)
+
+            self._changed = True
 
         if isinstance(entity, (Agent, Element)):
             for attached in entity.all_attached:
@@ -120,39 +214,102 @@ class View:
             sprite_list = self.scene.get_sprite_list("entity")
             sprite_list.remove(sprite)
 
+            if entity in self._static_sprites:
+                self._static_list.remove(sprite)
+            else:
+                self._dynamic_list.remove(sprite)
+
+    def _place_sprite(self, entity, sprite) -> bool:
+        """Places the sprite of an entity. Returns True if it moved."""
+
+        pos_x = (entity.position.x - self.center[0]) * self.scale + self.width // 2
+        pos_y = (entity.position.y - self.center[1]) * self.scale + self.height // 2
+        angle = int(entity.angle * 180 / math.pi)
+
+        if sprite.position == (pos_x, pos_y) and sprite.angle == angle:
+            return False
+
+        sprite.set_position(pos_x, pos_y)
+        sprite.angle = angle
+
+        return True
+
     def update_sprites(self, force=False):
 
-        for entity, sprite in self.entity_to_sprites.items():
-            pos_x = (entity.position.x - self.center[0]) * self.scale + self.width // 2
-            pos_y = (entity.position.y - self.center[1]) * self.scale + self.height // 2
+        if force or not self.static_updated:
+            sprites = self.entity_to_sprites
+        else:
+            sprites = self._dynamic_sprites
 
-            if sprite.position != (pos_x, pos_y) or force:
-                sprite.set_position(pos_x, pos_y)
-                sprite.angle = int(entity.angle * 180 / math.pi)
+        for entity, sprite in sprites.items():
+
+            # Sleeping bodies don't move
+            if entity.sleeping and not force:
+                continue
+
+            if self._place_sprite(entity, sprite):
+                self._changed = True
 
     def update(self, force=False):
 
         self.update_sprites(force)
 
-        with self._fbo.activate() as fbo:
+        if force or not self.static_updated:
 
-            if self.uid_mode:
-                fbo.clear()
-            else:
-                fbo.clear(self.playground.background)
+            with self._static_fbo.activate() as fbo:
+
+                if self.uid_mode:
+                    fbo.clear()
+                else:
+                    fbo.clear(self.playground.background)
+
+                self._static_list.draw()
+
+            self.static_updated = True
+            self.static_version += 1
+            self._changed = True
+
+        if self._changed:
+
+            with self._fbo.activate():
+                self._ctx.copy_framebuffer(self._static_fbo, self._fbo)
+                self.draw_dynamic()
+
+            self._changed = False
+            self.version += 1
 
-            self.scene.draw(names=["entity", "traversable"])
         self.updated = True
 
-    def get_np_img(self):
+    def draw(self):
+        """Draws the static entities, then the others above them."""
+
+        self._static_list.draw()
+        self.draw_dynamic()
+
+    def draw_dynamic(self):
+        """Draws the dynamic entities, then the traversable ones."""
+
+        self._dynamic_list.draw()
+        self.scene.draw(names=["traversable"])
+
+    @property
+    def np_img(self):
+        """
+        Image of the view, read from the GPU in place
+        when the view was rendered again. Overwritten by later reads.
+        """
 
         if not self.updated:
             self.update()
 
-        img = np.frombuffer(self._fbo.read(), dtype=np.dtype("B")).reshape(
-            self.height, self.width, 3
-        )
-        return img
+        if self._read_version != self.version:
+            read_framebuffer_into(self._fbo, self._np_img)
+            self._read_version = self.version
+
+        return self._np_img
+
+    def get_np_img(self):
+        return self.np_img.copy()
 
     def reset(self):
         self.scene.remove_sprite_list_by_name("entity")
@@ -160,4 +317,227 @@ class View:
         self.scene.add_sprite_list("traversable")
         self.scene.add_sprite_list("entity")
 
+        self._static_list = arcade.SpriteList()
+        self._dynamic_list = arcade.SpriteList()
+
+        self.entity_to_sprites = {}
+        self._static_sprites = {}
+        self._dynamic_sprites = {}
+        self.static_updated = False
+        self._changed = True
+
+
+class SoftwareView(View):
+    """
+    View rasterized on the CPU, in a numpy image. Doesn't require a GL context.
+
+    Sprites are drawn as with GL: static entities, dynamic entities
+    then traversable entities, rotated by whole degrees, tinted and alpha blended.
+    Textures are sampled at the nearest texel instead of being interpolated,
+    so that images can differ from the GL views on the edges of sprites.
+    """
+
+    def _init_render_target(self):
+
+        self._image = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+        # Image of the static layer
+        self._static_image = np.zeros_like(self._image)
+
+        # Sprites in drawing order, by layer
+        self._layers: Dict[str, Dict[Entity, arcade.Sprite]] = {
+            "static": {},
+            "entity": {},
+            "traversable": {},
+        }
+
+        # Colors and alpha of the texels of each sprite, tinted
+        self._texels: Dict[arcade.Sprite, Tuple[np.ndarray, np.ndarray]] = {}
+
+        # Transforms of the dynamic layers, when last drawn
+        self._drawn_transforms: Dict[str, np.ndarray] = {}
+
+    @property
+    def texture(self):
+        raise ValueError("Software views have no GL texture, use get_np_img")
+
+    def _layer(self, entity):
+
+        if entity.traversable:
+            return "traversable"
+
+        if entity in self._static_sprites:
+            return "static"
+
+        return "entity"
+
+    def _add_sprite_to_scene(self, sprite, entity):
+
+        self._layers[self._layer(entity)][entity] = sprite
+
+        texels = np.asarray(sprite.texture.image.convert("RGBA"), dtype=np.float32)
+        color = texels[:, :, :3] * np.asarray(sprite.color, dtype=np.float32) / 255
+        alpha = texels[:, :, 3] * sprite.alpha / 255**2
+
+        self._texels[sprite] = color, alpha
+
+    def _remove_sprite_from_scene(self, sprite, entity):
+
+        self._layers[self._layer(entity)].pop(entity)
+
+        self._texels.pop(sprite)
+
+    def update_sprites(self, force=False):
+        """Sprites are placed when drawn."""
+
+    def update(self, force=False):
+
+        transforms = {
+            name: self._transforms(self._layers[name])
+            for name in ("entity", "traversable")
+        }
+
+        unchanged = all(
+            np.array_equal(transforms[name], self._drawn_transforms.get(name))
+            for name in transforms
+        )
+
+        if force or not self.static_updated:
+
+            if self.uid_mode:
+                self._image[:] = 0
+            else:
+                self._image[:] = self.playground.background[:3]
+
+            static = self._layers["static"]
+            self._draw_layer(static, self._transforms(static))
+            self._static_image[:] = self._image
+
+            self.static_updated = True
+            self.static_version += 1
+
+        elif unchanged and not self._changed:
+            self.updated = True
+            return
+
+        else:
+            self._image[:] = self._static_image
+
+        for name, layer_transforms in transforms.items():
+            self._draw_layer(self._layers[name], layer_transforms)
+
+        self._drawn_transforms = transforms
+        self._changed = False
+        self.version += 1
+
+        self.updated = True
+
+    @staticmethod
+    def _transforms(layer: Dict[Entity, arcade.Sprite]):
+        """Centers and angles of the entities of a layer."""
+
+        return np.array(
+            [(entity.position.x, entity.position.y, entity.angle) for entity in layer],
+            dtype=np.float64,
+        ).reshape(-1, 3)
+
+    def _draw_layer(self, layer: Dict[Entity, arcade.Sprite], transforms: np.ndarray):
+
+        if not layer:
+            return
+
+        centers = (transforms[:, :2] - self.center) * self.scale + (
+            self.width // 2,
+            self.height // 2,
+        )
+
+        # As sprites, rotated by whole degrees
+        angles = np.radians(np.degrees(transforms[:, 2]).astype(np.int64))
+
+        for sprite, center, angle in zip(layer.values(), centers, angles):
+            self._draw_sprite(sprite, center, angle)
+
+    def _draw_sprite(self, sprite, center, angle):
+
+        color, alpha = self._texels[sprite]
+        texture_height, texture_width = alpha.shape
+
+        half_width = texture_width * sprite.scale / 2
+        half_height = texture_height * sprite.scale / 2
+
+        cos, sin = math.cos(angle), math.sin(angle)
+
+        # Bounding box of the rotated sprite, in pixels of the view
+        extent_x = abs(half_width * cos) + abs(half_height * sin)
+        extent_y = abs(half_width * sin) + abs(half_height * cos)
+
+        x_min = max(math.floor(center[0] - extent_x), 0)
+        x_max = min(math.ceil(center[0] + extent_x), self.width)
+        y_min = max(math.floor(center[1] - extent_y), 0)
+        y_max = min(math.ceil(center[1] + extent_y), self.height)
+
+        if x_min >= x_max or y_min >= y_max:
+            return
+
+        # Centers of the pixels, in the frame of the sprite
+        pixel_x = np.arange(x_min, x_max) + 0.5 - center[0]
+        pixel_y = np.arange(y_min, y_max)[:, np.newaxis] + 0.5 - center[1]
+
+        local_x = cos * pixel_x + sin * pixel_y
+        local_y = -sin * pixel_x + cos * pixel_y
+
+        # First row of the texture is the top of the sprite
+        columns = np.floor((local_x + half_width) / sprite.scale).astype(np.int64)
+        rows = np.floor((half_height - local_y) / sprite.scale).astype(np.int64)
+
+        inside = (
+            (columns >= 0)
+            & (columns < texture_width)
+            & (rows >= 0)
+            & (rows < texture_height)
+        )
+
+        rows, columns = rows[inside], columns[inside]
+
+        src_alpha = alpha[rows, columns]
+        drawn = src_alpha > 0
+
+        if not np.any(drawn):
+            return
+
+        src_alpha = src_alpha[drawn, np.newaxis]
+        src_color = color[rows[drawn], columns[drawn]]
+
+        # Indices of the pixels drawn, in the image
+        pixels = np.flatnonzero(inside)[drawn]
+        pixels = (y_min + pixels // (x_max - x_min)) * self.width + (
+            x_min + pixels % (x_max - x_min)
+        )
+
+        image = self._image.reshape(-1, 3)
+        blended = src_color * src_alpha + image[pixels] * (1 - src_alpha)
+        image[pixels] = np.rint(blended)
+
+    @property
+    def np_img(self):
+        """Image of the view, overwritten at each update."""
+
+        if not self.updated:
+            self.update()
+
+        return self._image
+
+    def get_np_img(self):
+        return self.np_img.copy()
+
+    def reset(self):
+
+        for layer in self._layers.values():
+            layer.clear()
+
+        self._texels = {}
         self.entity_to_sprites = {}
+        self._static_sprites = {}
+        self._dynamic_sprites = {}
+        self.static_updated = False
+        self._changed = True
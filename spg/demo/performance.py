@@ -1,40 +1,19 @@
 import argparse
-import time
 
-from tqdm import tqdm
-
-from spg import Ball, HeadAgent, Room, UniformCoordinateSampler
+from spg.benchmark import Scenario, measure
 
 
 def run_exp(args):
 
-    playground = Room(size=(args.width, args.height))
-
-    for _ in range(args.number_agents):
-
-        sampler = UniformCoordinateSampler(
-            playground, center=playground.center, size=playground.size
-        )
-
-        other_agent = HeadAgent()
-        playground.add(other_agent, sampler, allow_overlapping=False)
-
-    for _ in range(args.number_balls):
-
-        sampler = UniformCoordinateSampler(
-            playground, center=playground.center, size=playground.size
-        )
-
-        ball = Ball()
-        playground.add(ball, sampler, allow_overlapping=False)
+    scenario = Scenario(
+        n_agents=args.number_agents,
+        n_balls=args.number_balls,
+        size=(args.width, args.height),
+    )
 
-    time_start = time.time()
-    for _ in tqdm(range(args.steps)):
-        commands = {agent: agent.get_random_commands() for agent in playground.agents}
-        playground.step(commands)
-    time_end = time.time()
+    metrics = measure(scenario, n_steps=args.steps)
 
-    print(args, args.steps / (time_end - time_start))
+    print(args, metrics["steps_per_sec"])
 
 
 if __name__ == "__main__":
@@ -44,28 +23,28 @@ if __name__ == "__main__":
     PARSER.add_argument(
         "--width",
         type=int,
-        default=200,
+        default=400,
         help="Environment width",
     )
 
     PARSER.add_argument(
         "--height",
         type=int,
-        default=200,
+        default=400,
         help="Environment heigh",
     )
 
     PARSER.add_argument(
         "--number_agents",
         type=int,
-        default=50,
+        default=4,
         help="Number of agents",
     )
 
     PARSER.add_argument(
         "--number_balls",
         type=int,
-        default=50,
+        default=16,
         help="Number of balls",
     )
 
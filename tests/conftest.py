@@ -1,5 +1,25 @@
+import gc
+
+import arcade
+import pyglet
 import pytest
 
+
+@pytest.fixture(autouse=True)
+def close_windows():
+    """Close the windows of the playgrounds created by a test, to free their memory."""
+
+    windows = set(pyglet.app.windows)
+    yield
+
+    for window in set(pyglet.app.windows) - windows:
+        window.close()
+
+    # Closed windows unset the current window when collected
+    gc.collect()
+    arcade.set_window(next(iter(pyglet.app.windows), None))
+
+
 ###########################
 # ENTITY PROPERTIES
 ###########################
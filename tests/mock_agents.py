@@ -1,8 +1,10 @@
 import math
 
+import numpy as np
 import pymunk
 from gymnasium import spaces
 
+from spg.components.agents.sensors.distance import Distance
 from spg.components.grasper import GraspableMixin, GrasperHold
 from spg.core.entity import Agent, Entity
 from spg.core.entity.action import ActionMixin
@@ -239,3 +241,56 @@ class MockRaySensor(Entity, AttachedStaticMixin, RaySensor):
     @property
     def attachment_point(self):
         return 0, 0
+
+
+class MockDistanceSensor(Entity, AttachedStaticMixin, Distance):
+    def __init__(
+        self,
+        fov,
+        resolution,
+        max_range,
+        update_period=1,
+        compact_output=False,
+        **kwargs,
+    ):
+
+        texture, _ = get_texture_from_geometry(
+            geometry="circle", radius=10, color=(255, 0, 0)
+        )
+
+        super().__init__(
+            texture=texture,
+            transparent=True,
+            **kwargs,
+        )
+
+        Distance.__init__(
+            self,
+            fov=fov,
+            resolution=resolution,
+            max_range=max_range,
+            update_period=update_period,
+            compact_output=compact_output,
+        )
+
+    @property
+    def attachment_point(self):
+        return 0, 0
+
+
+class SensingAgent(DynamicAgent):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.distance = MockDistanceSensor(
+            name=f"{self.name}_distance", fov=math.pi / 2, max_range=100, resolution=8
+        )
+        self.add(self.distance)
+
+    @property
+    def observation_space(self):
+        return spaces.Box(low=-np.inf, high=np.inf, shape=(2,))
+
+    @property
+    def observation(self):
+        return np.array(self.position)
@@ -5,9 +5,14 @@ import numpy as np
 import pytest
 
 from spg.core.playground import EmptyPlayground
-from spg.core.sensor.ray.ray import SIZE_OUTPUT_BUFFER
-from tests.mock_agents import DynamicAgent, MockRaySensor
-from tests.mock_entities import DynamicElementFromGeometry
+from spg.core.sensor.ray.ray import HITPOINT_FIELDS, SIZE_OUTPUT_BUFFER
+from tests.mock_agents import (
+    DynamicAgent,
+    DynamicAgentWithArm,
+    MockDistanceSensor,
+    MockRaySensor,
+)
+from tests.mock_entities import DynamicElementFromGeometry, StaticElementFromGeometry
 
 coord_center = (0, 0), 0
 
@@ -117,3 +122,456 @@ def test_sensor_detects(color, fov, resolution):
     assert ent_1 in sensor.invisible_entities
 
     assert np.all(sensor.observation[mask, 8] == 0)
+
+
+def _ray_sensor(kind=MockRaySensor, **kwargs):
+    """Sensor of a kind, with the parameters of the ray scenes by default."""
+
+    kwargs = {"fov": math.pi / 2, "max_range": 100, "resolution": 8, **kwargs}
+    return kind(**kwargs)
+
+
+def _ray_scene(
+    *sensors, agent=None, strategy="shader", window=None, color=(0, 10, 200), **kwargs
+):
+    """
+    Agent carrying the sensors, or a MockRaySensor, facing a rectangle at (40, 0).
+    Other arguments are passed to the playground.
+    """
+
+    playground = EmptyPlayground(
+        size=(300, 300),
+        use_shader=strategy == "shader",
+        geometric_rays=strategy == "geometric",
+        window=window,
+        **kwargs,
+    )
+
+    agent = agent or DynamicAgent()
+    for sensor in sensors or [_ray_sensor()]:
+        agent.add(sensor)
+    playground.add(agent, coord_center)
+
+    ent_1 = DynamicElementFromGeometry(color=color, geometry="rectangle", size=(20, 20))
+    playground.add(ent_1, ((40, 0), 0))
+
+    return playground, ent_1
+
+
+def test_requested_sensors():
+    agent = DynamicAgent()
+    sensor = _ray_sensor()
+    distance = _ray_sensor(MockDistanceSensor)
+    playground, _ = _ray_scene(sensor, distance, agent=agent)
+
+    playground.step(playground.null_action)
+    observation = sensor.observation.copy()
+    distances = distance.observation.copy()
+
+    obs, *_ = playground.step(playground.null_action, observe=False)
+
+    assert obs is None
+    assert not sensor.updated and not distance.updated
+    assert not playground.id_view.updated
+
+    # Distance sensors don't need the color view
+    sensor.requested = False
+    obs, *_ = playground.step(playground.null_action)
+
+    assert distance.updated and not sensor.updated
+    assert playground.ray_compute.active_sensors == [distance]
+    assert playground.id_view.updated and not playground.color_view.updated
+    assert np.array_equal(obs[agent.name][distance.name], distances)
+
+    sensor.requested = True
+    playground.step(playground.null_action)
+
+    # Sensors using colors are computed first
+    assert playground.ray_compute.active_sensors == [sensor, distance]
+    assert np.array_equal(sensor.observation, observation)
+    assert np.array_equal(distance.observation, distances)
+
+
+def test_update_period():
+    agent = DynamicAgent()
+    sensor = _ray_sensor()
+    distance = _ray_sensor(MockDistanceSensor, update_period=3)
+    playground, _ = _ray_scene(sensor, distance, agent=agent)
+
+    playground.step(playground.null_action)
+    assert sensor.updated and distance.updated
+    assert distance.age == 0
+
+    observation = sensor.observation.copy()
+    distances = distance.observation.copy()
+    assert np.any(distances < 100)
+
+    for age in (1, 2):
+        obs, *_ = playground.step(playground.null_action)
+
+        assert sensor.updated and not distance.updated
+        assert distance.age == age
+        assert np.array_equal(sensor.observation, observation)
+        assert np.array_equal(obs[agent.name][distance.name], distances)
+
+    playground.step(playground.null_action)
+    assert distance.updated and distance.age == 0
+    assert np.array_equal(distance.observation, distances)
+
+    # Restoring a state updates all sensors
+    state = playground.snapshot()
+    playground.step(playground.null_action)
+    playground.restore(state)
+    assert distance.updated and distance.age == 0
+
+
+@pytest.mark.parametrize("resolution", [8, 21])
+def test_geometric_rays(resolution):
+    fov = math.pi / 2
+    color = arcade.color.AIR_FORCE_BLUE
+
+    observations = {}
+    window = None
+
+    for strategy in ("shader", "geometric"):
+
+        sensor = _ray_sensor(fov=fov, resolution=resolution)
+        playground, ent_1 = _ray_scene(
+            sensor,
+            strategy=strategy,
+            window=window,
+            color=color,
+            background=arcade.color.ORANGE,
+        )
+        window = playground.window
+
+        ent_2 = DynamicElementFromGeometry(color=color, geometry="circle", radius=10)
+        playground.add(ent_2, ((0, 50), 0))
+
+        playground.step(playground.null_action)
+        observations[strategy] = sensor.observation.copy()
+
+    # Views are not rendered
+    assert not playground.id_view.updated and not playground.color_view.updated
+
+    hit_angles = np.linspace(-fov / 2, fov / 2, resolution)
+    mask = np.abs(hit_angles) < math.atan(10 / 30)
+
+    assert np.all(sensor.observation[mask, 8] == ent_1.uid)
+    assert np.all(sensor.observation[mask, 10:13] == color[:3])
+    assert np.all(sensor.observation[~mask, 8] != ent_1.uid)
+    assert np.allclose(sensor.observation[mask, 2], 30, atol=1e-3)
+
+    # Same hits as sampling the views, up to their resolution
+    rendered = observations["shader"]
+    assert np.array_equal(rendered[:, 8] != 0, sensor.observation[:, 8] != 0)
+    assert np.allclose(rendered[:, 9], sensor.observation[:, 9], atol=2)
+
+    sensor.add_invisible_entity(ent_1)
+    playground.step(playground.null_action)
+
+    assert np.all(sensor.observation[mask, 8] == 0)
+    assert np.all(sensor.observation[mask, 9] == 100)
+
+
+def test_unchanged_scene():
+    sensor = _ray_sensor()
+    playground, ent_1 = _ray_scene(sensor)
+
+    playground.step(playground.null_action)
+    version = playground.id_view.version
+    observation = sensor.observation.copy()
+
+    # Nothing moved, views are not rendered and sensors not computed
+    playground.step(playground.null_action)
+
+    assert sensor.updated and sensor.age == 0
+    assert playground.id_view.version == version
+    assert not playground.ray_compute.due_indices
+    assert np.array_equal(sensor.observation, observation)
+
+    ent_1.move_to(((40, 20), 0))
+    playground.step(playground.null_action)
+
+    assert playground.id_view.version == version + 1
+    assert playground.ray_compute.due_indices == [0]
+    assert not np.array_equal(sensor.observation, observation)
+
+
+def test_unchanged_colors():
+    sensor = _ray_sensor()
+    distance = _ray_sensor(MockDistanceSensor)
+    playground, _ = _ray_scene(sensor, distance)
+
+    playground.step(playground.null_action)
+    playground.step(playground.null_action)
+
+    # Only sensors using colors are computed again when only colors changed
+    playground.color_view._changed = True
+    playground.step(playground.null_action)
+
+    ray_compute = playground.ray_compute
+    computed = [ray_compute.active_sensors[index] for index in ray_compute.due_indices]
+    assert computed == [sensor]
+
+
+def test_async_readback():
+    sensor = _ray_sensor()
+    playground, ent_1 = _ray_scene(sensor, async_readback=True)
+
+    if not playground.ray_compute.use_shader:
+        pytest.skip("compute shaders not available")
+
+    # Nothing to read yet, the first dispatch is read immediately
+    playground.step(playground.null_action)
+    observation = sensor.observation.copy()
+    assert np.any(sensor.observation[:, 8] == ent_1.uid)
+
+    # Observations lag by one step
+    ent_1.move_to(((40, 100), 0))
+    playground.step(playground.null_action)
+    assert np.array_equal(sensor.observation, observation)
+
+    playground.step(playground.null_action)
+    assert not np.any(sensor.observation[:, 8] == ent_1.uid)
+
+
+def _distance_field_scene(distance_field, window=None):
+    sensor = _ray_sensor()
+    playground, ent_1 = _ray_scene(sensor, window=window, distance_field=distance_field)
+
+    wall = StaticElementFromGeometry(
+        color=(200, 10, 0), geometry="rectangle", size=(200, 20)
+    )
+    playground.add(wall, ((110, 0), 0))
+
+    return playground, sensor, wall, ent_1
+
+
+def test_distance_field():
+    playground, sensor, wall, ent_1 = _distance_field_scene(distance_field=True)
+
+    if not playground.ray_compute.use_shader:
+        pytest.skip("compute shaders not available")
+
+    reference, reference_sensor, _, reference_ent = _distance_field_scene(
+        distance_field=False, window=playground.window
+    )
+
+    for step in range(3):
+
+        # Dynamic entities can move in front of the static ones
+        ent_1.move_to(((40, 10 * step), 0))
+        playground.step(playground.null_action)
+
+        reference_ent.move_to(((40, 10 * step), 0))
+        reference.step(reference.null_action)
+
+        # The rectangle is in front of the wall
+        distances = sensor.observation[:, 9]
+        assert np.any(distances < 80) and np.any(distances > 90)
+        assert np.allclose(distances, reference_sensor.observation[:, 9], atol=1)
+
+    # The distance field follows the static entities
+    wall.move_to(((100, 0), 0))
+    playground.step(playground.null_action)
+
+    distance_field = playground.ray_compute._compute_strategy._distance_field
+    assert distance_field.version == playground.id_view.static_version
+
+    distances = sensor.observation[:, 9]
+    assert np.min(distances[distances > 80]) < 95
+
+    # Playgrounds sharing a context share the program
+    other, *_ = _distance_field_scene(distance_field=True, window=playground.window)
+    other_field = other.ray_compute._compute_strategy._distance_field
+    assert other_field._shader is distance_field._shader
+
+
+@pytest.mark.parametrize("thickness", [1, 2])
+def test_distance_field_thin_walls(thickness):
+    playgrounds = []
+    window = None
+
+    for distance_field in [True, False]:
+        playground = EmptyPlayground(
+            size=(300, 300), distance_field=distance_field, window=window
+        )
+        window = playground.window
+
+        agent = DynamicAgent()
+        sensor = MockRaySensor(fov=2 * math.pi, max_range=140, resolution=128)
+        agent.add(sensor)
+        playground.add(agent, coord_center)
+
+        # Walls at several angles, around the agent
+        for index in range(8):
+            angle = index * math.pi / 4 + 0.3
+            wall = StaticElementFromGeometry(
+                color=(0, 10, 200), geometry="rectangle", size=(thickness, 60)
+            )
+            position = (100 * math.cos(angle), 100 * math.sin(angle))
+            playground.add(wall, (position, angle + 0.2 * index))
+
+        playground.step(playground.null_action)
+        playgrounds.append((playground, sensor))
+
+    (playground, sensor), (_, reference_sensor) = playgrounds
+
+    if not playground.ray_compute.use_shader:
+        pytest.skip("compute shaders not available")
+
+    # Rays don't jump over thin walls
+    hits = sensor.observation[:, 8] != 0
+    assert np.array_equal(hits, reference_sensor.observation[:, 8] != 0)
+    assert np.allclose(
+        sensor.observation[:, 9], reference_sensor.observation[:, 9], atol=1
+    )
+    assert np.count_nonzero(hits) > 32
+
+    # Distances are exact
+    width, height = playground.id_view.size
+    static_img = np.frombuffer(playground.id_view.static_texture.read(), np.uint8)
+    occupied = np.argwhere(static_img.reshape(height, width, 4)[..., :3].any(-1))
+
+    distance_field = playground.ray_compute._compute_strategy._distance_field
+    distances = np.frombuffer(distance_field.buffer.read(), np.float32)
+    distances = distances.reshape(height, width)
+
+    for row in range(height):
+        exact = np.hypot(
+            np.arange(width)[:, np.newaxis] - occupied[:, 1], row - occupied[:, 0]
+        ).min(axis=1)
+        assert np.allclose(distances[row], exact, atol=1e-3)
+
+
+def test_compact_outputs():
+    window = None
+
+    # The playgrounds share a window, to spare memory
+    for strategy in ["shader", "numpy", "geometric"]:
+        sensor = _ray_sensor()
+        distance = _ray_sensor(MockDistanceSensor, compact_output=True)
+        playground, _ = _ray_scene(sensor, distance, strategy=strategy, window=window)
+        window = playground.window
+
+        hitpoints = distance._hitpoints
+        playground.step(playground.null_action)
+
+        # Hitpoints are copied into the buffer of the sensor
+        assert distance._hitpoints is hitpoints
+
+        # Distance sensors only get the distances of the hitpoints
+        assert sensor.output_fields == HITPOINT_FIELDS
+        assert distance.output_fields == ("dist",)
+        assert distance._hitpoints.shape == (8, 1)
+
+        assert np.any(distance.observation < 100)
+        assert np.array_equal(distance.observation, sensor.observation[:, 9])
+
+
+def test_draw_rays():
+    distance = _ray_sensor(MockDistanceSensor)
+    compact = _ray_sensor(MockDistanceSensor, compact_output=True)
+    playground, _ = _ray_scene(distance, compact)
+
+    playground.step(playground.null_action)
+
+    # Sensors keep all the fields by default, to draw the rays
+    assert distance.output_fields[: len(HITPOINT_FIELDS)] == HITPOINT_FIELDS
+    assert np.array_equal(distance.observation, compact.observation)
+
+    distance.draw()
+
+    with pytest.raises(ValueError):
+        compact.draw()
+
+
+def test_shared_programs():
+    playground, ent_1 = _ray_scene()
+    playground.step(playground.null_action)
+
+    if not playground.ray_compute.use_shader:
+        pytest.skip("compute shaders not available")
+
+    strategy = playground.ray_compute._compute_strategy
+    shader = strategy._shader
+    param_buffer = strategy._param_buffer
+
+    # Sensors of the same kinds don't recompile the shader
+    for index in range(4):
+        agent = DynamicAgent()
+        sensor = _ray_sensor()
+        agent.add(sensor)
+        playground.add(agent, ((-100, 30 * index - 60), 0))
+
+    playground.step(playground.null_action)
+
+    assert strategy._shader is shader
+    assert strategy._param_buffer is param_buffer
+    assert param_buffer.size >= 5 * 4 * 4
+
+    assert np.any(sensor.observation[:, 8] != 0)
+
+    # Neither do invisible entities
+    sensor.add_invisible_entity(ent_1)
+    playground.step(playground.null_action)
+
+    assert strategy._shader is shader
+
+    # Playgrounds sharing a context share the programs
+    other, _ = _ray_scene(window=playground.window)
+    other.step(other.null_action)
+
+    assert other.ray_compute._compute_strategy._shader is shader
+
+
+@pytest.mark.parametrize("strategy", ["shader", "numpy", "geometric"])
+def test_invisible_group(strategy):
+    agent = DynamicAgentWithArm(
+        arm_position=(20, 0), arm_angle=0, rotation_range=math.pi / 4
+    )
+    sensor = _ray_sensor(fov=math.pi / 4, resolution=16)
+    own_sensor = _ray_sensor(fov=math.pi / 4, resolution=16, invisible_group=False)
+    playground, ent_1 = _ray_scene(sensor, own_sensor, agent=agent, strategy=strategy)
+
+    playground.step(playground.null_action)
+
+    # Parts of an agent share its group, and are invisible without being listed
+    assert agent.arm.group == sensor.invisible_group_id == agent.group
+    assert own_sensor.invisible_group_id is None
+    assert sensor.listed_invisible_ids == []
+
+    assert np.any(own_sensor.observation[:, 8] == agent.arm.uid)
+    assert not np.any(sensor.observation[:, 8] == agent.arm.uid)
+
+    # Entities of other groups are visible
+    assert ent_1.group != agent.group
+    assert np.any(sensor.observation[:, 8] == ent_1.uid)
+
+
+def test_high_resolution():
+
+    # More rays than invocations in a work group, and a small sensor
+    large = _ray_sensor(fov=math.pi / 4, resolution=36 * 57 + 1)
+    small = _ray_sensor(fov=math.pi / 4, resolution=37)
+    playground, ent_1 = _ray_scene(large, small)
+
+    if not playground.ray_compute.use_shader:
+        pytest.skip("compute shaders not available")
+
+    wall = StaticElementFromGeometry(
+        color=(0, 10, 200), geometry="rectangle", size=(100, 20)
+    )
+    playground.add(wall, ((80, 0), 0))
+
+    playground.step(playground.null_action)
+
+    # Rays hit the rectangle, or the wall behind it
+    for sensor in (large, small):
+        hits = sensor.observation[:, 8]
+        assert np.all((hits == ent_1.uid) | (hits == wall.uid))
+        assert np.any(hits == ent_1.uid) and np.any(hits == wall.uid)
+
+    # Rays with the same angles hit at the same distance
+    assert np.allclose(large.observation[::57, 9], small.observation[:, 9], atol=1)
@@ -0,0 +1,123 @@
+import pytest
+
+from spg.benchmark import (
+    BASE_SCENARIO,
+    DEFAULT_BASELINE,
+    SWEEPS,
+    BenchmarkPlayground,
+    Scenario,
+    compare,
+    load_results,
+    measure,
+    run_benchmarks,
+    save_results,
+    sweep_scenarios,
+)
+from spg.benchmark.__main__ import main
+
+
+def test_scenario_playground():
+    scenario = Scenario(n_agents=3, n_balls=5, resolution=16, size=(300, 300))
+    playground = BenchmarkPlayground(scenario)
+
+    assert len(playground.agents) == 3
+    assert len(playground.elements) == 5
+    assert playground.id_view.scale == scenario.sensor_scale
+
+    # Placements are seeded
+    other = BenchmarkPlayground(scenario)
+    assert [agent.coordinates for agent in playground.agents] == [
+        agent.coordinates for agent in other.agents
+    ]
+
+    with pytest.raises(ValueError):
+        BenchmarkPlayground(scenario._replace(n_balls=100, size=(100, 100)))
+
+
+def test_scenario_balls_fit():
+    scenario = BASE_SCENARIO._replace(n_balls=max(SWEEPS["balls"][1]))
+    playground = BenchmarkPlayground(scenario)
+
+    assert len(playground.elements) == scenario.n_balls
+
+    # Balls don't overlap with agents
+    for agent in playground.agents:
+        for ball in playground.elements:
+            distance = (agent.position - ball.position).length
+            assert distance > agent.radius + ball.radius
+
+
+def test_sweep_scenarios():
+    scenarios = sweep_scenarios(["agents", "balls"])
+
+    assert BASE_SCENARIO in scenarios
+    assert len(scenarios) == len(set(scenarios)) == 7
+
+
+def test_measure():
+    scenario = Scenario(n_agents=1, n_balls=2, resolution=8, size=(200, 200))
+    metrics = measure(scenario, n_steps=3, n_warmup=1, n_resets=1, n_add_remove=2)
+
+    for metric in [
+        "steps_per_sec",
+        "physics_steps_per_sec",
+        "pymunk_step_s",
+        "ray_compute_s",
+        "readback_s",
+        "reset_s",
+        "soft_reset_s",
+        "add_remove_per_sec",
+    ]:
+        assert metrics[metric] > 0
+
+
+def test_compare():
+    baseline = {
+        "results": [{"name": "a", "metrics": {"steps_per_sec": 100, "reset_s": 1}}]
+    }
+    results = {
+        "results": [
+            {"name": "a", "metrics": {"steps_per_sec": 80, "reset_s": 1.05}},
+            {"name": "b", "metrics": {"steps_per_sec": 1}},
+        ]
+    }
+
+    regressions = compare(results, baseline, threshold=0.1)
+
+    assert len(regressions) == 1
+    assert regressions[0].metric == "steps_per_sec"
+    assert regressions[0].change == pytest.approx(0.2)
+
+    assert len(compare(results, baseline, threshold=0.01)) == 2
+
+
+def test_results_file(tmp_path):
+    path = str(tmp_path / "results.json")
+
+    results = run_benchmarks(
+        [Scenario(n_agents=1, n_balls=0, resolution=8, size=(200, 200))],
+        n_steps=2,
+        n_warmup=0,
+        n_resets=1,
+        n_add_remove=1,
+    )
+    save_results(results, path)
+
+    loaded = load_results(path)
+    assert loaded["results"][0]["metrics"] == results["results"][0]["metrics"]
+    assert loaded["metadata"]["versions"]["pymunk"]
+
+    args = ["--sweep", "sensor_scale", "--steps", "2", "--resets", "1"]
+    assert main(args + ["--add_remove", "1", "--output", path]) == 0
+    assert (
+        main(args + ["--add_remove", "1", "--baseline", path, "--threshold", "100"])
+        == 0
+    )
+    assert main(args + ["--add_remove", "1", "--compare", "--threshold", "100"]) == 0
+
+
+def test_default_baseline():
+    baseline = load_results(DEFAULT_BASELINE)
+
+    names = [result["name"] for result in baseline["results"]]
+    assert names == [scenario.name for scenario in sweep_scenarios()]
@@ -1,8 +1,15 @@
 import math
 
+import numpy as np
+
 from spg.core.playground import EmptyPlayground
 from spg.core.playground.utils import fill_action_space
-from tests.mock_agents import DynamicAgent, DynamicAgentWithArm
+from tests.mock_agents import (
+    DynamicAgent,
+    DynamicAgentWithArm,
+    DynamicAgentWithTrigger,
+    SensingAgent,
+)
 
 coord_center = (0, 0), 0
 
@@ -30,3 +37,92 @@ def test_partial_action():
     action = fill_action_space(playground, agent_forward_action)
 
     playground.step(action)
+
+
+def test_spaces_cached():
+    playground = EmptyPlayground(size=(500, 200), background=(23, 23, 21))
+    agent = SensingAgent(name="agent")
+    playground.add(agent, coord_center)
+
+    action_space = playground.action_space
+    assert playground.action_space is action_space
+    assert playground.observation_space is playground.observation_space
+
+    null_action = playground.null_action
+    null_action["agent"]["agent"][0] = 1
+    assert np.all(playground.null_action["agent"]["agent"] == 0)
+
+    other_agent = SensingAgent(name="other_agent")
+    playground.add(other_agent, ((50, 50), 0))
+    assert "other_agent" in playground.action_space.spaces
+    assert "other_agent" in playground.null_action
+
+    playground.remove(other_agent)
+    assert "other_agent" not in playground.observation_space.spaces
+    assert "other_agent" not in playground.null_action
+
+
+def test_step_flat():
+    playground = EmptyPlayground(size=(500, 200), background=(23, 23, 21))
+    agent = DynamicAgentWithArm(
+        name="agent", arm_position=(0, 0), arm_angle=0, rotation_range=math.pi / 4
+    )
+    other_agent = DynamicAgentWithTrigger(
+        name="other_agent", arm_position=(0, 0), arm_angle=0, rotation_range=math.pi / 4
+    )
+    playground.add(agent, coord_center)
+    playground.add(other_agent, ((50, 50), 0))
+
+    layout = playground.action_layout
+    assert layout.shape == (2, 5)
+    assert layout.slices[0] == {"agent": slice(0, 3), agent.arm.name: slice(3, 4)}
+    assert layout.slices[1] == {
+        "other_agent": slice(0, 3),
+        other_agent.arm.name: slice(3, 4),
+        other_agent.trigger.name: slice(4, 5),
+    }
+
+    actions = layout.zeros()
+    actions[0, :3] = (1, 0, 0)
+    actions[1, 4] = 1
+
+    _, rewards, *_ = playground.step_flat(actions)
+
+    assert rewards.shape == (2,)
+    assert agent.position.x > 0
+    assert other_agent.trigger.triggered
+
+    # Agents missing from the rewards get 0
+    playground._compute_reward = lambda: {agent: 1}
+    _, rewards, *_ = playground.step_flat(actions)
+    assert list(rewards) == [1, 0]
+
+    # Layout is compiled again when agents change
+    playground.remove(other_agent)
+    assert playground.action_layout.shape == (1, 4)
+
+
+def test_step_repeat():
+    playground = EmptyPlayground(size=(500, 200))
+    agent = SensingAgent(name="agent")
+    playground.add(agent, coord_center)
+
+    playground_repeat = EmptyPlayground(size=(500, 200))
+    agent_repeat = SensingAgent(name="agent")
+    playground_repeat.add(agent_repeat, coord_center)
+
+    action = {"agent": {"agent": np.array([1, 0, 0.2])}}
+
+    for _ in range(3):
+        playground.step(action)
+
+    # Sensors are only updated once
+    updates = []
+    agent_repeat.distance.update_observations = updates.append
+
+    obs, reward, *_ = playground_repeat.step(action, repeat=3)
+
+    assert len(updates) == 1
+    assert agent_repeat.position == agent.position
+    assert np.allclose(obs["agent"]["agent"], agent.position)
+    assert reward == {agent_repeat: 0}
@@ -1,6 +1,8 @@
 import pytest
 
+from spg.core.entity.entity import MEMBER_BITS
 from spg.core.playground import EmptyPlayground
+from spg.core.playground.playground import N_GROUPS
 from tests.mock_entities import (
     MockDynamicElement,
     MockElemWithAttachment,
@@ -94,3 +96,41 @@ def test_playground_interface_attached_element(TestElement):
 
     assert not playground.space.shapes
     assert not playground.space.bodies
+
+
+def test_attached_uids_follow_anchor():
+
+    playground = EmptyPlayground(size=(100, 100))
+
+    elem = MockElemWithAttachment((0, 0), 0)
+    playground.add(elem, coord_center)
+    playground.remove(elem)
+
+    # The uid of the element is taken while it is removed
+    other = MockDynamicElement()
+    other.uid = elem.uid
+    playground.add(other, coord_center)
+
+    playground.add(elem, coord_center)
+
+    assert elem.uid != other.uid
+    assert elem.arm.group == elem.group
+    assert elem.arm.uid in playground.uids_to_entities
+
+
+def test_uids_exhausted():
+
+    playground = EmptyPlayground(size=(100, 100))
+
+    playground.uids_to_entities.update(
+        {group << MEMBER_BITS: None for group in range(1, N_GROUPS - 1)}
+    )
+
+    # The last group is found, even if it can't be drawn at random
+    uid = playground.get_uid()
+    assert uid == (N_GROUPS - 1) << MEMBER_BITS
+
+    playground.uids_to_entities[uid] = None
+
+    with pytest.raises(ValueError):
+        playground.get_uid()
@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+
+from spg.core.playground import EmptyPlayground
+from tests.mock_agents import SensingAgent
+from tests.mock_entities import StaticElementFromGeometry
+
+
+def test_observation_layout():
+    playground = EmptyPlayground(size=(200, 200))
+
+    wall = StaticElementFromGeometry(
+        geometry="rectangle", size=(20, 20), color=(0, 0, 255)
+    )
+    playground.add(wall, ((40, 0), 0))
+
+    agent = SensingAgent(name="agent")
+    other_agent = SensingAgent(name="other_agent")
+    playground.add(agent, ((0, 0), 0))
+    playground.add(other_agent, ((-50, 50), math.pi))
+
+    layout = playground.observation_layout
+    assert layout.shape == (2, 10)
+    assert layout.slices[1] == {
+        "other_agent": slice(0, 2),
+        "other_agent_distance": slice(2, 10),
+    }
+
+    observation, *_ = playground.step_flat(playground.action_layout.zeros())
+
+    assert observation is layout.buffer
+    assert observation.dtype == np.float32
+
+    # Same sensors as the observations, ray sensors write in their slice
+    assert list(layout.slices[0]) == list(agent.agent_observation)
+    assert np.shares_memory(agent.distance.observation, layout.buffer)
+
+    playground.step(playground.null_action)
+    observation, *_ = playground.step_flat(playground.action_layout.zeros())
+
+    for row, name in enumerate(["agent", "other_agent"]):
+        assert np.allclose(
+            observation[row, :2], playground.name_to_agents[name].position
+        )
+
+    # Second agent looks away from the wall
+    assert np.any(observation[0, layout.slices[0]["agent_distance"]] < 100)
+    assert np.all(observation[1, layout.slices[1]["other_agent_distance"]] == 100)
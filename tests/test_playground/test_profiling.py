@@ -0,0 +1,79 @@
+import json
+
+from spg.core.playground import EmptyPlayground
+from tests.mock_agents import SensingAgent
+
+coord_center = (0, 0), 0
+
+
+def get_playground(**kwargs):
+    playground = EmptyPlayground(size=(200, 200), **kwargs)
+    playground.add(SensingAgent(name="agent"), coord_center)
+    return playground
+
+
+def test_profiler_disabled():
+    playground = get_playground()
+
+    playground.step(playground.null_action)
+
+    assert not playground.profiler.enabled
+    assert not playground.stats
+
+
+def test_profiler_stats():
+    playground = get_playground(profile=True)
+
+    for _ in range(3):
+        playground.step(playground.null_action)
+
+    stats = playground.stats
+
+    assert set(stats) == {
+        "step",
+        "pre_step",
+        "apply_action",
+        "pymunk_step",
+        "post_step",
+        "view_update",
+        "ray_compute",
+        "readback",
+    }
+    assert stats["step"].count == 3
+    assert stats["pymunk_step"].count == 3
+    assert 0 < stats["pymunk_step"].mean <= stats["step"].mean
+    assert stats["step"].min <= stats["step"].mean <= stats["step"].max
+
+    # Repeated actions are timed separately
+    playground.step(playground.null_action, repeat=2)
+    assert playground.stats["pymunk_step"].count == 5
+
+    playground.profiler.reset_stats()
+    assert not playground.stats
+
+
+def test_profiler_trace(tmp_path):
+    playground = get_playground()
+
+    playground.profiler.trace(2)
+    assert playground.profiler.tracing
+
+    for _ in range(3):
+        playground.step(playground.null_action)
+
+    assert not playground.profiler.tracing
+
+    path = tmp_path / "trace.json"
+    playground.profiler.dump_trace(str(path))
+
+    with open(path, "rt", encoding="utf-8") as f_trace:
+        events = json.load(f_trace)["traceEvents"]
+
+    assert [event["name"] for event in events].count("step") == 2
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+    # Phases are nested in the step.
+    # Sensors are not computed again if nothing moved.
+    first_step = [event["name"] for event in events].index("step")
+    step = events[-1]
+    assert all(step["ts"] <= event["ts"] for event in events[first_step + 1 :])
@@ -0,0 +1,213 @@
+import math
+
+import numpy as np
+
+from spg.core.playground import EmptyPlayground
+from spg.core.playground.manager import DecoupledTimeStep
+from spg.core.playground.utils import fill_action_space
+from tests.mock_agents import (
+    DynamicAgent,
+    DynamicAgentWithGrasper,
+    MockGraspable,
+    MockRaySensor,
+)
+from tests.mock_entities import MockDynamicElement
+
+coord_center = (0, 0), 0
+
+
+def get_coordinates(playground):
+    return [
+        (tuple(entity.position), entity.angle)
+        for entity in playground.elements + playground.agents
+    ]
+
+
+def test_snapshot_restore():
+    playground = EmptyPlayground(size=(300, 300))
+
+    agent = DynamicAgent(name="agent")
+    playground.add(agent, coord_center)
+
+    elem = MockDynamicElement()
+    playground.add(elem, ((40, 0), 0))
+
+    action = {"agent": {"agent": np.array([1, 0, 0.5])}}
+    playground.step(action)
+
+    state = playground.snapshot()
+    coordinates = get_coordinates(playground)
+    uid_texture = elem.uid_texture
+
+    for _ in range(3):
+        playground.step(action)
+    after_snapshot = get_coordinates(playground)
+
+    playground.remove(elem)
+    playground.add(DynamicAgent(name="other_agent"), ((-50, -50), 0))
+
+    playground.restore(state)
+
+    assert playground.elements == [elem]
+    assert playground.agents == [agent]
+    assert "other_agent" not in playground.action_space.spaces
+    assert get_coordinates(playground) == coordinates
+
+    # Entity added back reuses its uid and textures
+    assert playground.uids_to_entities[elem.uid] is elem
+    assert elem.uid_texture is uid_texture
+
+    for _ in range(3):
+        playground.step(action)
+
+    # Replays are exact, contacts included
+    assert get_coordinates(playground) == after_snapshot
+
+
+def test_restore_contacts():
+    time_step = DecoupledTimeStep(persistent_forces=True)
+    playground = EmptyPlayground(size=(300, 300), time_step=time_step)
+
+    agent = DynamicAgent(name="agent")
+    playground.add(agent, coord_center)
+
+    # The agent pushes the element
+    elem = MockDynamicElement()
+    playground.add(elem, ((30, 0), 0))
+
+    action = {"agent": {"agent": np.array([1, 0, 0.5])}}
+    playground.step(action)
+
+    state = playground.snapshot()
+
+    for _ in range(3):
+        playground.step(action)
+    after_snapshot = get_coordinates(playground)
+
+    # Replays don't depend on the contacts of the previous steps
+    for _ in range(2):
+        playground.restore(state)
+
+        for _ in range(3):
+            playground.step(action)
+
+        assert get_coordinates(playground) == after_snapshot
+
+
+def test_restore_grasp():
+    playground = EmptyPlayground(size=(100, 100))
+
+    agent = DynamicAgentWithGrasper(
+        name="agent",
+        arm_position=(10, 10),
+        arm_angle=math.pi / 4,
+        grasper_radius=20,
+        rotation_range=math.pi / 2,
+    )
+    playground.add(agent, coord_center)
+
+    elem = MockGraspable()
+    playground.add(elem, ((50, 50), 0))
+
+    action = fill_action_space(playground, {agent.name: {agent.grasper.name: 1}})
+    playground.step(action)
+
+    assert elem in agent.grasper.grasped
+    state = playground.snapshot()
+
+    playground.step(playground.null_action)
+    assert not agent.grasper.grasped
+
+    playground.restore(state)
+
+    assert elem in agent.grasper.grasped
+    assert elem.grasped_by == [agent.grasper]
+
+    playground.restore(state)
+    assert len(agent.grasper.grasped[elem]) == 4
+
+
+class MockPlayground(EmptyPlayground):
+    def place_elements(self):
+        self.elem = MockGraspable()
+        self.add(self.elem, ((50, 50), 0))
+
+    def place_agents(self):
+        self.agent = DynamicAgentWithGrasper(
+            name="agent",
+            arm_position=(10, 10),
+            arm_angle=math.pi / 4,
+            grasper_radius=20,
+            rotation_range=math.pi / 2,
+        )
+        self.agent.distance = MockRaySensor(fov=math.pi, max_range=50, resolution=8)
+        self.agent.add(self.agent.distance)
+        self.add(self.agent, coord_center)
+
+
+def test_soft_reset():
+    playground = MockPlayground(size=(200, 200))
+    agent, elem = playground.agent, playground.elem
+
+    sprite = playground.id_view.entity_to_sprites[elem]
+    shader = playground.ray_compute._compute_strategy._shader
+    space = playground.space
+
+    action = fill_action_space(playground, {agent.name: {agent.grasper.name: 1}})
+    action["agent"]["agent"] = np.array([1, 0, 0.5])
+    playground.step(action)
+    playground.step(action)
+    agent.cumulative_reward = 1
+
+    assert elem in agent.grasper.grasped
+
+    playground.remove(elem)
+    playground.add(MockDynamicElement(), ((-50, -50), 0))
+
+    playground.reset(soft=True)
+
+    assert playground.agent is agent
+    assert playground.elements == [elem]
+    assert playground.space is space
+    assert playground.id_view.entity_to_sprites[elem] is not sprite
+    assert playground.id_view.entity_to_sprites[agent]
+    assert playground.ray_compute._compute_strategy._shader is shader
+
+    assert tuple(agent.position) == coord_center[0]
+    assert tuple(elem.position) == (50, 50)
+    assert agent.cumulative_reward == 0
+    assert not agent.grasper.grasped
+    assert not elem.grasped_by
+    assert agent.distance.observation is not None
+
+    # A full reset creates new entities
+    playground.reset()
+    assert playground.agent is not agent
+
+
+class NonOverlappingPlayground(EmptyPlayground):
+    def place_elements(self):
+        self.elem = MockDynamicElement()
+        self.add(self.elem, ((50, 50), 0), allow_overlapping=False)
+
+    def place_agents(self):
+        self.agent = DynamicAgent(name="agent")
+        self.add(self.agent, coord_center, allow_overlapping=False)
+
+
+def test_soft_reset_non_overlapping():
+    playground = NonOverlappingPlayground(size=(200, 200))
+    agent, elem = playground.agent, playground.elem
+
+    # The agent ends the episode on the initial position of the element
+    elem.move_to(((-50, -50), 0))
+    agent.move_to(((50, 50), 0))
+    playground.step(playground.null_action)
+
+    playground.reset(soft=True)
+
+    assert tuple(elem.position) == (50, 50)
+    assert tuple(agent.position) == coord_center[0]
+    assert len(playground.space.shapes) == len(elem.pm_shapes) + len(
+        agent.get_all_shapes()
+    )
@@ -0,0 +1,123 @@
+import platform
+
+from spg.core.playground import EmptyPlayground
+from spg.core.playground.manager import (
+    AdaptiveTimeStep,
+    DecoupledTimeStep,
+    FixedTimeStep,
+)
+from tests.mock_agents import DynamicAgent
+from tests.mock_entities import MockDynamicElement
+
+coord_center = (0, 0), 0
+
+
+def test_default_time_step():
+    playground = EmptyPlayground(size=(200, 200), pymunk_steps=5)
+
+    assert isinstance(playground.time_step, FixedTimeStep)
+    assert playground.time_step.substeps(playground.space) == (5, 0.2)
+
+
+def test_decoupled_time_step():
+    time_step = DecoupledTimeStep(control_dt=1, physics_dt=0.4, iterations=4)
+    playground = EmptyPlayground(size=(200, 200), time_step=time_step)
+
+    assert time_step.substeps(playground.space) == (3, 1 / 3)
+    assert playground.space.iterations == 4
+
+
+def test_adaptive_time_step():
+    time_step = AdaptiveTimeStep(max_steps=20)
+    playground = EmptyPlayground(size=(400, 400), time_step=time_step)
+
+    agent = DynamicAgent(name="agent")
+    playground.add(agent, coord_center)
+    playground.add(MockDynamicElement(), ((100, 100), 0))
+
+    # Nothing moves
+    assert time_step.substeps(playground.space) == (1, 1)
+
+    agent.pm_body.velocity = 50, 0
+    n_steps, dt = time_step.substeps(playground.space)
+
+    assert 1 < n_steps < 20
+    assert dt == 1 / n_steps
+
+    # Fast bodies are limited by max_steps
+    agent.pm_body.velocity = 10000, 0
+    assert time_step.substeps(playground.space) == (20, 1 / 20)
+
+    # Forces are accounted for
+    agent.pm_body.velocity = 0, 0
+    agent.pm_body.apply_force_at_local_point((10000 * agent.pm_body.mass, 0))
+    assert time_step.substeps(playground.space) == (20, 1 / 20)
+
+
+def test_sleeping_bodies():
+    playground = EmptyPlayground(
+        size=(400, 400), sleep_time_threshold=0.5, idle_speed_threshold=0.1
+    )
+
+    elem = MockDynamicElement()
+    playground.add(elem, ((100, 100), 0))
+
+    for _ in range(3):
+        playground.step(playground.null_action)
+
+    assert elem.pm_body.is_sleeping
+    assert not elem.moved
+
+    elem.pm_body.apply_impulse_at_local_point((10, 0))
+    assert not elem.pm_body.is_sleeping
+    assert elem.moved
+
+    for _ in range(60):
+        playground.step(playground.null_action)
+    assert elem.pm_body.is_sleeping
+
+    # Moving an entity wakes it up
+    elem.move_to(((-100, -100), 0))
+    assert not elem.pm_body.is_sleeping
+
+
+def test_threaded_space():
+    playground = EmptyPlayground(size=(400, 400), threads=2)
+
+    assert playground.space.threaded == (platform.system() != "Windows")
+
+    playground.add(MockDynamicElement(), ((100, 100), 0))
+    playground.step(playground.null_action)
+
+
+def _displacement(time_step, window=None):
+    playground = EmptyPlayground(size=(600, 600), time_step=time_step, window=window)
+
+    agent = DynamicAgent(name="agent")
+    playground.add(agent, coord_center)
+
+    action = playground.null_action
+    action["agent"]["agent"][0] = 1
+
+    for _ in range(5):
+        playground.step(action, observe=False)
+
+    return agent.position[0], playground.window
+
+
+def test_time_step_displacement():
+
+    # Persistent forces act during the whole step, whatever the pymunk steps,
+    # up to the integration error of large pymunk steps
+    reference, window = _displacement(AdaptiveTimeStep(persistent_forces=True))
+
+    for time_step in [
+        FixedTimeStep(1),
+        DecoupledTimeStep(physics_dt=0.02, persistent_forces=True),
+    ]:
+        displacement, _ = _displacement(time_step, window)
+        assert abs(displacement - reference) < 0.15 * reference
+
+    # By default, forces only act during the first pymunk step
+    displacement, _ = _displacement(FixedTimeStep(10), window)
+    assert displacement < 0.2 * reference
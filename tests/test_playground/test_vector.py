@@ -0,0 +1,178 @@
+import numpy as np
+
+from spg.core.playground import (
+    EmptyPlayground,
+    SubprocVectorPlayground,
+    VectorPlayground,
+)
+from spg.core.playground.vector.sync import ViewAtlas
+from tests.mock_agents import SensingAgent
+from tests.mock_entities import DynamicElementFromGeometry, StaticElementFromGeometry
+
+coord_center = (0, 0), 0
+
+
+class MockPlayground(EmptyPlayground):
+    def place_elements(self):
+        wall = StaticElementFromGeometry(
+            geometry="rectangle", size=(20, 20), color=(0, 0, 255)
+        )
+        self.add(wall, ((40, 0), 0))
+
+    def place_agents(self):
+        self.agent = SensingAgent(name="agent")
+        self.add(self.agent, coord_center)
+
+
+def test_vector_interface():
+    vector = VectorPlayground(MockPlayground, 3, size=(200, 200))
+
+    assert vector.num_envs == 3
+    assert len({id(playground.window) for playground in vector.playgrounds}) == 1
+
+    obs, _ = vector.reset(seed=0)
+    assert obs["agent"]["agent_distance"].shape == (3, 8)
+
+    actions = vector.action_space.sample()
+    obs, rewards, terminated, truncated, _ = vector.step(actions)
+
+    assert obs["agent"]["agent"].shape == (3, 2)
+    assert rewards.shape == terminated.shape == truncated.shape == (3,)
+
+
+def test_vector_matches_single_playground():
+    vector = VectorPlayground(MockPlayground, 3, size=(200, 200))
+    vector.reset()
+
+    playground = MockPlayground(size=(200, 200))
+
+    action = {"agent": {"agent": np.array([0.3, 0, 0.5])}}
+    actions = {"agent": {"agent": np.tile(action["agent"]["agent"], (3, 1))}}
+
+    for _ in range(5):
+        obs, *_ = playground.step(action)
+        vector_obs, *_ = vector.step(actions)
+
+    for index in range(3):
+        assert np.allclose(
+            vector_obs["agent"]["agent_distance"][index], obs["agent"]["agent_distance"]
+        )
+        assert np.allclose(vector_obs["agent"]["agent"][index], obs["agent"]["agent"])
+
+    # Obstacle is detected
+    assert np.any(obs["agent"]["agent_distance"] < 100)
+
+
+def test_vector_distance_field():
+    actions = {"agent": {"agent": np.tile([0.3, 0, 0.5], (3, 1))}}
+
+    # Playgrounds are stepped one after the other, each with its own window
+    observations = []
+
+    for distance_field in [False, True]:
+        vector = VectorPlayground(
+            MockPlayground, 3, size=(200, 200), distance_field=distance_field
+        )
+        vector.reset()
+
+        for _ in range(5):
+            obs, *_ = vector.step(actions)
+
+        observations.append(obs["agent"]["agent_distance"])
+
+    # The distance field covers the static layers of all the views
+    distance_field = vector.ray_compute._compute_strategy._distance_field
+    assert (distance_field.width, distance_field.height) == vector.id_atlas.size
+    assert distance_field.version == vector.id_atlas.static_version > 0
+
+    assert np.allclose(observations[1], observations[0])
+    assert np.any(observations[1] < 100)
+
+
+def test_vector_autoreset():
+    vector = VectorPlayground(MockPlayground, 2, size=(200, 200))
+    vector.reset()
+
+    first_agent = vector.playgrounds[1].agent
+    vector.playgrounds[1]._terminated = True
+
+    _, _, terminated, _, infos = vector.step(vector.action_space.sample())
+
+    assert list(terminated) == [False, True]
+    assert list(infos["_final_observation"]) == [False, True]
+    assert vector.playgrounds[1].agent is not first_agent
+    assert vector.ray_compute.sensors[1] is vector.playgrounds[1].agent.distance
+
+
+def test_subproc_matches_vector():
+    subproc = SubprocVectorPlayground(MockPlayground, 3, num_workers=2, size=(200, 200))
+    vector = VectorPlayground(MockPlayground, 3, size=(200, 200))
+
+    assert subproc.single_observation_space == vector.single_observation_space
+
+    subproc_obs, _ = subproc.reset(seed=0)
+    vector_obs, _ = vector.reset(seed=0)
+
+    actions = {"agent": {"agent": np.tile([0.3, 0, 0.5], (3, 1))}}
+
+    for _ in range(5):
+        subproc_obs, subproc_rew, subproc_term, *_ = subproc.step(actions)
+        vector_obs, vector_rew, vector_term, *_ = vector.step(actions)
+
+    for sensor in ["agent", "agent_distance"]:
+        assert np.allclose(subproc_obs["agent"][sensor], vector_obs["agent"][sensor])
+
+    assert np.array_equal(subproc_rew, vector_rew)
+    assert np.array_equal(subproc_term, vector_term)
+
+    subproc.close()
+
+
+def test_atlas_matches_views():
+    playground = EmptyPlayground(size=(200, 200))
+
+    # Static entity added last, overlapping a dynamic one
+    playground.add(
+        DynamicElementFromGeometry(
+            geometry="rectangle", size=(40, 40), color=(0, 100, 200)
+        ),
+        ((20, 0), 0),
+    )
+    playground.add(
+        StaticElementFromGeometry(geometry="circle", radius=20, color=(200, 100, 0)),
+        ((0, 0), 0),
+    )
+
+    for view in [playground.id_view, playground.color_view]:
+        atlas = ViewAtlas(playground.ctx, [view])
+        atlas.update()
+
+        width, height = view.size
+        atlas_img = np.frombuffer(atlas.texture.read(), dtype=np.uint8)
+        atlas_img = atlas_img.reshape(height, width, 4)[..., :3]
+
+        assert np.array_equal(atlas_img, view.get_np_img())
+
+    # Views are only copied again when they changed
+    dynamic = playground.elements[0]
+
+    atlas = ViewAtlas(playground.ctx, [playground.id_view])
+    atlas.update()
+    version = playground.id_view.version
+    static_version = atlas.static_version
+
+    playground.id_view.updated = False
+    atlas.update()
+    assert playground.id_view.version == version
+
+    dynamic.move_to(((-40, 40), 0))
+    playground.id_view.updated = False
+    atlas.update()
+
+    assert playground.id_view.version == version + 1
+    assert atlas.static_version == static_version
+
+    width, height = playground.id_view.size
+    atlas_img = np.frombuffer(atlas.texture.read(), dtype=np.uint8)
+    atlas_img = atlas_img.reshape(height, width, 4)[..., :3]
+    assert np.array_equal(atlas_img, playground.id_view.get_np_img())
@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+import pytest
+
+from spg.core.playground import EmptyPlayground
+from spg.core.view import SoftwareView, View
+from tests.mock_agents import SensingAgent
+from tests.mock_entities import DynamicElementFromGeometry, StaticElementFromGeometry
+
+
+def add_entities(playground):
+    playground.add(
+        DynamicElementFromGeometry(
+            geometry="rectangle", size=(30, 20), color=(0, 100, 200)
+        ),
+        ((50, 10), 0.7),
+    )
+    playground.add(
+        StaticElementFromGeometry(geometry="circle", radius=15, color=(200, 100, 0)),
+        ((-50, -30), 0),
+    )
+    playground.add(
+        StaticElementFromGeometry(
+            geometry="circle", radius=20, color=(0, 255, 0), transparent=True
+        ),
+        ((-40, -20), 0),
+    )
+
+
+@pytest.mark.parametrize("uid_mode", [True, False])
+@pytest.mark.parametrize("scale", [0.5, 1, 2])
+@pytest.mark.parametrize("center", [(0, 0), (20, -10)])
+def test_software_matches_gl(uid_mode, scale, center):
+    playground = EmptyPlayground(size=(200, 200), background=(20, 30, 40))
+    add_entities(playground)
+
+    kwargs = dict(
+        size_on_playground=(200, 150), center=center, scale=scale, uid_mode=uid_mode
+    )
+    gl_img = View(playground, **kwargs).get_np_img()
+    software_img = SoftwareView(playground, **kwargs).get_np_img()
+
+    assert software_img.shape == gl_img.shape
+    assert software_img.dtype == gl_img.dtype
+
+    # Images only differ on the edges of sprites
+    different = np.any(software_img != gl_img, axis=-1)
+    assert different.mean() < 0.02
+
+
+def test_software_view_update():
+    playground = EmptyPlayground(size=(200, 200))
+    view = SoftwareView(playground, size_on_playground=(200, 200))
+
+    elem = StaticElementFromGeometry(geometry="circle", radius=10, color=(0, 0, 255))
+    playground.add(elem, ((0, 0), 0))
+
+    # Rows start at the bottom of the playground, as GL views
+    playground.step(playground.null_action)
+    img = view.get_np_img()
+    assert np.all(img[100, 100] == (0, 0, 255))
+
+    elem.move_to(((50, -50), 0))
+    playground.step(playground.null_action)
+    img = view.get_np_img()
+    assert np.all(img[100, 100] == 0)
+    assert np.all(img[50, 150] == (0, 0, 255))
+
+    playground.remove(elem)
+    playground.step(playground.null_action)
+    assert not np.any(view.get_np_img())
+
+    with pytest.raises(ValueError):
+        view.texture  # pylint: disable=pointless-statement
+
+
+def test_software_view_frames():
+    playground = EmptyPlayground(size=(200, 200), view_backend="software")
+    view = playground.color_view
+
+    elem = DynamicElementFromGeometry(geometry="circle", radius=10, color=(0, 0, 255))
+    playground.add(elem, ((0, 0), 0))
+
+    playground.step(playground.null_action)
+    frame = view.get_np_img()
+
+    # Frames are not overwritten by the next updates
+    elem.move_to(((50, -50), 0))
+    playground.step(playground.null_action)
+
+    assert np.all(frame[100, 100] == (0, 0, 255))
+    assert not np.array_equal(frame, view.get_np_img())
+
+
+def test_software_backend():
+    playground = EmptyPlayground(size=(200, 200), view_backend="software")
+    assert playground.window is None
+    assert isinstance(playground.id_view, SoftwareView)
+    assert not playground.ray_compute.use_shader
+
+    agent = SensingAgent(name="agent")
+    playground.add(agent, ((0, 0), 0))
+    playground.add(
+        StaticElementFromGeometry(
+            geometry="rectangle", size=(20, 20), color=(0, 0, 255)
+        ),
+        ((40, 0), math.pi / 4),
+    )
+
+    playground.step(playground.null_action)
+
+    distances = agent.distance.observation
+    assert agent.distance.updated
+    assert np.all(distances <= 100) and np.any(distances < 40)
+
+    with pytest.raises(ValueError):
+        EmptyPlayground(size=(200, 200), view_backend="vulkan")
@@ -3,7 +3,7 @@ import numpy as np
 import pytest
 
 from spg.core.playground import EmptyPlayground
-from spg.core.view import View
+from spg.core.view import SoftwareView, View
 from tests.mock_entities import DynamicElementFromGeometry, StaticElementFromGeometry
 
 coord_center = (0, 0), 0
@@ -210,3 +210,50 @@ def test_reset_playground():
 
     assert not np.all(img == img_2)
     assert not np.sum(img) == np.sum(img_2)
+
+
+@pytest.mark.parametrize("view_cls", [View, SoftwareView])
+def test_static_layer(view_cls):
+    blue, red = (0, 0, 255), (255, 0, 0)
+
+    playground = EmptyPlayground(size=(400, 400))
+    view = view_cls(playground, size_on_playground=(400, 400))
+
+    wall = StaticElementFromGeometry(geometry="circle", radius=10, color=blue)
+    playground.add(wall, coord_center)
+
+    ball = DynamicElementFromGeometry(geometry="circle", radius=10, color=red)
+    playground.add(ball, ((50, 0), 0))
+
+    view.update()
+    assert view.static_updated
+
+    img = view.get_np_img()
+    assert np.all(img[200, 200] == blue)
+    assert np.all(img[200, 250] == red)
+
+    # Only dynamic entities are drawn again
+    ball.move_to(((-50, 0), 0))
+    assert view.static_updated
+
+    view.update()
+    img = view.get_np_img()
+    assert np.all(img[200, 150] == red)
+    assert np.all(img[200, 250] == 0)
+    assert np.all(img[200, 200] == blue)
+
+    wall.move_to(((0, 50), 0))
+    assert not view.static_updated
+
+    view.update()
+    img = view.get_np_img()
+    assert np.all(img[250, 200] == blue)
+    assert np.all(img[200, 200] == 0)
+
+    playground.remove(wall)
+    assert not view.static_updated
+
+    view.update()
+    img = view.get_np_img()
+    assert np.all(img[250, 200] == 0)
+    assert np.all(img[200, 150] == red)